@@ -0,0 +1,62 @@
+"""Benchmark article extraction: thread pool vs. thread-pool download + process-pool extraction.
+
+Pages are read from a corpus of saved HTML files (generated fixtures by default),
+with an optional simulated network latency per download.
+
+    python benchmarks/extraction.py --size 400 --latency 0.05
+
+"""
+
+import argparse
+import concurrent.futures
+import os
+import tempfile
+import time
+
+from fixtures import write_corpus
+
+from ai_news.news.pipeline import ExtractionPipeline, extract_content
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='Directory of saved HTML pages. Defaults to generated fixtures.')
+    parser.add_argument('--size', type=int, default=200, help='Number of fixture pages to generate.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated download latency in seconds.')
+    parser.add_argument('--fetch-workers', type=int, default=None)
+    parser.add_argument('--extract-workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.corpus:
+        pages = sorted(os.path.join(args.corpus, name) for name in os.listdir(args.corpus) if name.endswith('.html'))
+    else:
+        pages = write_corpus(os.path.join(tempfile.gettempdir(), 'ai_news_fixtures', 'html'), args.size)
+
+    def download(path: str) -> str:
+        time.sleep(args.latency)
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def fetch_and_extract(path: str) -> str | None:
+        return extract_content(download(path))
+
+    print(f'{len(pages):,} pages, {args.latency * 1000:.0f}ms latency, {os.cpu_count()} CPUs\n')
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(args.fetch_workers) as executor:
+        baseline = list(executor.map(fetch_and_extract, pages))
+    baseline_time = time.perf_counter() - start
+    print(f'thread pool (fetch + extract): {baseline_time:7.2f}s  {len(pages) / baseline_time:8.1f} pages/s')
+
+    pipeline = ExtractionPipeline(fetch_workers=args.fetch_workers, extract_workers=args.extract_workers)
+    start = time.perf_counter()
+    pipelined = pipeline.run(pages, download=download)
+    pipeline_time = time.perf_counter() - start
+    print(f'pipeline (threads -> procs):   {pipeline_time:7.2f}s  {len(pages) / pipeline_time:8.1f} pages/s')
+
+    assert baseline == pipelined, 'pipeline output differs from baseline'
+    print(f'\nspeedup: {baseline_time / pipeline_time:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Deterministic fixture corpus of news article pages for offline benchmarks."""
+
+import os
+import random
+import re
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Any
+
+import numpy as np
+from llama_index.core.embeddings import BaseEmbedding
+from newsapi.newsapi_exception import NewsAPIException
+
+WORDS = (
+    'artificial intelligence model training inference researchers company released open source '
+    'language benchmark data center chips startup funding regulation policy government safety '
+    'alignment agents robotics vision speech reasoning compute cloud customers product launch '
+    'investors revenue quarter analysts market users developers platform api pricing hardware'
+).split()
+
+SOURCES = ['TechCrunch', 'The Verge', 'Wired', 'Ars Technica', 'Engadget', 'VentureBeat', 'ZDNet', 'Reuters']
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 24))]
+    return ' '.join(words).capitalize() + '.'
+
+
+def make_html(index: int, paragraphs: int = 30) -> str:
+    """Article page with realistic boilerplate (nav, sidebar, comments, footer)."""
+    rng = random.Random(index)
+    title = ' '.join(rng.choice(WORDS) for _ in range(8)).title()
+    nav = ''.join(f'<li><a href="/section/{i}">{rng.choice(WORDS).title()}</a></li>' for i in range(40))
+    body = ''.join(
+        f'<p>{" ".join(_sentence(rng) for _ in range(rng.randint(3, 7)))}</p>'
+        + (f'<h2>{_sentence(rng)}</h2>' if i % 8 == 7 else '')
+        for i in range(paragraphs)
+    )
+    related = ''.join(f'<li><a href="/article/{rng.randint(0, 10**6)}">{_sentence(rng)}</a></li>' for _ in range(20))
+    comments = ''.join(f'<div class="comment"><p>{_sentence(rng)}</p></div>' for _ in range(15))
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title}</title>
+<meta name="author" content="Author {index}"><script>var analytics = {{"id": {index}}};</script>
+<style>body {{ font-family: sans-serif; }}</style></head>
+<body><header><nav><ul>{nav}</ul></nav></header>
+<main><article><h1>{title}</h1><p class="byline">By Author {index}</p>{body}</article>
+<aside><h3>Related</h3><ul>{related}</ul></aside><section class="comments">{comments}</section></main>
+<footer><p>Copyright {SOURCES[index % len(SOURCES)]}. All rights reserved.</p><ul>{nav}</ul></footer>
+</body></html>"""
+
+
+def make_article(index: int, base_url: str = 'https://news.example.com') -> dict[str, object]:
+    """News API article json for the fixture page `index`."""
+    rng = random.Random(index)
+    source = SOURCES[index % len(SOURCES)]
+    published_at = datetime(2024, 5, 1) + timedelta(minutes=37 * index)
+    return {
+        'source': {'id': source.lower().replace(' ', '-'), 'name': source},
+        'author': f'Author {index}',
+        'title': ' '.join(rng.choice(WORDS) for _ in range(8)).title(),
+        'description': _sentence(rng),
+        'url': f'{base_url}/article/{index}',
+        'urlToImage': None,
+        'publishedAt': published_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'content': _sentence(rng) + ' [+3000 chars]',
+    }
+
+
+def write_corpus(path: str, size: int) -> list[str]:
+    """Write `size` fixture pages under `path` (reusing existing ones) and return their paths."""
+    os.makedirs(path, exist_ok=True)
+    paths = []
+    for index in range(size):
+        page = os.path.join(path, f'{index:06d}.html')
+        if not os.path.exists(page):
+            with open(page, 'w', encoding='utf-8') as f:
+                f.write(make_html(index))
+        paths.append(page)
+    return paths
+
+
+class FixtureTransport:
+    """Stand-in for the live News API serving `size` fixture articles (see `ai_news.news.Transport`)."""
+
+    def __init__(self, size: int, base_url: str = 'https://news.example.com') -> None:
+        self.size = size
+        self.base_url = base_url
+
+    def get_sources(self, **params: Any) -> dict[str, Any]:
+        return {
+            'status': 'ok',
+            'sources': [
+                {
+                    'id': name.lower().replace(' ', '-'),
+                    'name': name,
+                    'description': f'{name} technology news.',
+                    'url': f'https://{name.lower().replace(" ", "")}.example.com',
+                    'category': 'technology',
+                    'language': 'en',
+                    'country': 'us',
+                }
+                for name in SOURCES
+            ],
+        }
+
+    def get_top_headlines(self, **params: Any) -> dict[str, Any]:
+        return self.get_everything(page=1, page_size=params.get('page_size') or 20)
+
+    def get_everything(self, **params: Any) -> dict[str, Any]:
+        page, page_size = params.get('page') or 1, params.get('page_size') or 20
+        start = (page - 1) * page_size
+        if start >= self.size:
+            raise NewsAPIException({'status': 'error', 'code': 'maximumResultsReached', 'message': 'No more results.'})
+        articles = [make_article(index, self.base_url) for index in range(start, min(start + page_size, self.size))]
+        return {'status': 'ok', 'totalResults': self.size, 'articles': articles}
+
+    def download(self, url: str) -> str | None:
+        return make_html(int(url.rsplit('/', 1)[-1]))
+
+
+class CountingEmbedding(BaseEmbedding):
+    """Local hashed bag-of-words embedding that counts API-like calls."""
+
+    calls: int = 0
+    texts: int = 0
+    latency: float = 0.0
+
+    def _embed(self, text: str) -> list[float]:
+        vector = np.zeros(256)
+        for term in re.findall(r'\w+', text.lower()):
+            vector[zlib.crc32(term.encode()) % 256] += 1
+        return (vector / (np.linalg.norm(vector) or 1)).tolist()
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        self.texts += len(texts)
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self._get_text_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        return self._get_query_embedding(query)
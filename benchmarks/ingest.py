@@ -0,0 +1,260 @@
+"""End-to-end ingest benchmark: per-stage latency, throughput, peak memory and API calls.
+
+Runs the whole ingest path offline: sources -> everything -> article download &
+extraction -> dedup -> split -> embed -> index. News API responses and article
+pages are replayed from a fixture archive (see `ReplayTransport`) with simulated
+latency, embeddings come from a local fake model, and nodes are indexed into an
+in-memory Chroma collection. Every combination of `--sizes`, `--workers` and
+`--splitters` runs `--repeat` times; stage latencies are reported as percentiles
+over the repeats. Use `--output` to save machine-readable results for comparing
+releases.
+
+    python benchmarks/ingest.py --sizes 100 500 --workers 0 2 --splitters sentence tfidf_semantic \\
+        --output ingest.json
+
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+os.environ.setdefault('ANONYMIZED_TELEMETRY', 'False')
+
+import numpy as np  # noqa: E402
+from fixtures import CountingEmbedding, FixtureTransport  # noqa: E402
+from llama_index.core.node_parser import NodeParser, SemanticSplitterNodeParser  # noqa: E402
+
+from ai_news.news import Category, ExtractionPipeline, News, RecordingTransport, ReplayTransport  # noqa: E402
+from ai_news.news import SourceCatalog, Transport  # noqa: E402
+from ai_news.rag.dedup import deduplicate_documents  # noqa: E402
+from ai_news.rag.embedding import embed_nodes  # noqa: E402
+from ai_news.rag.index import SplitterType, get_splitter  # noqa: E402
+from ai_news.rag.vector_db import ClientType, create_vector_store_index, get_client  # noqa: E402
+
+STAGES = ['sources', 'fetch', 'dedup', 'split', 'embed', 'index']
+TOPIC = 'artificial intelligence'
+
+
+class CountingTransport:
+    """Transport wrapper counting calls per method."""
+
+    def __init__(self, transport: Transport) -> None:
+        self._transport = transport
+        self.calls: Counter[str] = Counter()
+
+    def get_sources(self, **params: Any) -> dict[str, Any]:
+        self.calls['sources'] += 1
+        return self._transport.get_sources(**params)
+
+    def get_top_headlines(self, **params: Any) -> dict[str, Any]:
+        self.calls['top_headlines'] += 1
+        return self._transport.get_top_headlines(**params)
+
+    def get_everything(self, **params: Any) -> dict[str, Any]:
+        self.calls['everything'] += 1
+        return self._transport.get_everything(**params)
+
+    def download(self, url: str) -> str | None:
+        self.calls['download'] += 1
+        return self._transport.download(url)
+
+
+def make_news(transport: Transport, workers: int) -> News:
+    """News client without caches, so every run downloads and extracts every article.
+
+    `transport` wraps the replaying transport, so `News` can't tell to bypass its caches itself.
+
+    """
+    return News(
+        transport=transport,
+        catalog=SourceCatalog(transport, path=None),
+        pipeline=ExtractionPipeline(extract_workers=workers) if workers else None,
+    )
+
+
+def record_archive(path: str, size: int) -> None:
+    """Record a fixture archive for `size` articles, same requests as `run`."""
+    if os.path.exists(os.path.join(path, 'complete')):
+        return
+    news = News(transport=RecordingTransport(FixtureTransport(size), path=path))
+    sources = news.get_sources(category=Category.TECHNOLOGY)
+    news.get_documents(q=TOPIC, sources=sources, max_articles=size)
+    open(os.path.join(path, 'complete'), 'w').close()
+
+
+def make_splitter(splitter_type: SplitterType, embed_model: CountingEmbedding) -> NodeParser:
+    """Splitter of `splitter_type`, embedding through the fake model where needed."""
+    match splitter_type:
+        case SplitterType.SEMANTIC:
+            return SemanticSplitterNodeParser.from_defaults(embed_model=embed_model)
+        case _:
+            return get_splitter(splitter_type=splitter_type)
+
+
+def run(archive: str, size: int, workers: int, splitter_type: SplitterType, args: argparse.Namespace) -> dict[str, Any]:
+    """Run the ingest path once, returning per-stage durations and peak memory, and call counts."""
+    transport = CountingTransport(
+        ReplayTransport(archive, api_latency=args.api_latency, download_latency=args.download_latency, jitter=0.2)
+    )
+    embed_model = CountingEmbedding(latency=args.embed_latency)
+    news = make_news(transport, workers=workers)
+    state: dict[str, Any] = {}
+
+    steps: dict[str, Callable[[], None]] = {
+        'sources': lambda: state.update(sources=news.get_sources(category=Category.TECHNOLOGY)),
+        'fetch': lambda: state.update(
+            documents=news.get_documents(q=TOPIC, sources=state['sources'], max_articles=size)
+        ),
+        'dedup': lambda: state.update(documents=deduplicate_documents(state['documents'])),
+        'split': lambda: state.update(
+            nodes=make_splitter(splitter_type, embed_model).get_nodes_from_documents(state['documents'])
+        ),
+        'embed': lambda: state.update(nodes=embed_nodes(state['nodes'], embed_model=embed_model)),
+        'index': lambda: state.update(
+            index=create_vector_store_index(
+                client=get_client(client_type=ClientType.IN_MEMORY),
+                collection_name=f'ingest_{time.monotonic_ns()}',
+                nodes=state['nodes'],
+                embed_model=embed_model,
+            )
+        ),
+    }
+
+    seconds: dict[str, float] = {}
+    peak_mib: dict[str, float] = {}
+    if args.memory:
+        # Peak Python allocations per stage, excluding extraction worker processes. Slows every stage down.
+        tracemalloc.start()
+    try:
+        for stage in STAGES:
+            if args.memory:
+                tracemalloc.reset_peak()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                steps[stage]()
+            seconds[stage] = time.perf_counter() - start
+            peak_mib[stage] = tracemalloc.get_traced_memory()[1] / 2**20 if args.memory else 0.0
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'seconds': seconds,
+        'peak_mib': peak_mib,
+        'articles': len(state['documents']),
+        'nodes': len(state['nodes']),
+        'news_api_calls': {k: v for k, v in transport.calls.items() if k != 'download'},
+        'downloads': transport.calls['download'],
+        'embedding_calls': embed_model.calls,
+        'embedded_texts': embed_model.texts,
+    }
+
+
+def summarize(runs: list[dict[str, Any]], size: int, workers: int, splitter_type: SplitterType) -> dict[str, Any]:
+    """Aggregate repeated runs of one configuration."""
+    totals = [sum(r['seconds'].values()) for r in runs]
+    stages = {
+        stage: {
+            'p50': float(np.percentile([r['seconds'][stage] for r in runs], 50)),
+            'p95': float(np.percentile([r['seconds'][stage] for r in runs], 95)),
+            'max': max(r['seconds'][stage] for r in runs),
+            'peak_mib': max(r['peak_mib'][stage] for r in runs),
+        }
+        for stage in STAGES
+    }
+    last = runs[-1]
+    return {
+        'size': size,
+        'workers': workers,
+        'splitter': splitter_type.name.lower(),
+        'repeat': len(runs),
+        'total_seconds': {'p50': float(np.percentile(totals, 50)), 'p95': float(np.percentile(totals, 95))},
+        'articles_per_second': last['articles'] / float(np.percentile(totals, 50)),
+        'peak_mib': max(stage['peak_mib'] for stage in stages.values()),
+        'stages': stages,
+        **{
+            key: last[key]
+            for key in ('articles', 'nodes', 'news_api_calls', 'downloads', 'embedding_calls', 'embedded_texts')
+        },
+    }
+
+
+def environment() -> dict[str, Any]:
+    """Where and on what the benchmark ran."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500], help='Number of articles to ingest.')
+    parser.add_argument(
+        '--workers', type=int, nargs='+', default=[0], help='Extraction processes, 0 for the default thread pool.'
+    )
+    parser.add_argument(
+        '--splitters',
+        nargs='+',
+        default=['sentence', 'tfidf_semantic'],
+        choices=[splitter_type.name.lower() for splitter_type in SplitterType],
+    )
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration.')
+    parser.add_argument('--api-latency', type=float, default=0.2, help='Simulated seconds per News API request.')
+    parser.add_argument('--download-latency', type=float, default=0.05, help='Simulated seconds per article download.')
+    parser.add_argument('--embed-latency', type=float, default=0.1, help='Simulated seconds per embedding request.')
+    parser.add_argument(
+        '--no-memory', dest='memory', action='store_false', help='Skip peak memory tracing, which slows stages down.'
+    )
+    parser.add_argument('--archive', help='Directory of fixture archives. Defaults to a temporary directory.')
+    parser.add_argument('--output', help='Write results as json to this file.')
+    args = parser.parse_args()
+
+    root = args.archive or os.path.join(tempfile.gettempdir(), 'ai_news_fixtures', 'archive')
+    print(f'{os.cpu_count()} CPUs, {args.repeat} runs per configuration\n')
+    header = f'{"size":>6}{"workers":>8}  {"splitter":<15}' + ''.join(f'{stage:>9}' for stage in STAGES)
+    print(f'{header}{"total p50":>11}{"art/s":>8}{"peak MiB":>10}{"api":>5}{"embed":>7}')
+
+    results = []
+    for size in args.sizes:
+        archive = os.path.join(root, str(size))
+        record_archive(archive, size)
+        for workers in args.workers:
+            for name in args.splitters:
+                splitter_type = SplitterType[name.upper()]
+                runs = [run(archive, size, workers, splitter_type, args) for _ in range(args.repeat)]
+                result = summarize(runs, size, workers, splitter_type)
+                results.append(result)
+                print(
+                    f'{size:>6}{workers:>8}  {result["splitter"]:<15}'
+                    + ''.join(f'{result["stages"][stage]["p50"]:>9.2f}' for stage in STAGES)
+                    + f'{result["total_seconds"]["p50"]:>11.2f}{result["articles_per_second"]:>8.1f}'
+                    f'{result["peak_mib"]:>10.1f}{sum(result["news_api_calls"].values()):>5}'
+                    f'{result["embedding_calls"]:>7}'
+                )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'arguments': vars(args), 'results': results}, f, indent=2)
+        print(f'\nResults written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Memory benchmark: `NewsArticle` vs. `CompactNewsArticle` (inline and lazy content).
+
+    python benchmarks/memory.py --sizes 10000 100000
+
+"""
+
+import argparse
+import gc
+import random
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from fixtures import SOURCES, WORDS
+
+from ai_news.news import ArticleCache, NewsArticle, Source
+from ai_news.news.compact import CompactNewsArticle
+
+
+def make_articles(size: int, content_size: int) -> list[NewsArticle]:
+    """Articles as `News` builds them: one `Source` copy and a full content string each."""
+    rng = random.Random(0)
+    articles = []
+    for index in range(size):
+        name = SOURCES[index % len(SOURCES)]
+        articles.append(
+            NewsArticle(
+                title=' '.join(rng.choices(WORDS, k=10)),
+                author=f'Author {index % 500}',
+                content=f'{index} ' + ' '.join(rng.choices(WORDS, k=content_size // 7)),
+                description=' '.join(rng.choices(WORDS, k=30)),
+                published_at=datetime(2024, 5, 1) + timedelta(minutes=index),
+                source=Source(id=name.lower().replace(' ', '-'), name=name),
+                url=f'https://news.example.com/article/{index}',
+                image_url=f'https://news.example.com/image/{index}.jpg',
+            )
+        )
+    return articles
+
+
+def measure(build: Callable[[], list[object]]) -> tuple[float, float]:
+    """Memory (MiB) retained by the objects `build` returns, and build time (s)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    objects = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current / 2**20, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--content-size', type=int, default=3_000, help='Characters of content per article.')
+    args = parser.parse_args()
+
+    print(f'{"articles":>10}  {"variant":<28}{"memory (MiB)":>14}{"bytes/article":>15}{"build (s)":>11}')
+    for size in args.sizes:
+        store = ArticleCache(path=tempfile.mkdtemp(prefix='ai_news_memory_'), ttl=None, max_size=2**40)
+        # Populate the backing store outside of the measurements.
+        for article in make_articles(size, args.content_size):
+            store.set(article.url, article.content)
+
+        variants: dict[str, Callable[[], list[object]]] = {
+            'NewsArticle': lambda: make_articles(size, args.content_size),  # type: ignore[arg-type]
+            'CompactNewsArticle': lambda: [
+                CompactNewsArticle.from_article(article) for article in make_articles(size, args.content_size)
+            ],
+            'CompactNewsArticle (lazy)': lambda: [
+                CompactNewsArticle.from_article(article, store=store)
+                for article in make_articles(size, args.content_size)
+            ],
+        }
+        for name, build in variants.items():
+            memory, elapsed = measure(build)
+            print(f'{size:>10,}  {name:<28}{memory:>14.1f}{memory * 2**20 / size:>15,.0f}{elapsed:>11.2f}')
+
+        store.close()
+        print()
+
+
+if __name__ == '__main__':
+    main()
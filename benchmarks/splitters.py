@@ -0,0 +1,94 @@
+"""Benchmark node splitters: wall-clock, embedding API calls and boundary quality.
+
+Documents are built from segments on different topics (disjoint vocabularies),
+so the true semantic boundaries are known. Boundary precision/recall measure how
+well node boundaries line up with them. The semantic splitter embeds through a
+local hashed bag-of-words model that counts calls and sleeps `--latency` per call
+to simulate the embedding API.
+
+    python benchmarks/splitters.py --docs 50 --latency 0.2
+
+"""
+
+import argparse
+import random
+import time
+
+from fixtures import CountingEmbedding
+from llama_index.core import Document
+from llama_index.core.node_parser import SemanticSplitterNodeParser
+
+from ai_news.rag.index import SplitterType, get_splitter
+from ai_news.rag.splitter import TfidfSemanticSplitterNodeParser
+
+TOPICS = [
+    'chip gpu wafer foundry nanometer fab yield transistor packaging supply export datacenter',
+    'court lawsuit copyright judge ruling plaintiff authors settlement appeal lawyers claim',
+    'robot humanoid warehouse arm gripper factory actuator sensor locomotion payload demo',
+    'funding round investors valuation startup series billion venture capital raised stake',
+    'election misinformation deepfake voters campaign platform moderation policy ballot',
+    'hospital diagnosis radiology patients clinical trial doctors medical imaging approval',
+]
+
+
+def make_document(index: int) -> tuple[Document, list[int]]:
+    """Document of 3-6 topic segments and the character offsets of the segment boundaries."""
+    rng = random.Random(index)
+    text, boundaries = '', []
+    for topic in rng.sample(TOPICS, rng.randint(3, 6)):
+        words = topic.split() + 'the a of and to in is for on with said new'.split()
+        for _ in range(rng.randint(6, 14)):
+            text += ' '.join(rng.choice(words) for _ in range(rng.randint(10, 20))).capitalize() + '. '
+        boundaries.append(len(text))
+    return Document(text=text), boundaries[:-1]
+
+
+def boundary_scores(nodes: list, boundaries: list[int], tolerance: int = 40) -> tuple[int, int, int]:
+    """True positives, predicted and actual boundary counts."""
+    predicted = [node.end_char_idx for node in nodes[:-1] if node.end_char_idx is not None]
+    hits = sum(any(abs(p - b) <= tolerance for p in predicted) for b in boundaries)
+    return hits, len(predicted), len(boundaries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=50, help='Number of documents.')
+    parser.add_argument('--latency', type=float, default=0.1, help='Simulated latency per embedding call.')
+    parser.add_argument('--percentile', type=int, default=95, help='Breakpoint percentile of the semantic splitters.')
+    args = parser.parse_args()
+
+    corpus = [make_document(i) for i in range(args.docs)]
+    print(f'{args.docs} documents, {args.latency * 1000:.0f}ms per embedding call\n')
+    print(f'{"splitter":<16}{"time (s)":>10}{"api calls":>11}{"texts":>8}{"nodes":>7}{"precision":>11}{"recall":>8}')
+
+    for splitter_type in SplitterType:
+        embed_model = CountingEmbedding(latency=args.latency)
+        match splitter_type:
+            case SplitterType.SEMANTIC:
+                splitter = SemanticSplitterNodeParser.from_defaults(
+                    embed_model=embed_model,
+                    breakpoint_percentile_threshold=args.percentile,
+                )
+            case SplitterType.TFIDF_SEMANTIC:
+                splitter = TfidfSemanticSplitterNodeParser(breakpoint_percentile_threshold=args.percentile)
+            case _:
+                splitter = get_splitter(splitter_type=splitter_type)
+
+        hits = predicted = actual = total_nodes = 0
+        start = time.perf_counter()
+        for document, boundaries in corpus:
+            nodes = splitter.get_nodes_from_documents([document])
+            h, p, a = boundary_scores(nodes, boundaries)
+            hits, predicted, actual, total_nodes = hits + h, predicted + p, actual + a, total_nodes + len(nodes)
+        elapsed = time.perf_counter() - start
+
+        precision = hits / predicted if predicted else 0.0
+        recall = hits / actual if actual else 0.0
+        print(
+            f'{splitter_type.name.lower():<16}{elapsed:>10.2f}{embed_model.calls:>11}{embed_model.texts:>8}'
+            f'{total_nodes:>7}{precision:>11.2f}{recall:>8.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
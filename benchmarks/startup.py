@@ -0,0 +1,138 @@
+"""Startup benchmark: cold and warm import time of the app and of `main.py`.
+
+Each target's imports run in a fresh interpreter under `python -X importtime`.
+Cold runs start from an empty bytecode cache (every module is compiled, as after
+an install or upgrade), warm runs reuse it. Reported per target: wall time of the
+interpreter, total import time and the slowest imports.
+
+Targets:
+    main        `import main`, i.e. the News API example.
+    app-header  Imports `home.py` runs before it renders the page header.
+    app         Every import `home.py` needs before it can answer, including the
+                modules `ai_news.st_util` loads lazily.
+
+    python benchmarks/startup.py --repeat 5 --output startup.json
+
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules `ai_news.st_util` imports on the first run of the app.
+APP_LAZY_IMPORTS = ['import ai_news.rag.index', 'import llama_index.llms.openai']
+
+
+def app_imports(header_only: bool = False) -> list[str]:
+    """Import statements of `home.py`, optionally only the ones before its first other statement."""
+    with open(os.path.join(ROOT, 'home.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    imports: list[str] = []
+    for node in tree.body:
+        if isinstance(node, ast.Import | ast.ImportFrom):
+            imports.append(ast.unparse(node))
+        elif header_only:
+            break
+    return imports if header_only else imports + APP_LAZY_IMPORTS
+
+
+def targets() -> dict[str, str]:
+    """Code to run per target."""
+    return {
+        'main': 'import main',
+        'app-header': '\n'.join(app_imports(header_only=True)),
+        'app': '\n'.join(app_imports()),
+    }
+
+
+def measure(code: str, pycache: str) -> dict[str, Any]:
+    """Run `code` in a fresh interpreter, returning its wall time and `-X importtime` report."""
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join(filter(None, [os.path.join(ROOT, 'src'), os.environ.get('PYTHONPATH')])),
+    }
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-X', f'pycache_prefix={pycache}', '-c', code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    # Lines look like `import time:  self [us] | cumulative | imported package`, nesting shown by indent.
+    total_us = 0
+    slowest: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix('import time:').split('|')
+        total_us += int(self_us)
+        # Imports of the target itself and the ones they make directly.
+        if len(name) - len(name.lstrip()) <= 3:
+            slowest[name.strip()] = int(cumulative_us)
+
+    return {'wall_seconds': wall, 'import_seconds': total_us / 1e6, 'slowest': slowest}
+
+
+def run(name: str, code: str, repeat: int) -> dict[str, Any]:
+    """Cold run, then `repeat` warm runs of a target."""
+    with tempfile.TemporaryDirectory(prefix='ai_news_pycache_') as pycache:
+        cold = measure(code, pycache)
+        warm = [measure(code, pycache) for _ in range(repeat)]
+
+    slowest = sorted(warm[-1]['slowest'].items(), key=lambda item: item[1], reverse=True)
+    return {
+        'target': name,
+        'cold': {'wall_seconds': cold['wall_seconds'], 'import_seconds': cold['import_seconds']},
+        'warm': {
+            'wall_seconds': statistics.median(r['wall_seconds'] for r in warm),
+            'import_seconds': statistics.median(r['import_seconds'] for r in warm),
+        },
+        'slowest_imports': [{'module': module, 'seconds': us / 1e6} for module, us in slowest[:5]],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--targets', nargs='+', default=list(targets()), choices=list(targets()))
+    parser.add_argument('--repeat', type=int, default=3, help='Warm runs per target.')
+    parser.add_argument('--output', help='Write results as json to this file.')
+    args = parser.parse_args()
+
+    print(f'{"target":<12}{"cold wall":>11}{"cold import":>13}{"warm wall":>11}{"warm import":>13}  slowest (warm)')
+    results = []
+    for name in args.targets:
+        try:
+            result = run(name, targets()[name], args.repeat)
+        except RuntimeError as e:
+            print(f'{name:<12}  failed: {e}')
+            continue
+        results.append(result)
+        slowest = ', '.join(f'{i["module"]} {i["seconds"]:.2f}s' for i in result['slowest_imports'][:3])
+        print(
+            f'{name:<12}{result["cold"]["wall_seconds"]:>10.2f}s{result["cold"]["import_seconds"]:>12.2f}s'
+            f'{result["warm"]["wall_seconds"]:>10.2f}s{result["warm"]["import_seconds"]:>12.2f}s  {slowest}'
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version, 'arguments': vars(args), 'results': results}, f, indent=2)
+        print(f'\nResults written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
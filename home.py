@@ -1,9 +1,9 @@
 import os
-from llama_index.core import Settings
-from llama_index.core.prompts import ChatMessage, MessageRole
 import streamlit as st
 from dotenv import load_dotenv
+from ai_news import metrics
 from ai_news.st_util import (
+    IndexNotBuiltError,
     add_to_message_history,
     create_chat_engine,
     load_embed_model,
@@ -11,12 +11,13 @@ from ai_news.st_util import (
 )
 
 load_dotenv()
+metrics.enable()
 
 # Load from streamlit secrets or .env.
-NEWS_API_KEY = st.secrets.get('NEWS_API_KEY', os.environ['NEWS_API_KEY'])
+# News are fetched by the ingestion worker (`ai-news-worker`), so only OpenAI is needed here.
 OPENAI_API_KEY = st.secrets.get('OPENAI_API_KEY', os.environ['OPENAI_API_KEY'])
 
-if not all((NEWS_API_KEY, OPENAI_API_KEY)):
+if not OPENAI_API_KEY:
     st.error('Could not fetch API keys')
     st.stop()
 
@@ -26,6 +27,10 @@ st.caption("""\
 Get your latest AI news from multiple sources and interract to get more insight you care about.
 """)
 
+# Imported after the page header is sent, so it renders while llama_index loads on a cold start.
+from llama_index.core import Settings  # noqa: E402
+from llama_index.core.prompts import ChatMessage, MessageRole  # noqa: E402
+
 # Create messages state.
 if 'messages' not in st.session_state:
     st.session_state.messages = [
@@ -49,8 +54,12 @@ for msg in st.session_state.messages:
 Settings.llm = load_model(api_key=OPENAI_API_KEY, model=model)
 Settings.embed_model = load_embed_model(api_key=OPENAI_API_KEY)
 
-# Create chat engine.
-chat_engine = create_chat_engine(news_api_key=NEWS_API_KEY)
+# Load chat engine.
+try:
+    chat_engine = create_chat_engine(api_key=OPENAI_API_KEY, model=model)
+except IndexNotBuiltError:
+    st.warning('The news index has not been built yet. Run `ai-news-worker --once` and reload this page.')
+    st.stop()
 
 if prompt := st.chat_input('What can I help you with?'):
     st.chat_message('user').write(prompt)
@@ -76,3 +85,17 @@ if prompt := st.chat_input('What can I help you with?'):
                 ]
             )
         add_to_message_history(MessageRole.ASSISTANT, response)
+
+# Instrumentation summary (refreshed on every rerun).
+with st.sidebar:
+    with st.expander('Metrics', expanded=False):
+        if rows := metrics.summary():
+            st.dataframe(rows, hide_index=True)
+            st.download_button(
+                label='Download Prometheus metrics',
+                data=metrics.to_prometheus(),
+                file_name='ai_news_metrics.prom',
+                mime='text/plain',
+            )
+        else:
+            st.caption('No metrics recorded yet.')
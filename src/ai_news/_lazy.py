@@ -0,0 +1,33 @@
+import importlib
+import sys
+from collections.abc import Callable
+from typing import Any
+
+
+def lazy_attributes(
+    package: str,
+    lazy: dict[str, str],
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Module `__getattr__` and `__dir__` importing names on first access.
+
+    Args:
+        package (str): Name of the package the attributes belong to, i.e. `__name__`.
+        lazy (dict[str, str]): Public name -> module it's defined in.
+
+    Returns:
+        tuple[Callable[[str], Any], Callable[[], list[str]]]: The package's `__getattr__` and `__dir__`.
+
+    """
+
+    def __getattr__(name: str) -> Any:
+        if (module := lazy.get(name)) is None:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+        value = getattr(importlib.import_module(module), name)
+        # Cache on the package so `__getattr__` isn't called again.
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted([*vars(sys.modules[package]), *lazy])
+
+    return __getattr__, __dir__
@@ -0,0 +1,274 @@
+"""Lightweight instrumentation: counters, timing histograms and spans.
+
+Metrics are off by default and cost a single boolean check per call site while
+disabled. Enable them with `enable()` or the `AI_NEWS_METRICS=1` environment
+variable, then export with `to_prometheus()` or `spans()`.
+
+    with metrics.timer('news_api_request_seconds', endpoint='everything'):
+        response = client.get_everything(...)
+    metrics.increment('articles_fetched_total', status='ok')
+
+"""
+
+import bisect
+import contextvars
+import functools
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, ParamSpec, TypeVar
+
+P = ParamSpec('P')
+R = TypeVar('R')
+
+# Prefix of exported metric names.
+NAMESPACE = 'ai_news'
+
+# Upper bounds of the timing histogram buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+# Shared no-op timer returned while metrics are disabled.
+_DISABLED: AbstractContextManager[None] = nullcontext()
+
+
+@dataclass
+class Histogram:
+    """Cumulative distribution of observed values."""
+
+    buckets: tuple[float, ...] = BUCKETS
+    counts: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+    count: int = 0
+    sum: float = 0.0
+    max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate of the `q` quantile: upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+@dataclass(frozen=True)
+class Span:
+    """Finished timed operation, shaped after an OpenTelemetry span."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None
+    start_time_unix_nano: int
+    end_time_unix_nano: int
+    attributes: dict[str, str]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_span_id': self.parent_span_id,
+            'start_time_unix_nano': self.start_time_unix_nano,
+            'end_time_unix_nano': self.end_time_unix_nano,
+            'attributes': self.attributes,
+        }
+
+
+class Registry:
+    """Thread-safe store of counters, histograms and recently finished spans."""
+
+    def __init__(self, max_spans: int = 10_000) -> None:
+        """Create empty registry.
+
+        Args:
+            max_spans (int, optional): Number of most recent spans kept.
+                Defaults to 10,000.
+
+        """
+        self.enabled = os.environ.get('AI_NEWS_METRICS', '').lower() in ('1', 'true', 'yes')
+
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+        # (trace_id, span_id) of the span open in the current context.
+        self._current: contextvars.ContextVar[tuple[str, str] | None] = contextvars.ContextVar(
+            'ai_news_span', default=None
+        )
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add `value` to counter `name`."""
+        if not self.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            counter = self._counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record `value` in histogram `name`."""
+        if not self.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            self._histograms.setdefault(name, {}).setdefault(key, Histogram()).observe(value)
+
+    def timer(self, name: str, **labels: str) -> AbstractContextManager[None]:
+        """Time the block into histogram `name` (in seconds) and record it as a span."""
+        if not self.enabled:
+            return _DISABLED
+        return self._span(name, labels)
+
+    @contextmanager
+    def _span(self, name: str, labels: dict[str, str]) -> Iterator[None]:
+        parent = self._current.get()
+        trace_id = parent[0] if parent else secrets.token_hex(16)
+        span_id = secrets.token_hex(8)
+        token = self._current.set((trace_id, span_id))
+        start_ns, start = time.time_ns(), time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._current.reset(token)
+            self.observe(name, elapsed, **labels)
+            self._spans.append(
+                Span(
+                    name=name,
+                    trace_id=trace_id,
+                    span_id=span_id,
+                    parent_span_id=parent[1] if parent else None,
+                    start_time_unix_nano=start_ns,
+                    end_time_unix_nano=start_ns + int(elapsed * 1e9),
+                    attributes=dict(labels),
+                )
+            )
+
+    def timed(self, name: str, **labels: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+        """Decorator timing every call of a function, see `timer`."""
+
+        def decorator(fn: Callable[P, R]) -> Callable[P, R]:
+            @functools.wraps(fn)
+            def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.timer(name, **labels):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def spans(self) -> list[dict[str, Any]]:
+        """Recently finished spans as OpenTelemetry-style dicts, oldest first."""
+        return [span.to_dict() for span in list(self._spans)]
+
+    def summary(self) -> list[dict[str, Any]]:
+        """One row per counter and histogram series, for display."""
+        rows: list[dict[str, Any]] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                for labels, histogram in series.items():
+                    rows.append(
+                        {
+                            'metric': _series(name, labels),
+                            'count': histogram.count,
+                            'total (s)': round(histogram.sum, 3),
+                            'mean (s)': round(histogram.mean, 3),
+                            'p95 (s)': round(histogram.quantile(0.95), 3),
+                            'max (s)': round(histogram.max, 3),
+                        }
+                    )
+            for name, counter in sorted(self._counters.items()):
+                for labels, value in counter.items():
+                    rows.append({'metric': _series(name, labels), 'count': value})
+        return rows
+
+    def to_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            for name, counter in sorted(self._counters.items()):
+                metric = f'{NAMESPACE}_{name}'
+                lines.append(f'# TYPE {metric} counter')
+                lines.extend(f'{_series(metric, labels)} {value}' for labels, value in counter.items())
+
+            for name, series in sorted(self._histograms.items()):
+                metric = f'{NAMESPACE}_{name}'
+                lines.append(f'# TYPE {metric} histogram')
+                for labels, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip((*histogram.buckets, float('inf')), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f'{_series(f"{metric}_bucket", labels + (("le", le),))} {cumulative}')
+                    lines.append(f'{_series(f"{metric}_sum", labels)} {histogram.sum}')
+                    lines.append(f'{_series(f"{metric}_count", labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        """Drop every recorded metric and span."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._spans.clear()
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _series(name: str, labels: Labels) -> str:
+    """Metric name with its labels, e.g. `name{endpoint="everything"}`."""
+    if not labels:
+        return name
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return name + '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+# Process-wide registry used by the module-level helpers.
+REGISTRY = Registry()
+
+increment = REGISTRY.increment
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+spans = REGISTRY.spans
+summary = REGISTRY.summary
+to_prometheus = REGISTRY.to_prometheus
+reset = REGISTRY.reset
+
+
+def enable() -> None:
+    """Start recording metrics."""
+    REGISTRY.enabled = True
+
+
+def disable() -> None:
+    """Stop recording metrics. Recorded metrics are kept."""
+    REGISTRY.enabled = False
+
+
+def is_enabled() -> bool:
+    """Whether metrics are being recorded."""
+    return REGISTRY.enabled
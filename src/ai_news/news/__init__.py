@@ -1,10 +1,41 @@
+from typing import TYPE_CHECKING
+
+from ai_news._lazy import lazy_attributes
+from ai_news.news.cache import ArticleCache, CacheStats
+from ai_news.news.catalog import SourceCatalog
+from ai_news.news.compact import CompactNewsArticle, CompactSource
 from ai_news.news.news import News
+from ai_news.news.pipeline import ExtractionPipeline
+from ai_news.news.throttle import CircuitBreaker, DomainThrottle
+from ai_news.news.transport import LiveTransport, RecordingTransport, ReplayTransport, Transport
 from ai_news.news.util import Category, Source, NewsArticle
 
+if TYPE_CHECKING:
+    from ai_news.news.async_news import AsyncNews
+
+# Imported on first access: aiohttp is slow to import and only needed by `AsyncNews`.
+_LAZY = {
+    'AsyncNews': 'ai_news.news.async_news',
+}
+
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY)
 
 __all__ = [
+    'ArticleCache',
+    'AsyncNews',
+    'CacheStats',
+    'CircuitBreaker',
     'Category',
+    'CompactNewsArticle',
+    'CompactSource',
+    'DomainThrottle',
+    'ExtractionPipeline',
+    'LiveTransport',
     'News',
     'NewsArticle',
+    'RecordingTransport',
+    'ReplayTransport',
     'Source',
+    'SourceCatalog',
+    'Transport',
 ]
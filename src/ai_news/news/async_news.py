@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
+from functools import partial
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Self, TypeVar
+from urllib.parse import urlsplit
+
+import aiohttp
+from dotenv import load_dotenv
+from trafilatura import extract
+
+from ai_news import metrics
+from ai_news.news.cache import ArticleCache
+from ai_news.news.news import MAX_PAGE_SIZE, News
+from ai_news.news.util import Category, NewsArticle, NewsException, Source
+
+if TYPE_CHECKING:
+    from llama_index.core import Document
+
+load_dotenv()
+
+T = TypeVar('T')
+
+NEWS_API_URL = 'https://newsapi.org/v2'
+
+# Browser-like user agent, some publishers refuse the default aiohttp one.
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64; rv:126.0) Gecko/20100101 Firefox/126.0'
+
+
+class AsyncNews:
+    """Asyncio News API client sharing one pooled HTTP session.
+
+    All News API calls and article downloads go through a single keep-alive
+    `aiohttp.ClientSession`. `max_connections_per_host` bounds concurrent
+    requests to any one host and `max_in_flight` bounds concurrent requests
+    overall, so hundreds of article URLs can be crawled from a single event loop.
+
+    Use as an async context manager, or call `close()` when done:
+
+        async with AsyncNews() as news:
+            articles = await news.get_articles(q='artificial intelligence')
+
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        cache: ArticleCache | None = None,
+        base_url: str = NEWS_API_URL,
+        max_in_flight: int = 64,
+        max_connections_per_host: int = 8,
+        keepalive_timeout: float = 30.0,
+        timeout: float = 30.0,
+    ) -> None:
+        """Create async News API client.
+
+        Args:
+            api_key (str, optional): News API key.
+                Defaults to None. Loaded from environment variables.
+            cache (ArticleCache, optional): Cache of extracted article contents.
+                Defaults to None.
+            base_url (str, optional): News API base URL, e.g. a local stub server.
+                Defaults to 'https://newsapi.org/v2'.
+            max_in_flight (int, optional): Maximum concurrent requests overall.
+                Defaults to 64.
+            max_connections_per_host (int, optional): Maximum concurrent connections per host.
+                Defaults to 8.
+            keepalive_timeout (float, optional): Seconds to keep idle connections open.
+                Defaults to 30.
+            timeout (float, optional): Total timeout of a single request in seconds.
+                Defaults to 30.
+
+        """
+        self._api_key = api_key or os.environ['NEWS_API_KEY']
+        self._cache = cache
+        self._base_url = base_url.rstrip('/')
+        self._max_in_flight = max_in_flight
+        self._max_connections_per_host = max_connections_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+
+        self._session: aiohttp.ClientSession | None = None
+        self._in_flight: asyncio.Semaphore | None = None
+        self._hosts: defaultdict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self._max_connections_per_host)
+        )
+
+    async def __aenter__(self) -> Self:
+        self._get_session()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_sources(
+        self,
+        category: Category | None = None,
+        language: str = 'en',
+        country: str | None = None,
+    ) -> list[Source]:
+        """Get available news sources. See `News.get_sources`."""
+        result = await self._get_json(
+            '/top-headlines/sources',
+            {
+                'category': str(category) if category else None,
+                'language': language,
+                'country': country,
+            },
+        )
+        return News._parse_sources(
+            result['sources'],
+            category=category,
+            language=language,
+            country=country,
+        )
+
+    async def get_top_headlines(
+        self,
+        q: str | None = None,
+        qintitle: str | None = None,
+        sources: list[Source] | None = None,
+        category: str | None = None,
+        country: str | None = None,
+        language: str = 'en',
+    ) -> list[NewsArticle]:
+        """Get top news article headlines. See `News.get_top_headlines`."""
+        if (sources is not None) and ((country is not None) or (category is not None)):
+            raise ValueError('cannot mix country/category param with sources param.')
+
+        response = await self._get_json(
+            '/top-headlines',
+            {
+                'q': q,
+                'qInTitle': qintitle,
+                'sources': Source.source_ids(sources=sources),
+                'category': category,
+                'language': language,
+                'country': country,
+            },
+        )
+        return await self._gather(News._to_news_article, response['articles'])
+
+    async def get_articles(
+        self,
+        q: str | None = None,
+        qintitle: str | None = None,
+        sources: list[Source] | None = None,
+        domains: list[str] | None = None,
+        exclude_domains: list[str] | None = None,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        language: str = 'en',
+        sort_by: str | None = None,
+        max_articles: int = MAX_PAGE_SIZE,
+    ) -> list[NewsArticle]:
+        """Get news articles with their full contents. See `News.get_articles`."""
+        articles = [
+            article
+            async for article in self.iter_everything(
+                q=q,
+                qintitle=qintitle,
+                sources=sources,
+                domains=domains,
+                exclude_domains=exclude_domains,
+                from_date=from_date,
+                to_date=to_date,
+                language=language,
+                sort_by=sort_by,
+                max_articles=max_articles,
+            )
+        ]
+        return await self._gather(News._to_news_article, articles)
+
+    async def get_documents(
+        self,
+        q: str | None = None,
+        qintitle: str | None = None,
+        sources: list[Source] | None = None,
+        domains: list[str] | None = None,
+        exclude_domains: list[str] | None = None,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        language: str = 'en',
+        sort_by: str | None = None,
+        max_articles: int = MAX_PAGE_SIZE,
+    ) -> list[Document]:
+        """Get and parse news into list of `Document`. See `News.get_documents`."""
+        articles = [
+            article
+            async for article in self.iter_everything(
+                q=q,
+                qintitle=qintitle,
+                sources=sources,
+                domains=domains,
+                exclude_domains=exclude_domains,
+                from_date=from_date,
+                to_date=to_date,
+                language=language,
+                sort_by=sort_by,
+                max_articles=max_articles,
+            )
+        ]
+        return await self._gather(News._to_document, articles)
+
+    async def iter_everything(
+        self,
+        q: str | None = None,
+        qintitle: str | None = None,
+        sources: list[Source] | None = None,
+        domains: list[str] | None = None,
+        exclude_domains: list[str] | None = None,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        language: str = 'en',
+        sort_by: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        max_articles: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Page through all news articles. See `News.iter_everything`."""
+        page_size = min(page_size, MAX_PAGE_SIZE)
+        if max_articles is not None:
+            page_size = min(page_size, max_articles)
+
+        count, page = 0, 1
+        while max_articles is None or count < max_articles:
+            try:
+                response = await self._get_json(
+                    '/everything',
+                    {
+                        'q': q,
+                        'qInTitle': qintitle,
+                        'sources': Source.source_ids(sources=sources),
+                        'domains': ','.join(domains) if domains else None,
+                        'excludeDomains': ','.join(exclude_domains) if exclude_domains else None,
+                        'from': from_date.strftime('%Y-%m-%dT%H:%M:%S') if from_date is not None else None,
+                        'to': to_date.strftime('%Y-%m-%dT%H:%M:%S') if to_date is not None else None,
+                        'language': language,
+                        'sortBy': sort_by,
+                        'page': page,
+                        'pageSize': page_size,
+                    },
+                )
+            except NewsException as e:
+                # Developer accounts can only page through the first 100 results.
+                if 'maximumResultsReached' in str(e):
+                    return
+                raise
+
+            articles: list[dict[str, Any]] = response['articles']
+            for article in articles:
+                if max_articles is not None and count >= max_articles:
+                    return
+                yield article
+                count += 1
+
+            if not articles or page * page_size >= response['totalResults']:
+                return
+            page += 1
+
+    async def fetch_article_content(self, url: str) -> str | None:
+        """Fetch article contents from the cache, falling back to the URL.
+
+        Args:
+            url (str): URL of the article.
+
+        Returns:
+            str | None: Markdown content of the url or None if it failed.
+
+        """
+        if self._cache is not None and (content := self._cache.get(url)) is not None:
+            metrics.increment('article_cache_total', result='hit')
+            return content
+
+        if self._cache is not None:
+            metrics.increment('article_cache_total', result='miss')
+        try:
+            async with self._limit(url):
+                with metrics.timer('article_download_seconds'):
+                    async with self._get_session().get(url, headers={'User-Agent': USER_AGENT}) as response:
+                        if response.status != 200:
+                            metrics.increment('articles_fetched_total', status='failed')
+                            return None
+                        downloaded = await response.text(errors='replace')
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            metrics.increment('articles_fetched_total', status='failed')
+            return None
+
+        # Extract information from HTML off the event loop.
+        loop = asyncio.get_running_loop()
+        with metrics.timer('article_extract_seconds'):
+            content = await loop.run_in_executor(
+                None,
+                partial(extract, downloaded, include_links=True),
+            )
+        metrics.increment('articles_fetched_total', status='ok' if content is not None else 'failed')
+
+        if self._cache is not None and content is not None:
+            self._cache.set(url, content)
+        return content
+
+    async def _gather(
+        self,
+        build: Callable[[dict[str, Any], str | None], T],
+        articles: list[dict[str, Any]],
+    ) -> list[T]:
+        """Fetch all article contents concurrently and `build` objects from them."""
+        contents = await asyncio.gather(
+            *(self.fetch_article_content(article['url']) for article in articles),
+        )
+        return [build(article, content) for article, content in zip(articles, contents)]
+
+    async def _get_json(self, endpoint: str, params: dict[str, Any]) -> dict[str, Any]:
+        """Call a News API endpoint and return the json response."""
+        params = {key: value for key, value in params.items() if value is not None}
+        url = f'{self._base_url}{endpoint}'
+
+        async with self._limit(url):
+            with metrics.timer('news_api_request_seconds', endpoint=endpoint.strip('/')):
+                async with self._get_session().get(
+                    url,
+                    params=params,
+                    headers={'X-Api-Key': self._api_key},
+                ) as response:
+                    result: dict[str, Any] = await response.json(content_type=None)
+
+        if result.get('status') != 'ok':
+            raise NewsException(f"{result.get('code')}: {result.get('message')}")
+        return result
+
+    def _limit(self, url: str) -> '_Limit':
+        """Global in-flight and per-host concurrency limit for `url`."""
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self._max_in_flight)
+        # Wait for the host slot first so a busy host doesn't hold global slots.
+        return _Limit(self._hosts[urlsplit(url).netloc], self._in_flight)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Lazily create the pooled session inside the running event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._max_in_flight,
+                limit_per_host=self._max_connections_per_host,
+                keepalive_timeout=self._keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._timeout,
+            )
+        return self._session
+
+
+class _Limit:
+    """Acquire several semaphores in order, release them in reverse."""
+
+    def __init__(self, *semaphores: asyncio.Semaphore) -> None:
+        self._semaphores = semaphores
+
+    async def __aenter__(self) -> None:
+        acquired: list[asyncio.Semaphore] = []
+        try:
+            for semaphore in self._semaphores:
+                await semaphore.acquire()
+                acquired.append(semaphore)
+        except BaseException:
+            # Cancelled while waiting on a later semaphore: give back what we hold.
+            for semaphore in reversed(acquired):
+                semaphore.release()
+            raise
+
+    async def __aexit__(self, *args: Any) -> None:
+        for semaphore in reversed(self._semaphores):
+            semaphore.release()
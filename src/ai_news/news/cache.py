@@ -0,0 +1,193 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class CacheStats:
+    """Article cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ArticleCache:
+    """Persistent URL-keyed cache for extracted article contents.
+
+    Entries are stored in a SQLite database under `path`, keyed by the SHA-256
+    hash of the article URL. Entries older than `ttl` seconds are treated as
+    misses, and the least recently used entries are evicted once the total size
+    of the stored contents exceeds `max_size` bytes.
+
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS articles (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            content TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS articles_accessed_at ON articles (accessed_at);
+    """
+
+    def __init__(
+        self,
+        path: str = 'res/article_cache',
+        ttl: float | None = 7 * 24 * 60 * 60,
+        max_size: int = 256 * 1024 * 1024,
+    ) -> None:
+        """Open (or create) the article cache.
+
+        Args:
+            path (str, optional): Directory to store the cache database in.
+                Defaults to 'res/article_cache'.
+            ttl (float, optional): Time to live of an entry in seconds. None never expires.
+                Defaults to 7 days.
+            max_size (int, optional): Maximum total size of cached contents in bytes.
+                Defaults to 256 MiB.
+
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stats = CacheStats()
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(path, 'articles.sqlite3'),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(self._SCHEMA)
+
+    @staticmethod
+    def key(url: str) -> str:
+        """Cache key for a given URL."""
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def get(self, url: str) -> str | None:
+        """Get cached content for `url`.
+
+        Args:
+            url (str): URL of the article.
+
+        Returns:
+            str | None: Cached content or None if missing or expired.
+
+        """
+        key = ArticleCache.key(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT content, created_at FROM articles WHERE key = ?',
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                self.stats.misses += 1
+                return None
+
+            content, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute('DELETE FROM articles WHERE key = ?', (key,))
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._conn.execute(
+                'UPDATE articles SET accessed_at = ? WHERE key = ?',
+                (now, key),
+            )
+            self.stats.hits += 1
+
+        cached: str = content
+        return cached
+
+    def set(self, url: str, content: str) -> None:
+        """Store content for `url`, evicting least recently used entries if needed.
+
+        Args:
+            url (str): URL of the article.
+            content (str): Extracted article content.
+
+        """
+        size = len(content.encode('utf-8'))
+        if size > self.max_size:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?)',
+                (ArticleCache.key(url), url, content, size, now, now),
+            )
+            self._evict()
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT created_at FROM articles WHERE key = ?',
+                (ArticleCache.key(url),),
+            ).fetchone()
+        return row is not None and (self.ttl is None or time.time() - row[0] <= self.ttl)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute('SELECT COUNT(*) FROM articles').fetchone()
+        return int(count)
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached contents in bytes."""
+        with self._lock:
+            (size,) = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM articles').fetchone()
+        return int(size)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._conn.execute('DELETE FROM articles')
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        """Evict expired, then least recently used entries until under `max_size`."""
+        if self.ttl is not None:
+            cursor = self._conn.execute(
+                'DELETE FROM articles WHERE created_at < ?',
+                (time.time() - self.ttl,),
+            )
+            self.stats.expirations += max(cursor.rowcount, 0)
+
+        (total,) = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM articles').fetchone()
+        if total <= self.max_size:
+            return
+
+        keys: list[str] = []
+        for key, size in self._conn.execute('SELECT key, size FROM articles ORDER BY accessed_at ASC'):
+            if total <= self.max_size:
+                break
+            keys.append(key)
+            total -= size
+
+        self._conn.executemany('DELETE FROM articles WHERE key = ?', [(key,) for key in keys])
+        self.stats.evictions += len(keys)
@@ -0,0 +1,226 @@
+import json
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+from typing import Any, ClassVar, Self
+
+from ai_news import metrics
+from ai_news.news.transport import Transport
+from ai_news.news.util import Category, NewsException, Source
+
+
+class SourceCatalog:
+    """Catalog of all News API sources, loaded once and shared by every user of a transport.
+
+    The full source list is fetched once, persisted to `path` and reused until it
+    is older than `ttl` seconds. Sources are indexed by id, name, category,
+    language and country, and articles resolve their source to the shared
+    `Source` instance instead of building a new one each time.
+
+    """
+
+    # Dropped once no `News` uses the catalog anymore; a live catalog keeps its client's id from being reused.
+    _shared: ClassVar[weakref.WeakValueDictionary[tuple[str, int], 'SourceCatalog']] = weakref.WeakValueDictionary()
+    _shared_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        client: Transport,
+        path: str | None = 'res/sources.json',
+        ttl: float = 24 * 60 * 60,
+    ) -> None:
+        """Create (unloaded) source catalog.
+
+        Args:
+            client (Transport): Transport used to fetch the sources.
+            path (str, optional): JSON file to persist the sources to. None keeps them in memory only.
+                Defaults to 'res/sources.json'.
+            ttl (float, optional): Seconds before the sources are fetched again.
+                Defaults to 1 day.
+
+        """
+        self._client = client
+        self.path = path
+        self.ttl = ttl
+
+        self._lock = threading.RLock()
+        self._loaded_at: float | None = None
+        self._by_id: dict[str, Source] = {}
+        self._by_name: dict[str, Source] = {}
+        # Source ids by category, language and country.
+        self._by_category: defaultdict[str, set[str]] = defaultdict(set)
+        self._by_language: defaultdict[str, set[str]] = defaultdict(set)
+        self._by_country: defaultdict[str, set[str]] = defaultdict(set)
+
+    @classmethod
+    def shared(
+        cls,
+        client: Transport,
+        path: str | None = 'res/sources.json',
+        ttl: float = 24 * 60 * 60,
+    ) -> Self:
+        """Get the catalog of `client` persisted at `path`, creating it on first use.
+
+        Keyed by the client too, so a catalog never fetches sources through another
+        `News` instance's transport (e.g. a recording or replaying one).
+
+        """
+        key = (path or ':memory:', id(client))
+        with cls._shared_lock:
+            if (catalog := cls._shared.get(key)) is None:
+                catalog = cls(client=client, path=path, ttl=ttl)
+                cls._shared[key] = catalog
+        return catalog  # type: ignore[return-value]
+
+    @property
+    def sources(self) -> list[Source]:
+        """All sources in the catalog."""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._by_id.values())
+
+    def get(self, id: str | None = None, name: str | None = None) -> Source | None:
+        """Look up a source by id or name.
+
+        Args:
+            id (str, optional): Source id.
+                Defaults to None.
+            name (str, optional): Source name.
+                Defaults to None.
+
+        Returns:
+            Source | None: Matching source or None.
+
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if id is not None and (source := self._by_id.get(id)) is not None:
+                return source
+            if name is not None:
+                return self._by_name.get(name)
+            return None
+
+    def filter(
+        self,
+        category: Category | None = None,
+        language: str = 'en',
+        country: str | None = None,
+    ) -> list[Source]:
+        """Sources matching the given category, language and country.
+
+        Args:
+            category (Category, optional): News category.
+                Default is None.
+            language (str, optional): News language.
+                Default is 'en'.
+            country (str, optional): Two letter country code.
+                Default is None.
+
+        Returns:
+            list[Source]: Matching sources.
+
+        """
+        with self._lock:
+            self._ensure_loaded()
+            ids = self._by_language.get(language, set())
+            if category is not None:
+                ids = ids & self._by_category.get(str(category), set())
+            if country is not None:
+                ids = ids & self._by_country.get(country, set())
+            return [source for id, source in self._by_id.items() if id in ids]
+
+    def resolve(self, source: dict[str, Any]) -> Source:
+        """Resolve an article's `source` json to the shared `Source` instance.
+
+        Sources missing from the catalog (e.g. blogs) are added to it, so every
+        article from them shares one instance too.
+
+        Args:
+            source (dict[str, Any]): Article source json, with `id` and `name`.
+
+        Returns:
+            Source: Shared source instance.
+
+        """
+        with self._lock:
+            if (found := self.get(id=source['id'], name=source['name'])) is None:
+                found = Source(id=source['id'], name=source['name'])
+                self._by_name[found.name] = found
+        return found
+
+    def load(self, refresh: bool = False) -> None:
+        """Load sources from disk, or from the News API if missing, stale or `refresh`.
+
+        Args:
+            refresh (bool, optional): Ignore persisted sources and fetch them again.
+                Defaults to False.
+
+        """
+        with self._lock:
+            data = None if refresh else self._read()
+            if data is None:
+                with metrics.timer('news_api_request_seconds', endpoint='top-headlines/sources'):
+                    result = self._client.get_sources()
+                if result['status'] != 'ok':
+                    raise NewsException('Something went wrong')
+                data = {'fetched_at': time.time(), 'sources': result['sources']}
+                self._write(data)
+
+            self._index(data['sources'])
+            self._loaded_at = data['fetched_at']
+
+    def _ensure_loaded(self) -> None:
+        """Load the catalog on first use or once it's older than `ttl`. Call with the lock held."""
+        if self._loaded_at is None or time.time() - self._loaded_at > self.ttl:
+            self.load()
+
+    def _index(self, sources: list[dict[str, Any]]) -> None:
+        """Rebuild the lookup tables from sources json."""
+        self._by_id.clear()
+        self._by_name.clear()
+        self._by_category.clear()
+        self._by_language.clear()
+        self._by_country.clear()
+
+        for source in sources:
+            s = Source(
+                id=source['id'],
+                name=source['name'],
+                description=source['description'],
+                url=source['url'],
+                category=Category.from_str(source['category']),
+                language=source['language'],
+                country=source['country'],
+            )
+            self._by_id[s.id] = s
+            self._by_name[s.name] = s
+            self._by_category[source['category']].add(s.id)
+            self._by_language[s.language].add(s.id)
+            self._by_country[source['country']].add(s.id)
+
+    def _read(self) -> dict[str, Any] | None:
+        """Persisted sources, if they exist and are younger than `ttl`."""
+        if self.path is None or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data: dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            # E.g. truncated by a crash before writes were atomic: fetch the sources again.
+            return None
+        if time.time() - data['fetched_at'] > self.ttl:
+            return None
+        return data
+
+    def _write(self, data: dict[str, Any]) -> None:
+        """Atomically persist sources to `path`, so a crash or another process never sees a partial file."""
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Unique per process and thread, catalogs of several clients may share `path`.
+        tmp = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
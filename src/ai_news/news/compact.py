@@ -0,0 +1,136 @@
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import ClassVar, Protocol, Self
+
+from ai_news.news.util import Category, NewsArticle, Source
+
+
+class ContentStore(Protocol):
+    """Backing store of article contents keyed by URL, e.g. `ArticleCache`."""
+
+    def get(self, url: str) -> str | None: ...
+
+    def set(self, url: str, content: str) -> None: ...
+
+
+@dataclass(frozen=True, slots=True)
+class CompactSource:
+    """Immutable, interned counterpart of `Source`.
+
+    Use `CompactSource.intern` so that every article from the same source
+    references a single instance.
+
+    """
+
+    id: str | None
+    name: str
+    category: Category | None = field(default=None, compare=False)
+    language: str = field(default='en', repr=False, compare=False)
+    country: str | None = field(default=None, repr=False, compare=False)
+
+    _pool: ClassVar[dict[tuple[str | None, str], 'CompactSource']] = {}
+    _pool_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def intern(cls, source: Source) -> Self:
+        """Get the shared compact instance of `source`."""
+        key = (source.id, source.name)
+        with cls._pool_lock:
+            if (compact := cls._pool.get(key)) is None:
+                compact = cls._pool[key] = cls(
+                    id=sys.intern(source.id) if source.id else None,
+                    name=sys.intern(source.name),
+                    category=source.category,
+                    language=sys.intern(source.language),
+                    country=source.country,
+                )
+        return compact  # type: ignore[return-value]
+
+
+@dataclass(frozen=True, slots=True)
+class CompactNewsArticle:
+    """Memory-compact, immutable counterpart of `NewsArticle`.
+
+    No per-instance `__dict__`, an interned `CompactSource` and optionally no
+    content: when `body` is None, `content` is loaded from `store` by URL on every
+    access instead of being held in memory. The store must keep the contents for
+    as long as the articles live, e.g. an `ArticleCache` without `ttl` and with a
+    `max_size` larger than all of them.
+
+    """
+
+    title: str
+    author: str | None = field(repr=False)
+    description: str | None = field(repr=False)
+    published_at: datetime = field(repr=False)
+    source: CompactSource = field(repr=False)
+    url: str = field(repr=False)
+    image_url: str | None = field(repr=False)
+    body: str | None = field(default=None, repr=False, compare=False)
+    store: ContentStore | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def content(self) -> str:
+        """Article content, loaded from `store` if it isn't held in `body`.
+
+        Raises:
+            KeyError: The store no longer has the content, e.g. it was evicted.
+
+        """
+        if self.body is not None:
+            return self.body
+        if self.store is None:
+            return ''
+        if (content := self.store.get(self.url)) is None:
+            raise KeyError(f'Content of {self.url} is missing from the store.')
+        return content
+
+    @classmethod
+    def from_article(cls, article: NewsArticle, store: ContentStore | None = None) -> Self:
+        """Create compact article from a `NewsArticle`.
+
+        Args:
+            article (NewsArticle): Article to convert.
+            store (ContentStore, optional): Store to move the content into. The content
+                is kept in memory if None.
+                Defaults to None.
+
+        Returns:
+            CompactNewsArticle: Compact article.
+
+        """
+        if store is not None:
+            store.set(article.url, article.content)
+
+        return cls(
+            title=article.title,
+            author=sys.intern(article.author) if article.author else None,
+            description=article.description,
+            published_at=article.published_at,
+            source=CompactSource.intern(article.source),
+            url=article.url,
+            image_url=article.image_url,
+            body=article.content if store is None else None,
+            store=store,
+        )
+
+    def to_article(self) -> NewsArticle:
+        """Convert back to a (mutable) `NewsArticle`, loading its content."""
+        return NewsArticle(
+            title=self.title,
+            author=self.author,  # type: ignore[arg-type]
+            content=self.content,
+            description=self.description,  # type: ignore[arg-type]
+            published_at=self.published_at,
+            source=Source(
+                id=self.source.id,  # type: ignore[arg-type]
+                name=self.source.name,
+                category=self.source.category,
+                language=self.source.language,
+                country=self.source.country,
+            ),
+            url=self.url,
+            image_url=self.image_url,  # type: ignore[arg-type]
+        )
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import os
+import re
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from pyarrow.fs import LocalFileSystem
+
+from ai_news.news.util import FILTER_METADATA_KEYS, Category, NewsArticle, filter_metadata
+
+if TYPE_CHECKING:
+    from llama_index.core import Document
+
+SCHEMA = pa.schema(
+    [
+        ('title', pa.string()),
+        ('author', pa.string()),
+        ('description', pa.string()),
+        ('content', pa.large_string()),
+        ('url', pa.string()),
+        ('image_url', pa.string()),
+        ('published_at', pa.timestamp('s', tz='UTC')),
+        # `published_at` metadata as fetched, e.g. '2024-05-20T10:00:00Z'.
+        ('published_at_text', pa.string()),
+        ('source_id', pa.string()),
+        ('source_name', pa.string()),
+        ('category', pa.string()),
+        # Partition columns.
+        ('date', pa.string()),
+        ('source', pa.string()),
+    ]
+)
+
+# Publish date format of the News API, used for rows written without one.
+PUBLISHED_AT_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+PARTITIONING = ds.partitioning(
+    pa.schema([('date', pa.string()), ('source', pa.string())]),
+    flavor='hive',
+)
+
+
+def write_articles(articles: list[NewsArticle], path: str = 'res/articles') -> int:
+    """Append articles to a Parquet dataset partitioned by publish date and source.
+
+    Articles whose URL is already in the dataset are skipped.
+
+    Args:
+        articles (list[NewsArticle]): Articles to write.
+        path (str, optional): Root directory of the dataset.
+            Defaults to 'res/articles'.
+
+    Returns:
+        int: Number of articles written.
+
+    """
+    records = [
+        _record(
+            title=article.title,
+            author=article.author,
+            description=article.description,
+            content=article.content,
+            url=article.url,
+            image_url=article.image_url,
+            published_at=article.published_at,
+            published_at_text=_utc(article.published_at).strftime(PUBLISHED_AT_FORMAT),
+            source_id=article.source.id,
+            source_name=article.source.name,
+            category=str(article.source.category) if article.source.category else None,
+        )
+        for article in articles
+    ]
+    return _write(records, path)
+
+
+def write_documents(documents: list[Document], path: str = 'res/articles') -> int:
+    """Append news documents (see `News.get_documents`) to a Parquet dataset.
+
+    Documents whose URL is already in the dataset are skipped.
+
+    Args:
+        documents (list[Document]): News documents to write.
+        path (str, optional): Root directory of the dataset.
+            Defaults to 'res/articles'.
+
+    Returns:
+        int: Number of documents written.
+
+    """
+    records = [
+        _record(
+            title=document.metadata['title'],
+            author=document.metadata['author'],
+            description=document.metadata['description'],
+            content=document.text,
+            url=document.metadata['url'],
+            image_url=document.metadata['image_url'],
+            published_at=datetime.fromisoformat(document.metadata['published_at']),
+            published_at_text=document.metadata['published_at'],
+            source_id=None,
+            source_name=document.metadata['source'],
+            category=document.metadata.get('category'),
+        )
+        for document in documents
+    ]
+    return _write(records, path)
+
+
+def iter_documents(
+    path: str = 'res/articles',
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    sources: list[str] | None = None,
+    batch_size: int = 1024,
+) -> Iterator[Document]:
+    """Rebuild news `Document`s from a Parquet dataset using memory-mapped reads.
+
+    Date and source filters prune whole partitions before any file is read.
+
+    Args:
+        path (str, optional): Root directory of the dataset.
+            Defaults to 'res/articles'.
+        from_date (datetime, optional): Oldest article allowed.
+            Defaults to None.
+        to_date (datetime, optional): Newest article allowed.
+            Defaults to None.
+        sources (list[str], optional): Source names to restrict to.
+            Defaults to None.
+        batch_size (int, optional): Number of rows read at a time.
+            Defaults to 1024.
+
+    Yields:
+        Document: News document, with the same metadata as `News.get_documents`
+            and an id derived from its URL.
+
+    """
+    from llama_index.core import Document
+
+    dataset = ds.dataset(
+        path,
+        schema=SCHEMA,
+        format='parquet',
+        partitioning=PARTITIONING,
+        filesystem=LocalFileSystem(use_mmap=True),
+    )
+
+    timestamp = SCHEMA.field('published_at').type
+    expression: ds.Expression | None = None
+    conditions: list[ds.Expression] = []
+    if from_date is not None:
+        conditions.append(ds.field('date') >= _date(from_date))
+        conditions.append(ds.field('published_at') >= pa.scalar(_utc(from_date), type=timestamp))
+    if to_date is not None:
+        conditions.append(ds.field('date') <= _date(to_date))
+        conditions.append(ds.field('published_at') <= pa.scalar(_utc(to_date), type=timestamp))
+    if sources:
+        conditions.append(ds.field('source').isin([_partition_value(source) for source in sources]))
+        conditions.append(ds.field('source_name').isin(sources))
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    for batch in dataset.to_batches(filter=expression, batch_size=batch_size):
+        # Rows written before the fetched publish date was stored get the News API format.
+        published_at = pc.coalesce(
+            batch.column('published_at_text'),
+            pc.strftime(batch.column('published_at'), format=PUBLISHED_AT_FORMAT),
+        ).to_pylist()
+        columns = batch.to_pydict()
+        for i in range(batch.num_rows):
+            category = columns['category'][i]
+            yield Document(
+                id_=_document_id(columns['url'][i]),
+                text=columns['content'][i],
+                metadata={
+                    'title': columns['title'][i],
+                    'author': columns['author'][i],
+                    'source': columns['source_name'][i],
+                    'description': columns['description'][i],
+                    'published_at': published_at[i],
+                    'url': columns['url'][i],
+                    'image_url': columns['image_url'][i],
+                    **filter_metadata(published_at[i], Category.from_str(category) if category else None),
+                },
+                excluded_embed_metadata_keys=list(FILTER_METADATA_KEYS),
+                excluded_llm_metadata_keys=list(FILTER_METADATA_KEYS),
+            )
+
+
+def read_documents(
+    path: str = 'res/articles',
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    sources: list[str] | None = None,
+) -> list[Document]:
+    """Rebuild all matching news `Document`s from a Parquet dataset. See `iter_documents`."""
+    return list(iter_documents(path=path, from_date=from_date, to_date=to_date, sources=sources))
+
+
+def _document_id(url: str) -> str:
+    """Stable id of the document of the article at `url`."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, url))
+
+
+def _record(published_at: datetime, source_name: str, **fields: Any) -> dict[str, Any]:
+    """Dataset row, including its partition columns."""
+    published_at = _utc(published_at)
+    return {
+        **fields,
+        'published_at': published_at,
+        'source_name': source_name,
+        'date': _date(published_at),
+        'source': _partition_value(source_name),
+    }
+
+
+def _write(records: list[dict[str, Any]], path: str) -> int:
+    """Append records of new URLs to the dataset as new files, without touching existing ones."""
+    existing = _existing_urls(path, {record['date'] for record in records}, {record['url'] for record in records})
+    unique: dict[str, dict[str, Any]] = {}
+    for record in records:
+        if record['url'] not in existing:
+            unique.setdefault(record['url'], record)
+    records = list(unique.values())
+    if not records:
+        return 0
+
+    ds.write_dataset(
+        pa.Table.from_pylist(records, schema=SCHEMA),
+        path,
+        format='parquet',
+        partitioning=PARTITIONING,
+        basename_template=f'part-{uuid.uuid4().hex}-{{i}}.parquet',
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    return len(records)
+
+
+def _existing_urls(path: str, dates: set[str], urls: set[str]) -> set[str]:
+    """Which of `urls` are already in the dataset, reading only the `dates` partitions."""
+    if not os.path.isdir(path):
+        return set()
+
+    dataset = ds.dataset(path, schema=SCHEMA, format='parquet', partitioning=PARTITIONING)
+    table = dataset.to_table(
+        columns=['url'],
+        filter=ds.field('date').isin(sorted(dates)) & ds.field('url').isin(sorted(urls)),
+    )
+    return set(table.column('url').to_pylist())
+
+
+def _utc(date: datetime) -> datetime:
+    """Timezone-aware UTC datetime, assuming naive datetimes are UTC."""
+    return date.replace(tzinfo=timezone.utc) if date.tzinfo is None else date.astimezone(timezone.utc)
+
+
+def _date(date: datetime) -> str:
+    """Date partition value."""
+    return _utc(date).strftime('%Y-%m-%d')
+
+
+def _partition_value(source: str) -> str:
+    """Filesystem-safe source partition value."""
+    return re.sub(r'[^\w.-]+', '_', source).strip('_').lower() or 'unknown'
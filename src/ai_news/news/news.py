@@ -1,41 +1,99 @@
+from __future__ import annotations
+
 import concurrent.futures
-import os
+import itertools
+import time
+from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from dotenv import load_dotenv
-from llama_index.core import Document
-from newsapi import NewsApiClient
-from trafilatura import extract, fetch_url
-
+from newsapi.newsapi_exception import NewsAPIException
+
+from ai_news import metrics
+from ai_news.news.cache import ArticleCache
+from ai_news.news.catalog import SourceCatalog
+from ai_news.news.pipeline import ExtractionPipeline, download_html, extract_content
+from ai_news.news.throttle import DomainThrottle
+from ai_news.news.transport import RecordingTransport, ReplayTransport, Transport, transport_from_env
 from ai_news.news.util import (
+    FILTER_METADATA_KEYS,
     Category,
     NewsArticle,
+    NewsException,
     Source,
+    filter_metadata,
 )
 
+if TYPE_CHECKING:
+    # llama_index is slow to import and only needed to build documents.
+    from llama_index.core import Document
+
 load_dotenv()
 
+T = TypeVar('T')
 
-class NewsException(Exception):
-    """Something went wrong with the News API."""
+# Maximum number of articles per page allowed by the News API.
+MAX_PAGE_SIZE = 100
 
 
 class News:
     """Get news articles, headlines and sources from the News API."""
 
-    def __init__(self, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        cache: ArticleCache | None = None,
+        pipeline: ExtractionPipeline | None = None,
+        catalog: SourceCatalog | None = None,
+        transport: Transport | None = None,
+        throttle: DomainThrottle | None = None,
+        batch_timeout: float | None = None,
+    ) -> None:
         """Create News API client.
 
         Args:
             api_key (str, optional): News API key.
                 Defaults to None. Loaded from environment variables.
+            cache (ArticleCache, optional): Cache of extracted article contents
+                consulted before downloading an article. Not used when recording or
+                replaying, so every download goes through the transport.
+                Defaults to None.
+            pipeline (ExtractionPipeline, optional): Download articles on a thread pool
+                and extract them on a process pool. Recommended for large batches.
+                Defaults to None (download & extract together on a thread pool).
+            catalog (SourceCatalog, optional): Catalog of sources used by `get_sources`
+                and to resolve the source of articles.
+                Defaults to None, the `SourceCatalog.shared` catalog of the transport, kept
+                in memory only when recording or replaying so the sources are fetched
+                through the transport too.
+            transport (Transport, optional): Source of API responses and article HTML,
+                e.g. `RecordingTransport` or `ReplayTransport` to run offline.
+                Defaults to None. Configured by `transport_from_env`.
+            throttle (DomainThrottle, optional): Per-domain concurrency limit and circuit
+                breaker applied to article downloads.
+                Defaults to None, a new `DomainThrottle`.
+            batch_timeout (float, optional): Seconds a batch of articles may spend downloading
+                & extracting. Articles still pending then keep the truncated content returned by
+                the News API. Doesn't apply to `pipeline`.
+                Defaults to None (wait for every article).
 
         """
-        api_key = api_key or os.environ['NEWS_API_KEY']
-        self._client = NewsApiClient(
-            api_key=api_key,
-        )
+        self._client = transport or transport_from_env(api_key=api_key)
+        archive = isinstance(self._client, RecordingTransport | ReplayTransport)
+        self._cache = None if archive else cache
+        self._pipeline = pipeline
+        self._catalog = catalog or SourceCatalog.shared(self._client, path=None if archive else 'res/sources.json')
+        self._throttle = throttle or DomainThrottle()
+        self._download = self._throttle.wrap(self._client.download)
+        # Work started by `DomainThrottle.submit` already holds a slot of its domain.
+        self._download_in_slot = self._throttle.guard(self._client.download)
+        self.batch_timeout = batch_timeout
+
+    @property
+    def cache(self) -> ArticleCache | None:
+        """Cache of extracted article contents, if any."""
+        return self._cache
 
     def get_documents(
         self,
@@ -50,6 +108,7 @@ class News:
         sort_by: str | None = None,
         page: int | None = None,
         page_size: int | None = None,
+        max_articles: int | None = None,
     ) -> list[Document]:
         """Get and parse news into list of `Document`.
 
@@ -92,12 +151,15 @@ class News:
                 Defaults to 20. 100 is the maximum.
             page_size (int, optional): Use this to page through the results if
                 the total results found is greater than the page size.
+            max_articles (int, optional): Page through the results until this many
+                articles are fetched (or results run out). `page` is ignored when set.
+                Defaults to None (a single page).
 
         Returns:
             list[Document]: Parsed articles into `Document`s.
 
         """
-        response = self._get_everything(
+        response = self._everything(
             q=q,
             qintitle=qintitle,
             sources=sources,
@@ -109,15 +171,12 @@ class News:
             sort_by=sort_by,
             page=page,
             page_size=page_size,
+            max_articles=max_articles,
         )
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            documents = executor.map(
-                News._create_document,
-                response,
-            )
-
-        return list(documents)
+        if self._pipeline is not None:
+            return self._run_pipeline(self._create_document, response)
+        return self._fetch_all(self._create_document, response)
 
     def get_articles(
         self,
@@ -132,6 +191,7 @@ class News:
         sort_by: str | None = None,
         page: int | None = None,
         page_size: int | None = None,
+        max_articles: int | None = None,
     ) -> list[NewsArticle]:
         """Get all news articles.
 
@@ -174,12 +234,15 @@ class News:
                 Defaults to 20. 100 is the maximum.
             page_size (int, optional): Use this to page through the results if
                 the total results found is greater than the page size.
+            max_articles (int, optional): Page through the results until this many
+                articles are fetched (or results run out). `page` is ignored when set.
+                Defaults to None (a single page).
 
         Returns:
             list[NewsArticle]: List of all news articles that meets the param criteria.
 
         """
-        response = self._get_everything(
+        response = self._everything(
             q=q,
             qintitle=qintitle,
             sources=sources,
@@ -191,15 +254,190 @@ class News:
             sort_by=sort_by,
             page=page,
             page_size=page_size,
+            max_articles=max_articles,
         )
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            articles = executor.map(
-                News._create_news_article,
-                response,
-            )
+        if self._pipeline is not None:
+            return self._run_pipeline(self._create_news_article, response)
+        return self._fetch_all(self._create_news_article, response)
+
+    def iter_documents(
+        self,
+        q: str | None = None,
+        qintitle: str | None = None,
+        sources: list[Source] | None = None,
+        domains: list[str] | None = None,
+        exclude_domains: list[str] | None = None,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        language: str = 'en',
+        sort_by: str | None = None,
+        page: int | None = None,
+        page_size: int | None = None,
+        max_articles: int | None = None,
+        max_in_flight: int = 32,
+    ) -> Iterator[Document]:
+        """Get and parse news into `Document`s, yielding each as soon as it's fetched.
+
+        Unlike `get_documents`, documents are yielded in the order they finish fetching, so
+        the first ones are available as soon as the fastest fetch completes and callers
+        can process them while the rest are still being scraped. At most `max_in_flight`
+        articles are fetched ahead of the caller. Doesn't use the extraction `pipeline`.
+
+        Notes:
+            - See the official [News API documentation](https://newsapi.org/docs/endpoints/everything)
+            for search syntax and examples.
+            - Use `News.get_sources` to locate these programmatically, or look at the
+            `sources index <https://newsapi.org/sources>`.
+
+        Args:
+            q (str, optional):Keywords or a phrase to search for in the article title and body.
+                Defaults to None.
+            qintitle (str, optional): Keywords or a phrase to search for in the article title and body.
+                Defaults to None.
+            sources (list[Source], optional): A comma-seperated string of identifiers
+                for the news sources or blogs you want headlines from.
+                See `News.get_sources()` to get sources.
+                Defaults to None.
+            domains (list[str], optional): A comma-seperated string of domains
+                (eg bbc.co.uk, techcrunch.com, engadget.com) to restrict the search to.
+                Defaults to None.
+            exclude_domains (list[str], optional): A comma-seperated string of domains
+                (eg bbc.co.uk, techcrunch.com, engadget.com) to remove from the results.
+                Defaults to None.
+            from_date (datetime, optional): A date and optional time for the oldest article allowed.
+                The format must conform to ISO-8601 specifically as one of either `%Y-%m-%d`
+                (e.g. *2019-09-07*) or `%Y-%m-%dT%H:%M:%S` (e.g. *2019-09-07T13:04:15*).
+                Defaults to None.
+            to_date (datetime, optional):A date and optional time for the newest article allowed.
+                The format must conform to ISO-8601 specifically as one of either `%Y-%m-%d`
+                (e.g. *2019-09-07*) or `%Y-%m-%dT%H:%M:%S` (e.g. *2019-09-07T13:04:15*).
+                Defaults to None.
+            language (str, optional): The 2-letter ISO-639-1 code of the language
+                you want to get headlines for.
+                Defaults to en.
+            sort_by (str, optional): The order to sort articles in.
+                See `newsapi.const.sort_method` for the set of allowed values.
+                Defaults to None.
+            page (int, optional): The number of results to return per page (request).
+                Defaults to 20. 100 is the maximum.
+            page_size (int, optional): Use this to page through the results if
+                the total results found is greater than the page size.
+            max_articles (int, optional): Page through the results until this many
+                articles are fetched (or results run out). `page` is ignored when set.
+                Defaults to None (a single page).
+            max_in_flight (int, optional): Maximum number of articles being fetched,
+                or fetched but not yet consumed by the caller.
+                Defaults to 32.
+
+        Yields:
+            Document: Parsed articles into `Document`s.
+
+        """
+        articles = self._everything(
+            q=q,
+            qintitle=qintitle,
+            sources=sources,
+            domains=domains,
+            exclude_domains=exclude_domains,
+            from_date=from_date,
+            to_date=to_date,
+            language=language,
+            sort_by=sort_by,
+            page=page,
+            page_size=page_size,
+            max_articles=max_articles,
+        )
+        yield from self._iter_fetch(self._create_document, articles, max_in_flight=max_in_flight)
+
+    def iter_articles(
+        self,
+        q: str | None = None,
+        qintitle: str | None = None,
+        sources: list[Source] | None = None,
+        domains: list[str] | None = None,
+        exclude_domains: list[str] | None = None,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        language: str = 'en',
+        sort_by: str | None = None,
+        page: int | None = None,
+        page_size: int | None = None,
+        max_articles: int | None = None,
+        max_in_flight: int = 32,
+    ) -> Iterator[NewsArticle]:
+        """Get news articles, yielding each as soon as it's fetched.
+
+        Unlike `get_articles`, articles are yielded in the order they finish fetching, so
+        the first ones are available as soon as the fastest fetch completes and callers
+        can process them while the rest are still being scraped. At most `max_in_flight`
+        articles are fetched ahead of the caller. Doesn't use the extraction `pipeline`.
 
-        return list(articles)
+        Notes:
+            - See the official [News API documentation](https://newsapi.org/docs/endpoints/everything)
+            for search syntax and examples.
+            - Use `News.get_sources` to locate these programmatically, or look at the
+            `sources index <https://newsapi.org/sources>`.
+
+        Args:
+            q (str, optional):Keywords or a phrase to search for in the article title and body.
+                Defaults to None.
+            qintitle (str, optional): Keywords or a phrase to search for in the article title and body.
+                Defaults to None.
+            sources (list[Source], optional): A comma-seperated string of identifiers
+                for the news sources or blogs you want headlines from.
+                See `News.get_sources()` to get sources.
+                Defaults to None.
+            domains (list[str], optional): A comma-seperated string of domains
+                (eg bbc.co.uk, techcrunch.com, engadget.com) to restrict the search to.
+                Defaults to None.
+            exclude_domains (list[str], optional): A comma-seperated string of domains
+                (eg bbc.co.uk, techcrunch.com, engadget.com) to remove from the results.
+                Defaults to None.
+            from_date (datetime, optional): A date and optional time for the oldest article allowed.
+                The format must conform to ISO-8601 specifically as one of either `%Y-%m-%d`
+                (e.g. *2019-09-07*) or `%Y-%m-%dT%H:%M:%S` (e.g. *2019-09-07T13:04:15*).
+                Defaults to None.
+            to_date (datetime, optional):A date and optional time for the newest article allowed.
+                The format must conform to ISO-8601 specifically as one of either `%Y-%m-%d`
+                (e.g. *2019-09-07*) or `%Y-%m-%dT%H:%M:%S` (e.g. *2019-09-07T13:04:15*).
+                Defaults to None.
+            language (str, optional): The 2-letter ISO-639-1 code of the language
+                you want to get headlines for.
+                Defaults to en.
+            sort_by (str, optional): The order to sort articles in.
+                See `newsapi.const.sort_method` for the set of allowed values.
+                Defaults to None.
+            page (int, optional): The number of results to return per page (request).
+                Defaults to 20. 100 is the maximum.
+            page_size (int, optional): Use this to page through the results if
+                the total results found is greater than the page size.
+            max_articles (int, optional): Page through the results until this many
+                articles are fetched (or results run out). `page` is ignored when set.
+                Defaults to None (a single page).
+            max_in_flight (int, optional): Maximum number of articles being fetched,
+                or fetched but not yet consumed by the caller.
+                Defaults to 32.
+
+        Yields:
+            NewsArticle: List of all news articles that meets the param criteria.
+
+        """
+        articles = self._everything(
+            q=q,
+            qintitle=qintitle,
+            sources=sources,
+            domains=domains,
+            exclude_domains=exclude_domains,
+            from_date=from_date,
+            to_date=to_date,
+            language=language,
+            sort_by=sort_by,
+            page=page,
+            page_size=page_size,
+            max_articles=max_articles,
+        )
+        yield from self._iter_fetch(self._create_news_article, articles, max_in_flight=max_in_flight)
 
     def get_top_headlines(
         self,
@@ -236,25 +474,22 @@ class News:
         if (sources is not None) and ((country is not None) or (category is not None)):
             raise ValueError('cannot mix country/category param with sources param.')
 
-        response = self._client.get_top_headlines(
-            q=q,
-            qintitle=qintitle,
-            sources=Source.source_ids(sources=sources),
-            category=category,
-            language=language,
-            country=country,
-        )  # {status: ok, totalResult: 0, articles: []}
+        with metrics.timer('news_api_request_seconds', endpoint='top-headlines'):
+            response = self._client.get_top_headlines(
+                q=q,
+                qintitle=qintitle,
+                sources=Source.source_ids(sources=sources),
+                category=category,
+                language=language,
+                country=country,
+            )  # {status: ok, totalResult: 0, articles: []}
 
         if response['status'] != 'ok':
             raise NewsException('Something went wrong')
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            articles = executor.map(
-                News._create_news_article,
-                response['articles'],
-            )
-
-        return list(articles)
+        if self._pipeline is not None:
+            return self._run_pipeline(self._create_news_article, response['articles'])
+        return self._fetch_all(self._create_news_article, response['articles'])
 
     def get_sources(
         self,
@@ -276,18 +511,23 @@ class News:
             list[Source]: List of all or filtered sources.
 
         """
-        result = self._client.get_sources(
-            category=str(category) if category else None,
+        return self._catalog.filter(
+            category=category,
             language=language,
             country=country,
         )
 
-        if result['status'] != 'ok':
-            raise NewsException('Something went wrong')
-
+    @staticmethod
+    def _parse_sources(
+        result: list[dict[str, Any]],
+        category: Category | None = None,
+        language: str = 'en',
+        country: str | None = None,
+    ) -> list[Source]:
+        """Create filtered `Source`s from sources json response."""
         sources: list[Source] = []
 
-        for source in result['sources']:
+        for source in result:
             if source['language'] != language:
                 continue
             if category and source['category'] != category:
@@ -302,12 +542,180 @@ class News:
                 url=source['url'],
                 category=Category.from_str(source['category']),
                 language=source['language'],
-                # category=Category.from_str(source['category']),
+                country=source['country'],
             )
             sources.append(s)
 
         return sources
 
+    @staticmethod
+    def save_articles(articles: list[NewsArticle], path: str = 'res/articles') -> int:
+        """Append fetched articles to a Parquet dataset partitioned by date and source.
+
+        Args:
+            articles (list[NewsArticle]): Articles to save, e.g. from `get_articles`.
+            path (str, optional): Root directory of the dataset.
+                Defaults to 'res/articles'.
+
+        Returns:
+            int: Number of articles saved.
+
+        """
+        from ai_news.news import dataset
+
+        return dataset.write_articles(articles, path=path)
+
+    @staticmethod
+    def save_documents(documents: list[Document], path: str = 'res/articles') -> int:
+        """Append fetched documents to a Parquet dataset partitioned by date and source.
+
+        Args:
+            documents (list[Document]): Documents to save, e.g. from `get_documents`.
+            path (str, optional): Root directory of the dataset.
+                Defaults to 'res/articles'.
+
+        Returns:
+            int: Number of documents saved.
+
+        """
+        from ai_news.news import dataset
+
+        return dataset.write_documents(documents, path=path)
+
+    @staticmethod
+    def load_documents(
+        path: str = 'res/articles',
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        sources: list[str] | None = None,
+    ) -> list[Document]:
+        """Rebuild documents from a saved Parquet dataset, without calling the News API.
+
+        Args:
+            path (str, optional): Root directory of the dataset.
+                Defaults to 'res/articles'.
+            from_date (datetime, optional): Oldest article allowed.
+                Defaults to None.
+            to_date (datetime, optional): Newest article allowed.
+                Defaults to None.
+            sources (list[str], optional): Source names to restrict to.
+                Defaults to None.
+
+        Returns:
+            list[Document]: Documents, same as returned by `get_documents`.
+
+        """
+        from ai_news.news import dataset
+
+        return dataset.read_documents(path=path, from_date=from_date, to_date=to_date, sources=sources)
+
+    def iter_everything(
+        self,
+        q: str | None = None,
+        qintitle: str | None = None,
+        sources: list[Source] | None = None,
+        domains: list[str] | None = None,
+        exclude_domains: list[str] | None = None,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        language: str = 'en',
+        sort_by: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        max_articles: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Page through all news articles, yielding them as each page arrives.
+
+        Pages are requested lazily, so consumers can start working on the first
+        page while later pages have not been requested yet.
+
+        Args:
+            q (str, optional): Keywords or a phrase to search for in the article title and body.
+                Defaults to None.
+            qintitle (str, optional): Keywords or a phrase to search for in the article title.
+                Defaults to None.
+            sources (list[Source], optional): Sources to restrict the search to.
+                Defaults to None.
+            domains (list[str], optional): Domains to restrict the search to.
+                Defaults to None.
+            exclude_domains (list[str], optional): Domains to remove from the results.
+                Defaults to None.
+            from_date (datetime, optional): Oldest article allowed.
+                Defaults to None.
+            to_date (datetime, optional): Newest article allowed.
+                Defaults to None.
+            language (str, optional): The 2-letter ISO-639-1 code of the language.
+                Defaults to en.
+            sort_by (str, optional): The order to sort articles in.
+                Defaults to None.
+            page_size (int, optional): Number of articles to request per page.
+                Defaults to 100, the maximum.
+            max_articles (int, optional): Stop after yielding this many articles.
+                Defaults to None, i.e. until `totalResults` is reached.
+
+        Yields:
+            dict[str, Any]: News API article json.
+
+        """
+        page_size = min(page_size, MAX_PAGE_SIZE)
+        if max_articles is not None:
+            page_size = min(page_size, max_articles)
+
+        count, page = 0, 1
+        while max_articles is None or count < max_articles:
+            try:
+                with metrics.timer('news_api_request_seconds', endpoint='everything'):
+                    response = self._client.get_everything(
+                        **News._everything_params(
+                            q=q,
+                            qintitle=qintitle,
+                            sources=sources,
+                            domains=domains,
+                            exclude_domains=exclude_domains,
+                            from_date=from_date,
+                            to_date=to_date,
+                            language=language,
+                            sort_by=sort_by,
+                        ),
+                        page=page,
+                        page_size=page_size,
+                    )
+            except NewsAPIException as e:
+                # Developer accounts can only page through the first 100 results.
+                if e.get_code() == 'maximumResultsReached':
+                    return
+                raise
+
+            if response['status'] != 'ok':
+                raise NewsException('Something went wrong')
+
+            articles: list[dict[str, Any]] = response['articles']
+            for article in articles:
+                if max_articles is not None and count >= max_articles:
+                    return
+                yield article
+                count += 1
+
+            if not articles or page * page_size >= response['totalResults']:
+                return
+            page += 1
+
+    def _everything(
+        self,
+        page: int | None = None,
+        page_size: int | None = None,
+        max_articles: int | None = None,
+        **kwargs: Any,
+    ) -> Iterable[dict[str, Any]]:
+        """Single page of articles, or a lazy iterator over pages if `max_articles` is set."""
+        if max_articles is None:
+            return self._get_everything(page=page, page_size=page_size, **kwargs)
+
+        return self.iter_everything(
+            page_size=page_size or MAX_PAGE_SIZE,
+            max_articles=max_articles,
+            **kwargs,
+        )
+
     def _get_everything(
         self,
         q: str | None = None,
@@ -324,7 +732,43 @@ class News:
     ) -> list[dict[str, Any]]:
         """Get all news articles."""
 
-        response = self._client.get_everything(
+        with metrics.timer('news_api_request_seconds', endpoint='everything'):
+            response = self._client.get_everything(
+                **News._everything_params(
+                    q=q,
+                    qintitle=qintitle,
+                    sources=sources,
+                    domains=domains,
+                    exclude_domains=exclude_domains,
+                    from_date=from_date,
+                    to_date=to_date,
+                    language=language,
+                    sort_by=sort_by,
+                ),
+                page=page,
+                page_size=page_size,
+            )
+
+        if response['status'] != 'ok':
+            raise NewsException('Something went wrong')
+
+        articles: list[dict[str, Any]] = response['articles']
+        return articles
+
+    @staticmethod
+    def _everything_params(
+        q: str | None = None,
+        qintitle: str | None = None,
+        sources: list[Source] | None = None,
+        domains: list[str] | None = None,
+        exclude_domains: list[str] | None = None,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        language: str = 'en',
+        sort_by: str | None = None,
+    ) -> dict[str, Any]:
+        """Keyword arguments of `NewsApiClient.get_everything` excluding paging."""
+        return dict(
             q=q,
             qintitle=qintitle,
             sources=Source.source_ids(sources=sources),
@@ -334,60 +778,173 @@ class News:
             to=(to_date.strftime('%Y-%m-%dT%H:%M:%S') if to_date is not None else None),
             language=language,
             sort_by=sort_by,  # TODO: Make into Enum
-            page=page,
-            page_size=page_size,
         )
 
-        if response['status'] != 'ok':
-            raise NewsException('Something went wrong')
+    def _fetch_all(
+        self,
+        build: Callable[[dict[str, Any], str | None], T],
+        articles: Iterable[dict[str, Any]],
+    ) -> list[T]:
+        """Fetch article contents on a thread pool and `build` objects from them.
 
-        articles: list[dict[str, Any]] = response['articles']
-        return articles
+        Each article is submitted as soon as it's available. Articles whose content
+        isn't fetched within `batch_timeout` are built from the truncated content
+        of the News API instead, without waiting for their downloads.
+
+        """
+        start = time.monotonic()
+        consumed: list[dict[str, Any]] = []
+        futures: list[concurrent.futures.Future[str | None]] = []
+        executor = concurrent.futures.ThreadPoolExecutor()
+        try:
+            for article in articles:
+                consumed.append(article)
+                futures.append(self._throttle.submit(executor, article['url'], self._fetch_content))
+
+            timeout = None if self.batch_timeout is None else max(0.0, start + self.batch_timeout - time.monotonic())
+            done, pending = concurrent.futures.wait(futures, timeout=timeout)
+        finally:
+            # Don't wait for stragglers, they're bounded by the download timeout.
+            executor.shutdown(wait=self.batch_timeout is None, cancel_futures=True)
+
+        if pending:
+            print(f'Batch deadline exceeded, {len(pending):,} articles fall back to their truncated content.')
+            metrics.increment('batch_deadline_fallbacks_total', len(pending))
+        return [
+            build(article, future.result() if future in done else None) for article, future in zip(consumed, futures)
+        ]
+
+    def _iter_fetch(
+        self,
+        build: Callable[[dict[str, Any], str | None], T],
+        articles: Iterable[dict[str, Any]],
+        max_in_flight: int = 32,
+    ) -> Iterator[T]:
+        """Fetch article contents on a thread pool and yield objects built from them as they complete.
+
+        New articles are only submitted while fewer than `max_in_flight` are pending,
+        so a slow consumer pauses fetching (and paging). After `batch_timeout`,
+        articles still pending or not yet submitted fall back to their truncated content.
+
+        """
+        deadline = None if self.batch_timeout is None else time.monotonic() + self.batch_timeout
+        remaining = iter(articles)
+        pending: dict[concurrent.futures.Future[str | None], dict[str, Any]] = {}
+        executor = concurrent.futures.ThreadPoolExecutor()
+        try:
+            while True:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+
+                for article in itertools.islice(remaining, max(0, max_in_flight - len(pending))):
+                    pending[self._throttle.submit(executor, article['url'], self._fetch_content)] = article
+                if not pending:
+                    return
+
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, _ = concurrent.futures.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    yield build(pending.pop(future), future.result())
+
+            # Deadline exceeded.
+            late = [*pending.values(), *remaining]
+            print(f'Batch deadline exceeded, {len(late):,} articles fall back to their truncated content.')
+            metrics.increment('batch_deadline_fallbacks_total', len(late))
+            for article in late:
+                yield build(article, None)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     @staticmethod
-    def fetch_article_content(url: str) -> str | None:
+    def fetch_article_content(url: str, download: Callable[[str], str | None] = download_html) -> str | None:
         """Fetch article contents from URL.
 
         Args:
             url (str): URL of the article.
+            download (Callable[[str], str | None], optional): Download the raw HTML of a URL.
+                Defaults to `download_html`.
 
         Returns:
             str | None: Markdown content of the url or None if it failed.
 
         """
         # Download a web page.
-        downloaded = fetch_url(url)
+        with metrics.timer('article_download_seconds'):
+            downloaded = download(url)
         content: str | None = None
         if downloaded is not None:
             # Extract information from HTML.
-            content = extract(
-                downloaded,
-                include_links=True,
-            )
+            with metrics.timer('article_extract_seconds'):
+                content = extract_content(downloaded)
+        metrics.increment('articles_fetched_total', status='ok' if content is not None else 'failed')
+        return content
+
+    def _fetch_content(self, url: str) -> str | None:
+        """Fetch article contents from the cache, falling back to the URL. Run through `DomainThrottle.submit`."""
+        if self._cache is not None and (content := self._cache.get(url)) is not None:
+            metrics.increment('article_cache_total', result='hit')
+            return content
+
+        if self._cache is not None:
+            metrics.increment('article_cache_total', result='miss')
+        content = News.fetch_article_content(url=url, download=self._download_in_slot)
+        if self._cache is not None and content is not None:
+            self._cache.set(url, content)
         return content
 
+    def _run_pipeline(
+        self,
+        build: Callable[[dict[str, Any], str | None], T],
+        articles: Iterable[dict[str, Any]],
+    ) -> list[T]:
+        """Fetch article contents through the extraction pipeline and `build` objects from them."""
+        assert self._pipeline is not None
+
+        # Articles are recorded as the pipeline consumes them, so paging still overlaps downloads.
+        consumed: list[dict[str, Any]] = []
+
+        def urls() -> Iterator[str]:
+            for article in articles:
+                consumed.append(article)
+                yield article['url']
+
+        contents = self._pipeline.run(urls(), download=self._download, cache=self._cache)
+        return [build(article, content) for article, content in zip(consumed, contents)]
+
+    def _create_news_article(self, article: dict[str, Any], content: str | None) -> NewsArticle:
+        """Create `NewsArticle` object from news article json response and its fetched content."""
+        return News._to_news_article(article, content, source=self._catalog.resolve(article['source']))
+
+    def _create_document(self, article: dict[str, Any], content: str | None) -> Document:
+        """Create `Document` from news article json response and its fetched content."""
+        return News._to_document(article, content, source=self._catalog.resolve(article['source']))
+
     @staticmethod
-    def _create_news_article(article: dict[str, Any]) -> NewsArticle:
-        """Create `NewsArticle` object from news article json response."""
-        # TODO: Use existing source object with matching name.
-        source = Source(
-            id=article['source']['id'],
-            name=article['source']['name'],
-        )
+    def _to_news_article(
+        article: dict[str, Any],
+        content: str | None,
+        source: Source | None = None,
+    ) -> NewsArticle:
+        """Build `NewsArticle` from article json and its fetched content.
+
+        Falls back to the (truncated) `article['content']` if `content` is None,
+        and to a new `Source` if `source` isn't given.
 
-        # TODO: article['content'] doesn't contain the full content
-        # Might wanna use BeautifulSoup to parse the article['url'] instead.
-        content: str = (
-            News.fetch_article_content(
-                url=article['url'],
+        """
+        if source is None:
+            source = Source(
+                id=article['source']['id'],
+                name=article['source']['name'],
             )
-            or article['content']
-        )
 
         news_article = NewsArticle(
             title=article['title'],
             author=article['author'],
-            content=content,
+            content=content or article['content'],
             description=article['description'],
             published_at=datetime.fromisoformat(article['publishedAt']),
             source=source,
@@ -397,25 +954,27 @@ class News:
         return news_article
 
     @staticmethod
-    def _create_document(article: dict[str, Any]) -> Document:
-        """Create list of `Document` from news article json response."""
-        # TODO: Use existing source object with matching name.
-        source = Source(
-            id=article['source']['id'],
-            name=article['source']['name'],
-        )
+    def _to_document(
+        article: dict[str, Any],
+        content: str | None,
+        source: Source | None = None,
+    ) -> Document:
+        """Build `Document` from article json and its fetched content.
+
+        Falls back to the (truncated) `article['content']` if `content` is None,
+        and to a new `Source` if `source` isn't given.
 
-        # TODO: article['content'] doesn't contain the full content
-        # Might wanna use BeautifulSoup to parse the article['url'] instead.
-        content: str = (
-            News.fetch_article_content(
-                url=article['url'],
+        """
+        from llama_index.core import Document
+
+        if source is None:
+            source = Source(
+                id=article['source']['id'],
+                name=article['source']['name'],
             )
-            or article['content']
-        )
 
         document = Document(
-            text=content,
+            text=content or article['content'],
             metadata={
                 'title': article['title'],
                 'author': article['author'],
@@ -424,13 +983,18 @@ class News:
                 'published_at': article['publishedAt'],
                 'url': article['url'],
                 'image_url': article['urlToImage'],
+                **filter_metadata(article['publishedAt'], source.category),
             },
+            excluded_embed_metadata_keys=list(FILTER_METADATA_KEYS),
+            excluded_llm_metadata_keys=list(FILTER_METADATA_KEYS),
         )
         return document
 
     @staticmethod
     def _create_documents_from_articles(articles: list[NewsArticle]) -> list[Document]:
         """Create documents & it's metadata from list of articles."""
+        from llama_index.core import Document
+
         with concurrent.futures.ThreadPoolExecutor() as executor:
             documents = executor.map(
                 lambda article: Document(
@@ -443,7 +1007,10 @@ class News:
                         'url': article.url,
                         'published_at': article.published_at.strftime('%Y-%m-%dT%H:%M:%S'),
                         'image_url': article.image_url,
+                        **filter_metadata(article.published_at, article.source.category),
                     },
+                    excluded_embed_metadata_keys=list(FILTER_METADATA_KEYS),
+                    excluded_llm_metadata_keys=list(FILTER_METADATA_KEYS),
                 ),
                 articles,
             )
@@ -0,0 +1,199 @@
+import concurrent.futures
+import functools
+import math
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from configparser import ConfigParser
+
+from trafilatura import extract, fetch_url
+from trafilatura.settings import DEFAULT_CONFIG
+
+from ai_news import metrics
+from ai_news.news.cache import ArticleCache
+
+
+def download_html(url: str, timeout: float | None = None) -> str | None:
+    """Download raw HTML of a web page.
+
+    Args:
+        url (str): URL of the page.
+        timeout (float, optional): Connect and read timeout in (whole) seconds.
+            Defaults to None, trafilatura's `DOWNLOAD_TIMEOUT` setting.
+
+    Returns:
+        str | None: Downloaded HTML or None if it failed.
+
+    """
+    config = DEFAULT_CONFIG if timeout is None else _download_config(max(1, math.ceil(timeout)))
+    downloaded: str | None = fetch_url(url, config=config)
+    return downloaded
+
+
+@functools.cache
+def _download_config(timeout: int) -> ConfigParser:
+    """Trafilatura config with `DOWNLOAD_TIMEOUT` set to `timeout` seconds."""
+    config = ConfigParser()
+    config.read_dict({section: dict(DEFAULT_CONFIG[section]) for section in DEFAULT_CONFIG})
+    config['DEFAULT']['DOWNLOAD_TIMEOUT'] = str(timeout)
+    return config
+
+
+def extract_content(html: str) -> str | None:
+    """Extract the main article content from HTML as markdown.
+
+    Module-level so it can be pickled into a `ProcessPoolExecutor`.
+
+    Args:
+        html (str): Raw HTML of the article.
+
+    Returns:
+        str | None: Extracted content or None if nothing could be extracted.
+
+    """
+    content: str | None = extract(
+        html,
+        include_links=True,
+    )
+    return content
+
+
+def _timed_extract_content(html: str) -> tuple[str | None, float]:
+    """`extract_content` and its duration, timed inside the worker process."""
+    start = time.perf_counter()
+    return extract_content(html), time.perf_counter() - start
+
+
+class ExtractionPipeline:
+    """Two-stage article pipeline: thread-pool download, process-pool extraction.
+
+    Downloads are I/O bound and run on a thread pool. Downloaded HTML is handed
+    over a bounded queue to a process pool that runs the CPU bound trafilatura
+    extraction, so extraction isn't serialized by the GIL and scales with cores.
+    When extraction falls behind, the queue fills up and downloads pause.
+
+    """
+
+    def __init__(
+        self,
+        fetch_workers: int | None = None,
+        extract_workers: int | None = None,
+        queue_size: int = 64,
+    ) -> None:
+        """Create extraction pipeline.
+
+        Args:
+            fetch_workers (int, optional): Number of download threads.
+                Defaults to None (`ThreadPoolExecutor` default).
+            extract_workers (int, optional): Number of extraction processes.
+                Defaults to None (number of CPUs).
+            queue_size (int, optional): Maximum number of downloaded pages waiting
+                for, or being, extracted.
+                Defaults to 64.
+
+        """
+        self.fetch_workers = fetch_workers
+        self.extract_workers = extract_workers
+        self.queue_size = queue_size
+
+    def run(
+        self,
+        urls: Iterable[str],
+        download: Callable[[str], str | None] = download_html,
+        cache: ArticleCache | None = None,
+    ) -> list[str | None]:
+        """Download and extract the contents of `urls`.
+
+        Args:
+            urls (Iterable[str]): Article URLs. Consumed lazily.
+            download (Callable[[str], str | None], optional): Downloads raw HTML of a URL.
+                Defaults to `download_html`.
+            cache (ArticleCache, optional): Cache of extracted contents, consulted
+                before downloading and updated after extraction.
+                Defaults to None.
+
+        Raises:
+            Exception: The error raised by `urls`, once the URLs it did yield are processed.
+
+        Returns:
+            list[str | None]: Extracted contents in the same order as `urls`,
+                None where download or extraction failed.
+
+        """
+        results: dict[int, str | None] = {}
+        handoff: queue.Queue[tuple[int, str, str] | None] = queue.Queue(maxsize=self.queue_size)
+        slots = threading.BoundedSemaphore(self.queue_size)
+
+        def fetch(index: int, url: str) -> None:
+            if cache is not None and (content := cache.get(url)) is not None:
+                metrics.increment('article_cache_total', result='hit')
+                results[index] = content
+                return
+            if cache is not None:
+                metrics.increment('article_cache_total', result='miss')
+            try:
+                with metrics.timer('article_download_seconds'):
+                    html = download(url)
+            except Exception:
+                html = None
+            if html is None:
+                metrics.increment('articles_fetched_total', status='failed')
+                results[index] = None
+                return
+            handoff.put((index, url, html))
+
+        submitted: list[concurrent.futures.Future[None]] = []
+        errors: list[BaseException] = []
+
+        def produce(executor: concurrent.futures.ThreadPoolExecutor) -> None:
+            try:
+                for index, url in enumerate(urls):
+                    submitted.append(executor.submit(fetch, index, url))
+            except BaseException as e:
+                # e.g. the lazy `urls` iterator failed while paging the News API.
+                errors.append(e)
+            finally:
+                # Fetches still hand pages over until the sentinel, so wait for them first.
+                concurrent.futures.wait(submitted)
+                handoff.put(None)
+
+        with (
+            concurrent.futures.ThreadPoolExecutor(self.fetch_workers) as fetchers,
+            concurrent.futures.ProcessPoolExecutor(self.extract_workers) as extractors,
+        ):
+            producer = threading.Thread(target=produce, args=(fetchers,), daemon=True)
+            producer.start()
+
+            pending: dict[concurrent.futures.Future[tuple[str | None, float]], tuple[int, str]] = {}
+            while (item := handoff.get()) is not None:
+                index, url, html = item
+                # Bound the pages held by the process pool, so the queue applies backpressure.
+                slots.acquire()
+                future = extractors.submit(_timed_extract_content, html)
+                future.add_done_callback(lambda _: slots.release())
+                pending[future] = (index, url)
+
+            producer.join()
+
+            # A fetch that raised (e.g. a cache error) never reached the handoff queue.
+            for index, fetched in enumerate(submitted):
+                if fetched.exception() is not None:
+                    metrics.increment('articles_fetched_total', status='failed')
+                    results[index] = None
+
+            for future in concurrent.futures.as_completed(pending):
+                index, url = pending[future]
+                try:
+                    content, elapsed = future.result()
+                    metrics.observe('article_extract_seconds', elapsed)
+                except Exception:
+                    content = None
+                metrics.increment('articles_fetched_total', status='ok' if content is not None else 'failed')
+                if cache is not None and content is not None:
+                    cache.set(url, content)
+                results[index] = content
+
+        if errors:
+            raise errors[0]
+        return [results.get(index) for index in range(len(submitted))]
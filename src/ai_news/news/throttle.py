@@ -0,0 +1,256 @@
+import concurrent.futures
+import contextlib
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TypeVar
+from urllib.parse import urlsplit
+
+from ai_news import metrics
+
+T = TypeVar('T')
+
+
+@dataclass
+class _Circuit:
+    """Failure state of a single key."""
+
+    failures: int = 0
+    opened_at: float | None = None
+    trial: bool = False
+
+
+class CircuitBreaker:
+    """Stop calling keys (e.g. domains) that keep failing.
+
+    After `failure_threshold` consecutive failures a key's circuit opens and
+    calls to it are rejected. Once `reset_timeout` seconds have passed, a single
+    trial call is let through: success closes the circuit, failure opens it again.
+
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 5 * 60) -> None:
+        """Create circuit breaker.
+
+        Args:
+            failure_threshold (int, optional): Consecutive failures that open a circuit.
+                Defaults to 5.
+            reset_timeout (float, optional): Seconds before an open circuit allows a trial call.
+                Defaults to 5 minutes.
+
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._circuits: defaultdict[str, _Circuit] = defaultdict(_Circuit)
+
+    def allow(self, key: str) -> bool:
+        """Whether a call to `key` may go ahead."""
+        with self._lock:
+            circuit = self._circuits[key]
+            if circuit.opened_at is None:
+                return True
+            if circuit.trial or time.monotonic() - circuit.opened_at < self.reset_timeout:
+                return False
+            circuit.trial = True
+            return True
+
+    def record_success(self, key: str) -> None:
+        """Close the circuit of `key`."""
+        with self._lock:
+            self._circuits.pop(key, None)
+
+    def record_failure(self, key: str) -> None:
+        """Count a failure of `key`, opening its circuit at the threshold or after a failed trial."""
+        with self._lock:
+            circuit = self._circuits[key]
+            circuit.failures += 1
+            if circuit.trial or circuit.failures >= self.failure_threshold:
+                circuit.opened_at = time.monotonic()
+                circuit.trial = False
+
+    def is_open(self, key: str) -> bool:
+        """Whether calls to `key` are currently being rejected."""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return circuit is not None and circuit.opened_at is not None
+
+
+class DomainThrottle:
+    """Per-domain concurrency limit and circuit breaker for article downloads.
+
+    At most `max_per_domain` downloads run against a domain at once, so a slow
+    publisher can't take up every download thread, and domains that keep failing
+    (or timing out) are skipped until their circuit breaker lets a trial through.
+
+    `submit` queues work per domain and only hands it to the executor once the
+    domain has a free slot, so work for other domains is never stuck behind it.
+    `download` (and `wrap`) block a thread until a slot is free instead. Work run
+    by `submit` already holds a slot, so it downloads through `guard`, which only
+    applies the circuit breaker.
+
+    """
+
+    def __init__(
+        self,
+        max_per_domain: int = 4,
+        failure_threshold: int = 5,
+        reset_timeout: float = 5 * 60,
+    ) -> None:
+        """Create domain throttle.
+
+        Args:
+            max_per_domain (int, optional): Maximum concurrent downloads per domain.
+                Defaults to 4.
+            failure_threshold (int, optional): Consecutive failed downloads that stop
+                a domain from being downloaded from.
+                Defaults to 5.
+            reset_timeout (float, optional): Seconds before a stopped domain is tried again.
+                Defaults to 5 minutes.
+
+        """
+        self.max_per_domain = max_per_domain
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+
+        self._lock = threading.Lock()
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        # Work submitted per domain, running and waiting for a slot.
+        self._running: defaultdict[str, int] = defaultdict(int)
+        self._waiting: defaultdict[str, deque[tuple[concurrent.futures.Future, Callable[[], object]]]] = (
+            defaultdict(deque)
+        )
+
+    def submit(
+        self,
+        executor: concurrent.futures.Executor,
+        url: str,
+        fn: Callable[[str], T],
+    ) -> concurrent.futures.Future[T]:
+        """Run `fn(url)` on `executor` once the domain of `url` has a free slot.
+
+        Args:
+            executor (Executor): Executor to run `fn` on.
+            url (str): URL whose domain is limited.
+            fn (Callable[[str], T]): Work to run, e.g. download & extract `url`.
+
+        Returns:
+            Future[T]: Result of `fn(url)`. Cancelled if `executor` shuts down first. Cancelling
+                it before it starts skips `fn` and frees the domain's slot for the next work.
+
+        """
+        domain = urlsplit(url).netloc.lower()
+        future: concurrent.futures.Future[T] = concurrent.futures.Future()
+        with self._lock:
+            if self._running[domain] >= self.max_per_domain:
+                self._waiting[domain].append((future, lambda: fn(url)))
+                return future
+            self._running[domain] += 1
+
+        self._start(executor, domain, future, lambda: fn(url))
+        return future
+
+    def _start(
+        self,
+        executor: concurrent.futures.Executor,
+        domain: str,
+        future: concurrent.futures.Future,
+        work: Callable[[], object],
+    ) -> None:
+        """Run `work` in an already taken slot of `domain`, then start the next waiting work."""
+
+        def run() -> object:
+            # Cancelled by the caller while waiting, e.g. past a batch deadline: skip the work.
+            # Otherwise the future can't be cancelled anymore, so `done` can always set it.
+            if not future.set_running_or_notify_cancel():
+                return None
+            return work()
+
+        def done(inner: concurrent.futures.Future) -> None:
+            try:
+                if future.done():
+                    pass
+                elif inner.cancelled():
+                    future.cancel()
+                elif (error := inner.exception()) is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(inner.result())
+            finally:
+                with self._lock:
+                    if self._waiting[domain]:
+                        following = self._waiting[domain].popleft()
+                    else:
+                        self._running[domain] -= 1
+                        following = None
+                if following is not None:
+                    self._start(executor, domain, *following)
+
+        try:
+            inner = executor.submit(run)
+        except RuntimeError:
+            # Executor shut down: cancel this and everything waiting on the domain.
+            future.cancel()
+            with self._lock:
+                waiting, self._waiting[domain] = self._waiting[domain], deque()
+                self._running[domain] -= 1
+            for following, _ in waiting:
+                following.cancel()
+            return
+        inner.add_done_callback(done)
+
+    def wrap(self, download: Callable[[str], str | None]) -> Callable[[str], str | None]:
+        """Throttled version of `download`, returning None for skipped or failed URLs."""
+
+        def throttled(url: str) -> str | None:
+            return self.download(url, download)
+
+        return throttled
+
+    def guard(self, download: Callable[[str], str | None]) -> Callable[[str], str | None]:
+        """Version of `download` behind the circuit breaker only, for work `submit` runs in a slot."""
+
+        def guarded(url: str) -> str | None:
+            return self.download(url, download, acquire_slot=False)
+
+        return guarded
+
+    def download(self, url: str, download: Callable[[str], str | None], acquire_slot: bool = True) -> str | None:
+        """Download `url` with `download` within the limits of its domain.
+
+        Args:
+            url (str): URL to download.
+            download (Callable[[str], str | None]): Download function, returning None on failure.
+            acquire_slot (bool, optional): Wait for a free slot of the domain. False when the
+                caller already holds one, i.e. runs in work started by `submit`.
+                Defaults to True.
+
+        Returns:
+            str | None: Downloaded page, or None if it failed or its domain is being skipped.
+
+        """
+        domain = urlsplit(url).netloc.lower()
+        if not self.breaker.allow(domain):
+            metrics.increment('article_downloads_skipped_total', reason='circuit_open')
+            return None
+
+        with self._slot(domain) if acquire_slot else contextlib.nullcontext():
+            try:
+                html = download(url)
+            except Exception:
+                html = None
+
+        if html is None:
+            self.breaker.record_failure(domain)
+        else:
+            self.breaker.record_success(domain)
+        return html
+
+    def _slot(self, domain: str) -> threading.BoundedSemaphore:
+        """Concurrency slots of `domain`."""
+        with self._lock:
+            if (slot := self._slots.get(domain)) is None:
+                slot = self._slots[domain] = threading.BoundedSemaphore(self.max_per_domain)
+        return slot
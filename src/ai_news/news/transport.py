@@ -0,0 +1,253 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Protocol
+
+from newsapi import NewsApiClient
+from newsapi.newsapi_exception import NewsAPIException
+
+from ai_news.news.pipeline import download_html
+from ai_news.news.util import NewsException
+
+
+class Transport(Protocol):
+    """Where `News` gets News API responses and raw article HTML from.
+
+    API methods take the keyword arguments of the matching `NewsApiClient` method
+    and return its json response.
+
+    """
+
+    def get_sources(self, **params: Any) -> dict[str, Any]: ...
+
+    def get_top_headlines(self, **params: Any) -> dict[str, Any]: ...
+
+    def get_everything(self, **params: Any) -> dict[str, Any]: ...
+
+    def download(self, url: str) -> str | None: ...
+
+
+class LiveTransport:
+    """Talk to the live News API and download articles from their URLs."""
+
+    def __init__(self, api_key: str | None = None, download_timeout: float | None = 10.0) -> None:
+        """Create live transport.
+
+        Args:
+            api_key (str, optional): News API key.
+                Defaults to None. Loaded from environment variables.
+            download_timeout (float, optional): Connect and read timeout of an article download in seconds.
+                Defaults to 10 seconds. None uses trafilatura's default.
+
+        """
+        self._client = NewsApiClient(api_key=api_key or os.environ['NEWS_API_KEY'])
+        self.download_timeout = download_timeout
+
+    def get_sources(self, **params: Any) -> dict[str, Any]:
+        response: dict[str, Any] = self._client.get_sources(**params)
+        return response
+
+    def get_top_headlines(self, **params: Any) -> dict[str, Any]:
+        response: dict[str, Any] = self._client.get_top_headlines(**params)
+        return response
+
+    def get_everything(self, **params: Any) -> dict[str, Any]:
+        response: dict[str, Any] = self._client.get_everything(**params)
+        return response
+
+    def download(self, url: str) -> str | None:
+        return download_html(url, timeout=self.download_timeout)
+
+
+class RecordingTransport:
+    """Forward to another transport and record every response to an archive.
+
+    The archive is a directory with one json file per API request under `api/`
+    and per downloaded URL under `html/`, read back by `ReplayTransport`.
+    API errors (e.g. `maximumResultsReached` at the end of paging) are recorded
+    and replayed too.
+
+    """
+
+    def __init__(self, transport: Transport, path: str = 'res/news_archive') -> None:
+        """Create recording transport.
+
+        Args:
+            transport (Transport): Transport to forward requests to, usually `LiveTransport`.
+            path (str, optional): Archive directory.
+                Defaults to 'res/news_archive'.
+
+        """
+        self._transport = transport
+        self.path = path
+        os.makedirs(os.path.join(path, 'api'), exist_ok=True)
+        os.makedirs(os.path.join(path, 'html'), exist_ok=True)
+
+    def get_sources(self, **params: Any) -> dict[str, Any]:
+        return self._record('sources', params)
+
+    def get_top_headlines(self, **params: Any) -> dict[str, Any]:
+        return self._record('top_headlines', params)
+
+    def get_everything(self, **params: Any) -> dict[str, Any]:
+        return self._record('everything', params)
+
+    def download(self, url: str) -> str | None:
+        html = self._transport.download(url)
+        _write_json(_html_path(self.path, url), {'url': url, 'html': html})
+        return html
+
+    def _record(self, endpoint: str, params: dict[str, Any]) -> dict[str, Any]:
+        """Forward an API request to `endpoint` and record its response or error."""
+        method = getattr(self._transport, f'get_{endpoint}')
+        entry: dict[str, Any] = {'endpoint': endpoint, 'params': params}
+        try:
+            response: dict[str, Any] = method(**params)
+        except NewsAPIException as e:
+            entry['error'] = e.exception
+            _write_json(_api_path(self.path, endpoint, params), entry)
+            raise
+
+        entry['response'] = response
+        _write_json(_api_path(self.path, endpoint, params), entry)
+        return response
+
+
+class ReplayTransport:
+    """Serve News API responses and article HTML from a recorded archive, offline.
+
+    Responses are served with a simulated latency, so ingest runs are repeatable
+    and their throughput is comparable across machines without any network.
+
+    """
+
+    def __init__(
+        self,
+        path: str = 'res/news_archive',
+        api_latency: float = 0.0,
+        download_latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: int | None = 0,
+    ) -> None:
+        """Create replay transport.
+
+        Args:
+            path (str, optional): Archive directory written by `RecordingTransport`.
+                Defaults to 'res/news_archive'.
+            api_latency (float, optional): Simulated seconds per API request.
+                Defaults to 0.0.
+            download_latency (float, optional): Simulated seconds per article download.
+                Defaults to 0.0.
+            jitter (float, optional): Random +/- fraction applied to each latency.
+                Defaults to 0.0.
+            seed (int, optional): Seed of the jitter, None for a random one.
+                Defaults to 0.
+
+        """
+        if not os.path.isdir(path):
+            raise NewsException(f'No news archive at {path!r}')
+
+        self.path = path
+        self.api_latency = api_latency
+        self.download_latency = download_latency
+        self.jitter = jitter
+
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def get_sources(self, **params: Any) -> dict[str, Any]:
+        return self._replay('sources', params)
+
+    def get_top_headlines(self, **params: Any) -> dict[str, Any]:
+        return self._replay('top_headlines', params)
+
+    def get_everything(self, **params: Any) -> dict[str, Any]:
+        return self._replay('everything', params)
+
+    def download(self, url: str) -> str | None:
+        """Recorded HTML of `url`, None if it wasn't recorded (like a failed download)."""
+        self._sleep(self.download_latency)
+        path = _html_path(self.path, url)
+        if not os.path.exists(path):
+            return None
+        html: str | None = _read_json(path)['html']
+        return html
+
+    def _replay(self, endpoint: str, params: dict[str, Any]) -> dict[str, Any]:
+        """Recorded response to an API request, raising its recorded error if any."""
+        self._sleep(self.api_latency)
+        path = _api_path(self.path, endpoint, params)
+        if not os.path.exists(path):
+            raise NewsException(f'No recorded response for {endpoint} with {params}')
+
+        entry = _read_json(path)
+        if 'error' in entry:
+            raise NewsAPIException(entry['error'])
+        response: dict[str, Any] = entry['response']
+        return response
+
+    def _sleep(self, latency: float) -> None:
+        """Simulate `latency` seconds of network time."""
+        if latency <= 0:
+            return
+        with self._random_lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(latency * factor)
+
+
+def transport_from_env(api_key: str | None = None) -> Transport:
+    """Transport configured by environment variables.
+
+    `NEWS_REPLAY_DIR` replays the archive at that path (with the optional
+    `NEWS_REPLAY_API_LATENCY` and `NEWS_REPLAY_DOWNLOAD_LATENCY` in seconds),
+    `NEWS_RECORD_DIR` records live traffic to it, otherwise the live News API is used.
+
+    Args:
+        api_key (str, optional): News API key for live traffic.
+            Defaults to None. Loaded from environment variables.
+
+    Returns:
+        Transport: Configured transport.
+
+    """
+    if replay_dir := os.environ.get('NEWS_REPLAY_DIR'):
+        return ReplayTransport(
+            path=replay_dir,
+            api_latency=float(os.environ.get('NEWS_REPLAY_API_LATENCY', 0)),
+            download_latency=float(os.environ.get('NEWS_REPLAY_DOWNLOAD_LATENCY', 0)),
+        )
+
+    transport = LiveTransport(api_key=api_key)
+    if record_dir := os.environ.get('NEWS_RECORD_DIR'):
+        return RecordingTransport(transport, path=record_dir)
+    return transport
+
+
+def _key(*parts: Any) -> str:
+    """Stable archive key of a request."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _api_path(root: str, endpoint: str, params: dict[str, Any]) -> str:
+    return os.path.join(root, 'api', f'{endpoint}-{_key(endpoint, params)}.json')
+
+
+def _html_path(root: str, url: str) -> str:
+    return os.path.join(root, 'html', f'{_key(url)}.json')
+
+
+def _read_json(path: str) -> dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        data: dict[str, Any] = json.load(f)
+    return data
+
+
+def _write_json(path: str, data: dict[str, Any]) -> None:
+    """Write json atomically, so concurrent readers never see a partial file."""
+    tmp = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, default=str)
+    os.replace(tmp, path)
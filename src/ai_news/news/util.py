@@ -1,7 +1,14 @@
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Self
+from typing import Any, Self
+
+# Document metadata only used to filter retrieval, kept out of embeddings and prompts.
+FILTER_METADATA_KEYS = ('published_ts', 'category')
+
+
+class NewsException(Exception):
+    """Something went wrong with the News API."""
 
 
 class Category(Enum):
@@ -55,6 +62,7 @@ class Source:
     category: Category | None = field(default=None, repr=True)
     description: str | None = field(default=None, repr=False)
     language: str = field(default='en', repr=False)
+    country: str | None = field(default=None, repr=False)
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, Source):
@@ -95,3 +103,26 @@ class NewsArticle:
     source: Source = field(repr=False)
     url: str = field(repr=False)
     image_url: str = field(repr=False)
+
+
+def filter_metadata(published_at: datetime | str, category: Category | None = None) -> dict[str, Any]:
+    """Document metadata to filter retrieval by, see `FILTER_METADATA_KEYS`.
+
+    Args:
+        published_at (datetime | str): Publish date, naive dates are assumed to be UTC.
+        category (Category, optional): Category of the article's source.
+            Defaults to None.
+
+    Returns:
+        dict[str, Any]: Publish date as a Unix timestamp (for range filters) and the category, if known.
+
+    """
+    if isinstance(published_at, str):
+        published_at = datetime.fromisoformat(published_at)
+    if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=timezone.utc)
+
+    metadata: dict[str, Any] = {'published_ts': int(published_at.timestamp())}
+    if category is not None:
+        metadata['category'] = category.value
+    return metadata
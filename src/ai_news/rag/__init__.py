@@ -0,0 +1,48 @@
+"""Index news into Chroma and chat with it.
+
+The submodules import llama_index and chromadb, which take seconds to load, so
+the names below are only imported once they're first used:
+
+    from ai_news import rag
+
+    index = rag.load_index()  # llama_index is imported here.
+
+"""
+
+from typing import TYPE_CHECKING
+
+from ai_news._lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from ai_news.rag.data import get_news_documents
+    from ai_news.rag.embedding_cache import CachedEmbedding, EmbeddingCache
+    from ai_news.rag.index import (
+        VECTOR_STORE_PATH,
+        SplitterType,
+        create_index,
+        get_default_client,
+        get_embed_model,
+        load_index,
+        refresh_index,
+    )
+    from ai_news.rag.manager import IndexManager, Topic
+
+# Public name -> module it's defined in.
+_LAZY = {
+    'CachedEmbedding': 'ai_news.rag.embedding_cache',
+    'EmbeddingCache': 'ai_news.rag.embedding_cache',
+    'IndexManager': 'ai_news.rag.manager',
+    'SplitterType': 'ai_news.rag.index',
+    'Topic': 'ai_news.rag.manager',
+    'VECTOR_STORE_PATH': 'ai_news.rag.index',
+    'create_index': 'ai_news.rag.index',
+    'get_default_client': 'ai_news.rag.index',
+    'get_embed_model': 'ai_news.rag.index',
+    'get_news_documents': 'ai_news.rag.data',
+    'load_index': 'ai_news.rag.index',
+    'refresh_index': 'ai_news.rag.index',
+}
+
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY)
+
+__all__ = sorted(_LAZY)
@@ -0,0 +1,402 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+from chromadb.api.models.Collection import Collection
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import BaseNode, MetadataMode, NodeWithScore, QueryBundle, TextNode
+from llama_index.core.vector_stores.types import FilterCondition, FilterOperator, MetadataFilters
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
+
+from ai_news import metrics
+
+# Keeps names like "gpt-4o", "llama-3.1" or "u.s" as one token.
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:[-.][a-z0-9]+)*')
+
+STOP_WORDS = frozenset(
+    'a an and are as at be been but by can could did do does for from had has have how i if in into is it its '
+    'me my no not of on or our so than that the their them then there these they this to was we were what when '
+    'where which who whom why will with would you your about any after all also more most new news some tell '
+    'today latest'.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase terms of `text` without stop words."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS and len(token) > 1]
+
+
+class BM25Index:
+    """Persistent inverted index ranking nodes with Okapi BM25.
+
+    Kept next to a Chroma collection for exact matches of names (companies,
+    models, people) that embeddings are poor at. Postings are stored in a SQLite
+    database under `path`, one per collection `name`, and updated incrementally
+    as nodes are added or deleted.
+
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS nodes (
+            node_id TEXT PRIMARY KEY,
+            length INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            metadata TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            term TEXT NOT NULL,
+            node_id TEXT NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (term, node_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS postings_node_id ON postings (node_id);
+    """
+
+    def __init__(
+        self,
+        path: str = 'res/lexical_index',
+        name: str = 'artificial_intelligence',
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> None:
+        """Open (or create) the BM25 index of collection `name`.
+
+        Args:
+            path (str, optional): Directory to store the index databases in.
+                Defaults to 'res/lexical_index'.
+            name (str, optional): Name of the Chroma collection the index belongs to.
+                Defaults to 'artificial_intelligence'.
+            k1 (float, optional): Term frequency saturation.
+                Defaults to 1.5.
+            b (float, optional): Document length normalization.
+                Defaults to 0.75.
+
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.name = name
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(path, f'{name}.sqlite3'),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self._SCHEMA)
+
+    def add(self, nodes: Sequence[BaseNode]) -> int:
+        """Index `nodes`, replacing nodes with the same id.
+
+        Args:
+            nodes (Sequence[BaseNode]): Nodes to index, e.g. the ones written to Chroma.
+
+        Returns:
+            int: Number of nodes indexed.
+
+        """
+        rows = []
+        postings = []
+        for node in nodes:
+            terms = Counter(tokenize(_indexed_text(node)))
+            rows.append(
+                (
+                    node.node_id,
+                    sum(terms.values()),
+                    node.get_content(metadata_mode=MetadataMode.NONE),
+                    json.dumps(node.metadata, default=str),
+                )
+            )
+            postings.extend((term, node.node_id, tf) for term, tf in terms.items())
+
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._delete([row[0] for row in rows])
+                self._conn.executemany('INSERT INTO nodes VALUES (?, ?, ?, ?)', rows)
+                self._conn.executemany('INSERT INTO postings VALUES (?, ?, ?)', postings)
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+        return len(rows)
+
+    def update_metadata(self, metadata: Mapping[str, Mapping[str, Any]]) -> int:
+        """Add keys to the stored metadata of nodes, e.g. after they were updated in Chroma.
+
+        Args:
+            metadata (Mapping[str, Mapping[str, Any]]): Metadata to add to each node, by node id.
+
+        Returns:
+            int: Number of indexed nodes updated.
+
+        """
+        node_ids = list(metadata)
+        updated = 0
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                for start in range(0, len(node_ids), 500):
+                    batch = node_ids[start : start + 500]
+                    placeholders = ','.join('?' * len(batch))
+                    rows = self._conn.execute(
+                        f'SELECT node_id, metadata FROM nodes WHERE node_id IN ({placeholders})',
+                        batch,
+                    ).fetchall()
+                    self._conn.executemany(
+                        'UPDATE nodes SET metadata = ? WHERE node_id = ?',
+                        [
+                            (json.dumps({**json.loads(stored), **metadata[node_id]}, default=str), node_id)
+                            for node_id, stored in rows
+                        ],
+                    )
+                    updated += len(rows)
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+        return updated
+
+    def delete(self, node_ids: Iterable[str]) -> None:
+        """Remove nodes from the index."""
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._delete(list(node_ids))
+            self._conn.execute('COMMIT')
+
+    def _delete(self, node_ids: list[str]) -> None:
+        """Remove nodes. Call with the lock held, inside a transaction."""
+        for start in range(0, len(node_ids), 500):
+            batch = node_ids[start : start + 500]
+            placeholders = ','.join('?' * len(batch))
+            self._conn.execute(f'DELETE FROM postings WHERE node_id IN ({placeholders})', batch)
+            self._conn.execute(f'DELETE FROM nodes WHERE node_id IN ({placeholders})', batch)
+
+    @metrics.timed('lexical_search_seconds')
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        filters: MetadataFilters | None = None,
+    ) -> list[tuple[str, float, float]]:
+        """Rank nodes by BM25 score for `query`.
+
+        Args:
+            query (str): Search query.
+            top_k (int, optional): Number of nodes to return.
+                Defaults to 10.
+            filters (MetadataFilters, optional): Only return nodes whose metadata matches.
+                Defaults to None.
+
+        Returns:
+            list[tuple[str, float, float]]: Node id, BM25 score and the fraction of the query's
+                IDF weight the node matches, best first.
+
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            count, total_length = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(length), 0) FROM nodes').fetchone()
+            if not count:
+                return []
+            average_length = total_length / count
+
+            scores: Counter[str] = Counter()
+            matched: Counter[str] = Counter()
+            idfs: dict[str, float] = {}
+            for term in terms:
+                postings = self._conn.execute(
+                    'SELECT postings.node_id, tf, length FROM postings JOIN nodes USING (node_id) WHERE term = ?',
+                    (term,),
+                ).fetchall()
+                if not postings:
+                    idfs[term] = math.log(1 + (count + 0.5) / 0.5)
+                    continue
+                idf = idfs[term] = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for node_id, tf, length in postings:
+                    norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                    scores[node_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+                    matched[node_id] += idf
+
+            ranked = scores.most_common()
+            if filters is not None and filters.filters:
+                ranked = self._filter(ranked, filters, top_k)
+
+        total_idf = sum(idfs.values())
+        return [(node_id, score, matched[node_id] / total_idf) for node_id, score in ranked[:top_k]]
+
+    def _filter(self, ranked: list[tuple[str, float]], filters: MetadataFilters, top_k: int) -> list[tuple[str, float]]:
+        """Best `top_k` of `ranked` whose metadata matches `filters`. Call with the lock held."""
+        kept: list[tuple[str, float]] = []
+        for start in range(0, len(ranked), 500):
+            batch = ranked[start : start + 500]
+            placeholders = ','.join('?' * len(batch))
+            metadata = dict(
+                self._conn.execute(
+                    f'SELECT node_id, metadata FROM nodes WHERE node_id IN ({placeholders})',
+                    [node_id for node_id, _ in batch],
+                ).fetchall()
+            )
+            kept.extend(
+                (node_id, score) for node_id, score in batch if matches_filters(json.loads(metadata[node_id]), filters)
+            )
+            if len(kept) >= top_k:
+                break
+        return kept
+
+    def get_nodes(self, node_ids: Sequence[str]) -> list[TextNode]:
+        """Stored nodes, in the order of `node_ids` (missing ids are skipped)."""
+        found: dict[str, tuple[str, str]] = {}
+        with self._lock:
+            for start in range(0, len(node_ids), 500):
+                batch = list(node_ids[start : start + 500])
+                placeholders = ','.join('?' * len(batch))
+                for node_id, text, metadata in self._conn.execute(
+                    f'SELECT node_id, text, metadata FROM nodes WHERE node_id IN ({placeholders})',
+                    batch,
+                ):
+                    found[node_id] = (text, metadata)
+        return [
+            TextNode(id_=node_id, text=found[node_id][0], metadata=json.loads(found[node_id][1]))
+            for node_id in node_ids
+            if node_id in found
+        ]
+
+    def sync(self, collection: Collection, batch_size: int = 1_000) -> int:
+        """Index the nodes of `collection` that are missing, e.g. after upgrading an existing store.
+
+        Args:
+            collection (Collection): Chroma collection the index belongs to.
+            batch_size (int, optional): Number of nodes read from Chroma at once.
+                Defaults to 1,000.
+
+        Returns:
+            int: Number of nodes indexed.
+
+        """
+        if len(self) >= collection.count():
+            return 0
+
+        with self._lock:
+            indexed = {node_id for (node_id,) in self._conn.execute('SELECT node_id FROM nodes')}
+        missing = [node_id for node_id in collection.get(include=[])['ids'] if node_id not in indexed]
+
+        added = 0
+        for start in range(0, len(missing), batch_size):
+            result = collection.get(ids=missing[start : start + batch_size], include=['documents', 'metadatas'])
+            nodes = [
+                _node_from_chroma(node_id, text, metadata)
+                for node_id, text, metadata in zip(result['ids'], result['documents'] or [], result['metadatas'] or [])
+            ]
+            added += self.add(nodes)
+        if added:
+            print(f'Indexed {added:,} nodes of {collection.name} for lexical search.')
+        return added
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute('SELECT COUNT(*) FROM nodes').fetchone()
+        return int(count)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class BM25Retriever(BaseRetriever):
+    """Retrieve nodes from a `BM25Index`, without any embedding call."""
+
+    def __init__(
+        self,
+        index: BM25Index,
+        similarity_top_k: int = 4,
+        filters: MetadataFilters | None = None,
+    ) -> None:
+        """Create BM25 retriever.
+
+        Args:
+            index (BM25Index): Lexical index to search.
+            similarity_top_k (int, optional): Number of nodes to return.
+                Defaults to 4.
+            filters (MetadataFilters, optional): Only return nodes whose metadata matches.
+                Defaults to None.
+
+        """
+        super().__init__()
+        self.index = index
+        self.similarity_top_k = similarity_top_k
+        self.filters = filters
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        return [node for node, _ in self.retrieve_with_coverage(query_bundle)]
+
+    def retrieve_with_coverage(self, query_bundle: QueryBundle) -> list[tuple[NodeWithScore, float]]:
+        """Retrieved nodes with the fraction of the query's IDF weight each one matches."""
+        results = self.index.search(query_bundle.query_str, top_k=self.similarity_top_k, filters=self.filters)
+        nodes = {node.node_id: node for node in self.index.get_nodes([node_id for node_id, _, _ in results])}
+        return [
+            (NodeWithScore(node=nodes[node_id], score=score), coverage)
+            for node_id, score, coverage in results
+            if node_id in nodes
+        ]
+
+
+def matches_filters(metadata: dict[str, Any], filters: MetadataFilters) -> bool:
+    """Whether `metadata` matches `filters`, evaluated like Chroma's `where`."""
+    results = []
+    for condition in filters.filters:
+        if isinstance(condition, MetadataFilters):
+            results.append(matches_filters(metadata, condition))
+            continue
+
+        value = metadata.get(condition.key)
+        match condition.operator:
+            case FilterOperator.EQ:
+                result = value == condition.value
+            case FilterOperator.NE:
+                result = value != condition.value
+            case FilterOperator.GT:
+                result = value is not None and value > condition.value
+            case FilterOperator.GTE:
+                result = value is not None and value >= condition.value
+            case FilterOperator.LT:
+                result = value is not None and value < condition.value
+            case FilterOperator.LTE:
+                result = value is not None and value <= condition.value
+            case FilterOperator.IN:
+                result = value in condition.value
+            case FilterOperator.NIN:
+                result = value not in condition.value
+            case _:
+                raise ValueError(f'Unsupported filter operator {condition.operator}')
+        results.append(result)
+
+    return any(results) if filters.condition == FilterCondition.OR else all(results)
+
+
+def _node_from_chroma(node_id: str, text: str | None, metadata: dict[str, Any] | None) -> BaseNode:
+    """Node as stored by `ChromaVectorStore`, falling back to the raw metadata."""
+    try:
+        node = metadata_dict_to_node(dict(metadata or {}))
+        node.set_content(text or '')
+    except Exception:
+        node = TextNode(id_=node_id, text=text or '', metadata=dict(metadata or {}))
+    return node
+
+
+def _indexed_text(node: BaseNode) -> str:
+    """Text of `node` the index matches against: its title and content."""
+    title = node.metadata.get('title') or ''
+    return f'{title}\n{node.get_content(metadata_mode=MetadataMode.NONE)}'
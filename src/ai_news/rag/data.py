@@ -1,7 +1,10 @@
+from datetime import datetime
+
 from dotenv import load_dotenv
 from llama_index.core import Document
 
-from ai_news.news import News
+from ai_news import metrics
+from ai_news.news import ArticleCache, News, Transport
 from ai_news.news.util import Category
 
 load_dotenv()
@@ -13,6 +16,10 @@ def get_news_documents(
     country: str | None = None,
     language: str = 'en',
     news_api_key: str | None = None,
+    max_articles: int | None = None,
+    from_date: datetime | None = None,
+    cache_dir: str | None = 'res/article_cache',
+    transport: Transport | None = None,
 ) -> list[Document]:
     """Get list of news articles.
 
@@ -27,12 +34,25 @@ def get_news_documents(
             Default is 'en'.
         news_api_key (str, optional): News API key.
             Defaults to None.
+        max_articles (int, optional): Page through results until this many articles are fetched.
+            Defaults to None (a single page of results).
+        from_date (datetime, optional): Only get articles published after this date.
+            Defaults to None.
+        cache_dir (str, optional): Directory of the extracted article cache.
+            None disables caching. Defaults to 'res/article_cache'.
+        transport (Transport, optional): Source of API responses and article HTML,
+            e.g. a `ReplayTransport` to run offline.
+            Defaults to None. Configured by environment variables.
 
     Returns:
         list[Document]: Parsed articles based on given params.
 
     """
-    news = News(api_key=news_api_key)
+    news = News(
+        api_key=news_api_key,
+        cache=ArticleCache(path=cache_dir) if cache_dir is not None else None,
+        transport=transport,
+    )
 
     # Sources.
     sources = news.get_sources(
@@ -41,11 +61,13 @@ def get_news_documents(
         language=language,
     )
 
-    # TODO: Get more than 100 articles.
     documents: list[Document] = news.get_documents(
         q=topic,
         sources=sources,
+        max_articles=max_articles,
+        from_date=from_date,
     )
+    metrics.increment('news_documents_total', len(documents))
     return documents
 
 
@@ -0,0 +1,183 @@
+import hashlib
+import re
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+from llama_index.core import Document
+
+# Query parameters that only track where a reader came from.
+TRACKING_PARAMS = frozenset({'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ocid', 'ref', 'cmpid', 'smid', 'guccounter'})
+
+# Mersenne prime larger than any 32-bit shingle hash.
+_PRIME = np.uint64((1 << 61) - 1)
+
+
+def canonicalize_url(url: str) -> str:
+    """Canonical form of an article URL.
+
+    Lowercases the scheme and host, drops `www.`, AMP suffixes, fragments,
+    trailing slashes and tracking query parameters, and sorts the remaining ones.
+
+    Args:
+        url (str): Article URL.
+
+    Returns:
+        str: Canonical URL.
+
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix('www.').removeprefix('amp.')
+    path = re.sub(r'/(amp|amp\.html)/?$', '', parts.path).rstrip('/') or '/'
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+class MinHasher:
+    """MinHash signatures over word shingles."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 42) -> None:
+        """Create MinHasher.
+
+        Args:
+            num_perm (int, optional): Number of hash permutations (signature length).
+                Defaults to 128.
+            shingle_size (int, optional): Number of words per shingle.
+                Defaults to 5.
+            seed (int, optional): Seed of the random permutations.
+                Defaults to 42.
+
+        """
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> set[str]:
+        """Word shingles of the lowercased text."""
+        words = re.findall(r'\w+', text.lower())
+        if len(words) <= self.shingle_size:
+            return {' '.join(words)}
+        return {' '.join(words[i : i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of `text`."""
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+                for shingle in self.shingles(text)
+            ),
+            dtype=np.uint64,
+        )
+        # (a * x + b) mod p for every permutation/shingle pair, min over shingles.
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        signature: np.ndarray = permuted.min(axis=0)
+        return signature
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float(np.mean(a == b))
+
+
+def deduplicate_documents(
+    documents: list[Document],
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    shingle_size: int = 5,
+) -> list[Document]:
+    """Collapse duplicate and near-duplicate news documents.
+
+    Documents with the same canonical URL, or whose bodies have an estimated
+    Jaccard similarity of at least `threshold`, are grouped together. The longest
+    document of each group is kept and the others are recorded in its
+    `alternate_sources` and `alternate_urls` metadata.
+
+    Args:
+        documents (list[Document]): Documents to deduplicate.
+        threshold (float, optional): Minimum similarity of near-duplicates.
+            Defaults to 0.8.
+        num_perm (int, optional): MinHash signature length.
+            Defaults to 128.
+        shingle_size (int, optional): Number of words per shingle.
+            Defaults to 5.
+
+    Returns:
+        list[Document]: Canonical documents, in their original order.
+
+    """
+    hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+    signatures = [hasher.signature(document.text) for document in documents]
+
+    # Union-find over document indices.
+    parent = list(range(len(documents)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        parent[find(j)] = find(i)
+
+    # Exact duplicates by canonical URL.
+    by_url: dict[str, int] = {}
+    for i, document in enumerate(documents):
+        url = canonicalize_url(str(document.metadata.get('url', '')))
+        if url in by_url:
+            union(by_url[url], i)
+        else:
+            by_url[url] = i
+
+    # Near-duplicates: LSH banding finds candidate pairs, signatures verify them.
+    bands, rows = _lsh_params(num_perm, threshold)
+    for band in range(bands):
+        buckets: defaultdict[bytes, list[int]] = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            buckets[signature[band * rows : (band + 1) * rows].tobytes()].append(i)
+        for first, *rest in buckets.values():
+            for j in rest:
+                if find(first) != find(j) and MinHasher.similarity(signatures[first], signatures[j]) >= threshold:
+                    union(first, j)
+
+    groups: defaultdict[int, list[int]] = defaultdict(list)
+    for i in range(len(documents)):
+        groups[find(i)].append(i)
+
+    canonical: list[int] = []
+    for members in groups.values():
+        keep = max(members, key=lambda i: len(documents[i].text))
+        duplicates = [documents[i] for i in members if i != keep]
+        if duplicates:
+            document = documents[keep]
+            document.metadata['alternate_sources'] = ', '.join(
+                str(duplicate.metadata.get('source')) for duplicate in duplicates
+            )
+            document.metadata['alternate_urls'] = ' '.join(
+                str(duplicate.metadata.get('url')) for duplicate in duplicates
+            )
+            document.excluded_embed_metadata_keys.extend(['alternate_sources', 'alternate_urls'])
+            document.excluded_llm_metadata_keys.append('alternate_urls')
+        canonical.append(keep)
+
+    print(f'Deduplicated {len(documents):,} documents into {len(canonical):,}.')
+    return [documents[i] for i in sorted(canonical)]
+
+
+def _lsh_params(num_perm: int, threshold: float) -> tuple[int, int]:
+    """Number of bands & rows of the LSH S-curve.
+
+    The S-curve threshold (1/b)^(1/r) is placed a little below `threshold`, so that
+    true near-duplicates rarely miss becoming candidates; false candidates are
+    rejected when their signatures are compared.
+
+    """
+    target = max(threshold - 0.1, 0.05)
+    candidates = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - target))
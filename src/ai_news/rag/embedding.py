@@ -0,0 +1,222 @@
+import concurrent.futures
+import random
+import threading
+import time
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.core.utils import get_tokenizer
+from llama_index.embeddings.openai import OpenAIEmbedding
+from llama_index.embeddings.openai.base import get_embeddings
+
+from ai_news import metrics
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that halves on rate limits and grows back on success.
+
+    Additive-increase/multiplicative-decrease: every rate-limited call halves the
+    number of batches allowed in flight (down to 1), and every `increase_after`
+    consecutive successes raises it by one (up to `max_limit`).
+
+    """
+
+    def __init__(self, max_limit: int, increase_after: int = 4) -> None:
+        """Create limiter starting at `max_limit`.
+
+        Args:
+            max_limit (int): Maximum number of concurrent calls.
+            increase_after (int, optional): Successes needed before raising the limit.
+                Defaults to 4.
+
+        """
+        self.max_limit = max_limit
+        self.limit = max_limit
+        self.increase_after = increase_after
+
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """Block until a call is allowed."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    def release(self, rate_limited: bool = False) -> None:
+        """Release a call and adapt the limit to its outcome."""
+        with self._condition:
+            self._in_flight -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.increase_after and self.limit < self.max_limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+class NoRetryOpenAIEmbedding(OpenAIEmbedding):
+    """`OpenAIEmbedding` that raises rate limited batches instead of retrying them.
+
+    `embed_nodes` retries rate limited batches itself, after lowering its
+    `AdaptiveLimiter`. The OpenAI client's and llama-index's own retries would
+    hide those rate limits from the limiter, so both are disabled for batches.
+    Single (e.g. query) embeddings keep llama-index's retries.
+
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Create OpenAI embedding model. Takes the same arguments as `OpenAIEmbedding`, but `max_retries`."""
+        super().__init__(**{**kwargs, 'max_retries': 0})
+
+    @classmethod
+    def class_name(cls) -> str:
+        return 'NoRetryOpenAIEmbedding'
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        # Undecorated, i.e. without llama-index's retries.
+        embeddings: list[list[float]] = get_embeddings.__wrapped__(
+            self._get_client(),
+            texts,
+            engine=self._text_engine,
+            **self.additional_kwargs,
+        )
+        return embeddings
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether `error` is a rate limit (HTTP 429) response from the embedding API."""
+    if getattr(error, 'status_code', None) == 429:
+        return True
+    if (response := getattr(error, 'response', None)) is not None and getattr(response, 'status_code', None) == 429:
+        return True
+    return type(error).__name__ == 'RateLimitError'
+
+
+def batch_nodes(
+    nodes: Sequence[BaseNode],
+    max_batch_tokens: int = 8_000,
+    max_batch_size: int = 100,
+    tokenizer: Callable[[str], list[int]] | None = None,
+) -> list[list[tuple[BaseNode, str]]]:
+    """Group nodes into batches of at most `max_batch_size` nodes and `max_batch_tokens` tokens.
+
+    A node longer than `max_batch_tokens` on its own gets a batch to itself.
+
+    Args:
+        nodes (Sequence[BaseNode]): Nodes to group.
+        max_batch_tokens (int, optional): Token budget of a batch.
+            Defaults to 8,000.
+        max_batch_size (int, optional): Maximum number of nodes in a batch.
+            Defaults to 100.
+        tokenizer (Callable[[str], list[int]], optional): Tokenizer used to count tokens.
+            Defaults to None, llama-index's global tokenizer.
+
+    Returns:
+        list[list[tuple[BaseNode, str]]]: Batches of nodes with the text to embed.
+
+    """
+    tokenizer = tokenizer or get_tokenizer()
+
+    batches: list[list[tuple[BaseNode, str]]] = []
+    batch: list[tuple[BaseNode, str]] = []
+    batch_tokens = 0
+    for node in nodes:
+        text = node.get_content(metadata_mode=MetadataMode.EMBED)
+        tokens = len(tokenizer(text))
+        if batch and (batch_tokens + tokens > max_batch_tokens or len(batch) >= max_batch_size):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append((node, text))
+        batch_tokens += tokens
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def embed_nodes(
+    nodes: Sequence[BaseNode],
+    embed_model: BaseEmbedding,
+    max_batch_tokens: int = 8_000,
+    max_batch_size: int | None = None,
+    max_concurrency: int = 4,
+    max_retries: int = 6,
+    backoff: float = 1.0,
+    max_backoff: float = 60.0,
+) -> list[BaseNode]:
+    """Embed nodes in token-budgeted batches, several batches at a time.
+
+    Nodes that already have an embedding are skipped, so the resulting nodes
+    can be passed straight to `VectorStoreIndex` without being embedded again.
+    On rate limit responses the number of concurrent batches is halved and the
+    batch is retried after an exponential backoff with jitter. `embed_model`
+    should raise rate limit errors rather than retry them itself (see
+    `NoRetryOpenAIEmbedding`), or the limit never adapts.
+
+    Args:
+        nodes (Sequence[BaseNode]): Nodes to embed.
+        embed_model (BaseEmbedding): Embedding model.
+        max_batch_tokens (int, optional): Token budget of a batch.
+            Defaults to 8,000.
+        max_batch_size (int, optional): Maximum number of nodes in a batch.
+            Defaults to None, the embedding model's `embed_batch_size`.
+        max_concurrency (int, optional): Maximum number of batches in flight.
+            Defaults to 4.
+        max_retries (int, optional): Retries of a rate limited batch before giving up.
+            Defaults to 6.
+        backoff (float, optional): Initial backoff in seconds.
+            Defaults to 1.
+        max_backoff (float, optional): Maximum backoff in seconds.
+            Defaults to 60.
+
+    Raises:
+        Exception: The embedding error if a batch fails with something other than
+            a rate limit, or is still rate limited after `max_retries`.
+
+    Returns:
+        list[BaseNode]: The same nodes, with `embedding` set.
+
+    """
+    batches = batch_nodes(
+        [node for node in nodes if node.embedding is None],
+        max_batch_tokens=max_batch_tokens,
+        max_batch_size=max_batch_size or embed_model.embed_batch_size,
+    )
+    limiter = AdaptiveLimiter(max_limit=max_concurrency)
+
+    def embed_batch(batch: list[tuple[BaseNode, str]]) -> None:
+        texts = [text for _, text in batch]
+        for attempt in range(max_retries + 1):
+            limiter.acquire()
+            try:
+                with metrics.timer('embedding_request_seconds'):
+                    embeddings: list[Embedding] = embed_model.get_text_embedding_batch(texts)
+            except Exception as e:
+                limiter.release(rate_limited=is_rate_limit_error(e))
+                if not is_rate_limit_error(e) or attempt == max_retries:
+                    metrics.increment('embedding_requests_total', status='failed')
+                    raise
+                metrics.increment('embedding_requests_total', status='rate_limited')
+                time.sleep(min(max_backoff, backoff * 2**attempt) * random.uniform(0.5, 1.5))
+                continue
+            limiter.release()
+            metrics.increment('embedding_requests_total', status='ok')
+            metrics.increment('embedded_texts_total', len(texts))
+            break
+
+        for (node, _), embedding in zip(batch, embeddings):
+            node.embedding = embedding
+
+    print(f'Embedding {sum(len(batch) for batch in batches):,} nodes in {len(batches):,} batches...')
+    with concurrent.futures.ThreadPoolExecutor(max_concurrency) as executor:
+        for future in concurrent.futures.as_completed(executor.submit(embed_batch, batch) for batch in batches):
+            future.result()
+
+    return list(nodes)
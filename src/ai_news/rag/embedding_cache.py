@@ -0,0 +1,193 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+
+from ai_news.news.cache import CacheStats
+
+
+class EmbeddingCache:
+    """Persistent embedding store keyed by model name and normalized text.
+
+    Vectors are stored as float32 blobs in a SQLite database under `path`, so
+    they're shared across index rebuilds, collections and processes.
+
+    """
+
+    def __init__(self, path: str = 'res/embedding_cache') -> None:
+        """Open (or create) the embedding cache.
+
+        Args:
+            path (str, optional): Directory to store the cache database in.
+                Defaults to 'res/embedding_cache'.
+
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.stats = CacheStats()
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(path, 'embeddings.sqlite3'),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)')
+
+    @staticmethod
+    def key(text: str, model_name: str, kind: str = 'text') -> str:
+        """Cache key of `text` embedded by `model_name`.
+
+        Args:
+            text (str): Text to embed. Normalized before hashing.
+            model_name (str): Name of the embedding model.
+            kind (str, optional): 'text' or 'query' embedding.
+                Defaults to 'text'.
+
+        Returns:
+            str: Hex digest of the normalized text, model name and kind.
+
+        """
+        normalized = re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+        return hashlib.sha256(f'{model_name}\0{kind}\0{normalized}'.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: list[str]) -> list[Embedding | None]:
+        """Get cached embeddings for `keys`, None for each missing key."""
+        found: dict[str, bytes] = {}
+        with self._lock:
+            # Stay below SQLite's host parameter limit.
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                placeholders = ','.join('?' * len(batch))
+                found.update(
+                    self._conn.execute(
+                        f'SELECT key, vector FROM embeddings WHERE key IN ({placeholders})',
+                        batch,
+                    ).fetchall()
+                )
+
+            hits = sum(key in found for key in keys)
+            self.stats.hits += hits
+            self.stats.misses += len(keys) - hits
+
+        return [
+            np.frombuffer(found[key], dtype=np.float32).tolist() if key in found else None
+            for key in keys
+        ]
+
+    def set_many(self, keys: list[str], embeddings: list[Embedding]) -> None:
+        """Store `embeddings` under `keys`."""
+        rows = [
+            (key, np.asarray(embedding, dtype=np.float32).tobytes())
+            for key, embedding in zip(keys, embeddings)
+        ]
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO embeddings VALUES (?, ?)', rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()
+        return int(count)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Embedding model that only embeds texts missing from an `EmbeddingCache`."""
+
+    embed_model: BaseEmbedding = Field(description='Wrapped embedding model.')
+
+    _cache: EmbeddingCache = PrivateAttr()
+
+    def __init__(self, embed_model: BaseEmbedding, cache: EmbeddingCache | None = None) -> None:
+        """Wrap an embedding model with a persistent cache.
+
+        Args:
+            embed_model (BaseEmbedding): Embedding model to call on cache misses.
+            cache (EmbeddingCache, optional): Embedding cache.
+                Defaults to None. Opens the default `EmbeddingCache`.
+
+        """
+        super().__init__(
+            embed_model=embed_model,
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            callback_manager=embed_model.callback_manager,
+        )
+        self._cache = cache if cache is not None else EmbeddingCache()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return 'CachedEmbedding'
+
+    @property
+    def cache(self) -> EmbeddingCache:
+        """Underlying embedding cache."""
+        return self._cache
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        key = EmbeddingCache.key(query, self.model_name, kind='query')
+        if (embedding := self._cache.get_many([key])[0]) is not None:
+            return embedding
+
+        embedding = self.embed_model._get_query_embedding(query)
+        self._cache.set_many([key], [embedding])
+        return embedding
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        key = EmbeddingCache.key(query, self.model_name, kind='query')
+        if (embedding := self._cache.get_many([key])[0]) is not None:
+            return embedding
+
+        embedding = await self.embed_model._aget_query_embedding(query)
+        self._cache.set_many([key], [embedding])
+        return embedding
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await self._aget_text_embeddings([text]))[0]
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        keys, embeddings, missing = self._lookup(texts)
+        if missing:
+            computed = self.embed_model._get_text_embeddings([texts[i] for i in missing])
+            self._store(keys, embeddings, missing, computed)
+        return embeddings  # type: ignore[return-value]
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        keys, embeddings, missing = self._lookup(texts)
+        if missing:
+            computed = await self.embed_model._aget_text_embeddings([texts[i] for i in missing])
+            self._store(keys, embeddings, missing, computed)
+        return embeddings  # type: ignore[return-value]
+
+    def _lookup(self, texts: list[str]) -> tuple[list[str], list[Embedding | None], list[int]]:
+        """Cache keys, cached embeddings and indices of the texts that are missing."""
+        keys = [EmbeddingCache.key(text, self.model_name) for text in texts]
+        embeddings = self._cache.get_many(keys)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        return keys, embeddings, missing
+
+    def _store(
+        self,
+        keys: list[str],
+        embeddings: list[Embedding | None],
+        missing: list[int],
+        computed: list[Embedding],
+    ) -> None:
+        """Fill in and cache the embeddings computed for the missing texts."""
+        for i, embedding in zip(missing, computed):
+            embeddings[i] = embedding
+        self._cache.set_many([keys[i] for i in missing], computed)
@@ -0,0 +1,246 @@
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+
+from llama_index.core import VectorStoreIndex
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.vector_stores.types import FilterOperator, MetadataFilter, MetadataFilters
+
+from ai_news import metrics
+from ai_news.news.util import Category
+from ai_news.rag.bm25 import BM25Index
+from ai_news.rag.hybrid import LEXICAL_COVERAGE, HybridRetriever
+
+_COUNTS = {'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'ten': 10}
+_UNITS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=30),
+    'year': timedelta(days=365),
+}
+# "past 3 days", "last week", "in the last 24 hours".
+_RELATIVE = re.compile(
+    rf'\b(?:past|last|previous)\s+(?:(\d+|{"|".join(_COUNTS)})\s+)?({"|".join(_UNITS)})s?\b',
+    re.IGNORECASE,
+)
+# "this week", "this month", "this year".
+_CURRENT = re.compile(r'\bthis\s+(week|month|year)\b', re.IGNORECASE)
+_DAY = re.compile(r'\b(today|yesterday)\b', re.IGNORECASE)
+_SINCE = re.compile(r'\b(since|after|before|on)\s+(\d{4}-\d{2}-\d{2})\b', re.IGNORECASE)
+
+_CATEGORY_ALIASES = {
+    **{category.value: category for category in Category},
+    'sport': Category.SPORTS,
+    'tech': Category.TECHNOLOGY,
+}
+# "health news", "tech headlines".
+_CATEGORY = re.compile(
+    rf'\b({"|".join(_CATEGORY_ALIASES)})\s+(?:news|articles|stories|headlines|updates)\b',
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class QueryFilters:
+    """Time window, sources and category a question is restricted to."""
+
+    # Only news published at or after this date.
+    start: datetime | None = None
+    # Only news published before this date.
+    end: datetime | None = None
+    # Only news from these sources.
+    sources: tuple[str, ...] = ()
+    # Only news from sources of this category.
+    category: Category | None = None
+
+    def __bool__(self) -> bool:
+        return self.start is not None or self.end is not None or bool(self.sources) or self.category is not None
+
+    def merge(self, other: 'QueryFilters') -> 'QueryFilters':
+        """These filters, with every constraint set in `other` replacing ours."""
+        return replace(
+            self,
+            start=other.start or self.start,
+            end=other.end or self.end,
+            sources=other.sources or self.sources,
+            category=other.category or self.category,
+        )
+
+    def to_metadata_filters(self) -> MetadataFilters | None:
+        """Metadata filters on `published_ts`, `source` and `category`, None if unrestricted.
+
+        The filters are flat and joined with AND, so Chroma applies them as a
+        `where` clause before the similarity search.
+
+        """
+        filters: list[MetadataFilter] = []
+        if self.start is not None:
+            start = int(self.start.timestamp())
+            filters.append(MetadataFilter(key='published_ts', value=start, operator=FilterOperator.GTE))
+        if self.end is not None:
+            end = int(self.end.timestamp())
+            filters.append(MetadataFilter(key='published_ts', value=end, operator=FilterOperator.LT))
+        if self.sources:
+            filters.append(MetadataFilter(key='source', value=list(self.sources), operator=FilterOperator.IN))
+        if self.category is not None:
+            filters.append(MetadataFilter(key='category', value=self.category.value))
+        return MetadataFilters(filters=filters) if filters else None
+
+
+def parse_query_filters(query: str, sources: Iterable[str] = (), now: datetime | None = None) -> QueryFilters:
+    """Parse time windows, sources and a category from a question.
+
+    Understands relative windows ("past 3 days", "last week", "in the last 24
+    hours"), calendar windows ("today", "yesterday", "this week", "this month")
+    and dates ("since 2024-05-01", "before 2024-06-01", "on 2024-05-13"), all in
+    UTC. Sources are matched by name, case-insensitively only after "from", "by"
+    or "according to". Categories are matched as "<category> news".
+
+        parse_query_filters('Tech news from The Verge this week', sources=['The Verge', 'Wired'])
+
+    Args:
+        query (str): Question.
+        sources (Iterable[str], optional): Names of the sources to look for.
+            Defaults to no sources.
+        now (datetime, optional): Current time, relative windows are counted back from it.
+            Defaults to None, the current hour so parsed windows stay the same (and cacheable) for an hour.
+
+    Returns:
+        QueryFilters: Parsed filters, empty if the question has no constraints.
+
+    """
+    if now is None:
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    elif now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # Every window the question mentions, intersected.
+    starts: list[datetime] = []
+    ends: list[datetime] = []
+    for match in _RELATIVE.finditer(query):
+        count, unit = match.group(1), match.group(2).lower()
+        n = 1 if count is None else int(count) if count.isdigit() else _COUNTS[count.lower()]
+        starts.append(now - n * _UNITS[unit])
+    for match in _CURRENT.finditer(query):
+        match match.group(1).lower():
+            case 'week':
+                starts.append(today - timedelta(days=today.weekday()))
+            case 'month':
+                starts.append(today.replace(day=1))
+            case _:
+                starts.append(today.replace(month=1, day=1))
+    for match in _DAY.finditer(query):
+        if match.group(1).lower() == 'today':
+            starts.append(today)
+        else:
+            starts.append(today - timedelta(days=1))
+            ends.append(today)
+    for match in _SINCE.finditer(query):
+        date = datetime.fromisoformat(match.group(2)).replace(tzinfo=timezone.utc)
+        match match.group(1).lower():
+            case 'since' | 'after':
+                starts.append(date)
+            case 'before':
+                ends.append(date)
+            case _:
+                starts.append(date)
+                ends.append(date + timedelta(days=1))
+
+    category = None
+    if (match := _CATEGORY.search(query)) is not None:
+        category = _CATEGORY_ALIASES[match.group(1).lower()]
+
+    return QueryFilters(
+        start=max(starts, default=None),
+        end=min(ends, default=None),
+        sources=_match_sources(query, sources),
+        category=category,
+    )
+
+
+def _match_sources(query: str, sources: Iterable[str]) -> tuple[str, ...]:
+    """Names of `sources` mentioned in `query`, longest names first so "BBC News" wins over "BBC"."""
+    matched: list[str] = []
+    for name in sorted(set(sources), key=len, reverse=True):
+        if not name or any(name in other for other in matched):
+            continue
+        pattern = rf'(?<!\w){re.escape(name)}(?!\w)'
+        if re.search(pattern, query) or re.search(
+            rf'\b(?:from|by|according\s+to)\s+(?:the\s+)?{pattern}', query, re.IGNORECASE
+        ):
+            matched.append(name)
+    return tuple(sorted(matched))
+
+
+class FilteredRetriever(BaseRetriever):
+    """Retrieve only from the news a question is restricted to.
+
+    Time windows, sources and a category are parsed from every question (see
+    `parse_query_filters`), merged over the fixed `filters` and pushed down into
+    Chroma's `where` clause, so only the matching nodes are searched. Questions
+    without constraints search the whole collection, and so do constrained ones
+    nothing matches (e.g. no news today yet).
+
+    """
+
+    def __init__(
+        self,
+        index: VectorStoreIndex,
+        lexical_index: BM25Index | None = None,
+        sources: Iterable[str] = (),
+        filters: QueryFilters | None = None,
+        similarity_top_k: int = 4,
+        lexical_coverage: float | None = LEXICAL_COVERAGE,
+    ) -> None:
+        """Create filtered retriever.
+
+        Args:
+            index (VectorStoreIndex): Vector index.
+            lexical_index (BM25Index, optional): BM25 index of the same collection, for hybrid retrieval.
+                Defaults to None (vector retrieval only).
+            sources (Iterable[str], optional): Names of the sources questions may mention,
+                see `get_source_names`.
+                Defaults to no sources.
+            filters (QueryFilters, optional): Filters applied to every question.
+                Defaults to None.
+            similarity_top_k (int, optional): Number of nodes to return.
+                Defaults to 4.
+            lexical_coverage (float, optional): Answer questions from the BM25 index alone when its
+                top hits cover this much of the question, see `HybridRetriever`. None always fuses both.
+                Defaults to `LEXICAL_COVERAGE`.
+
+        """
+        super().__init__()
+        self.index = index
+        self.lexical_index = lexical_index
+        self.sources = frozenset(sources)
+        self.filters = filters or QueryFilters()
+        self.similarity_top_k = similarity_top_k
+        self.lexical_coverage = lexical_coverage
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        parsed = parse_query_filters(query_bundle.query_str, sources=self.sources)
+        filters = self.filters.merge(parsed)
+        nodes = self._retriever(filters.to_metadata_filters()).retrieve(query_bundle)
+        if nodes or not parsed:
+            metrics.increment('filtered_retrieval_total', result='filtered' if filters else 'unfiltered')
+            return nodes
+
+        # Nothing matches the question's constraints, answer from everything else instead.
+        metrics.increment('filtered_retrieval_total', result='fallback')
+        return self._retriever(self.filters.to_metadata_filters()).retrieve(query_bundle)
+
+    def _retriever(self, filters: MetadataFilters | None) -> BaseRetriever:
+        if self.lexical_index is None:
+            return self.index.as_retriever(similarity_top_k=self.similarity_top_k, filters=filters)
+        return HybridRetriever.from_index(
+            self.index,
+            self.lexical_index,
+            similarity_top_k=self.similarity_top_k,
+            filters=filters,
+            lexical_coverage=self.lexical_coverage,
+        )
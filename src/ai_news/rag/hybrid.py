@@ -0,0 +1,135 @@
+from collections.abc import Sequence
+
+from llama_index.core import VectorStoreIndex
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.vector_stores.types import MetadataFilters
+
+from ai_news import metrics
+from ai_news.rag.bm25 import BM25Index, BM25Retriever
+
+# Queries whose top BM25 hits all match this fraction of their (IDF weighted) terms, e.g. exact
+# company or model names, are answered without embedding them. Stop words aren't terms, so this
+# still lets the hits miss the least specific word of a question.
+LEXICAL_COVERAGE = 0.9
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[NodeWithScore]], k: float = 60) -> list[NodeWithScore]:
+    """Fuse rankings of nodes with reciprocal rank fusion.
+
+    A node scores `1 / (k + rank)` in every ranking it appears in, so nodes
+    ranked well by several retrievers come first regardless of how each
+    retriever scales its scores.
+
+    Args:
+        rankings (Sequence[Sequence[NodeWithScore]]): Rankings, best first.
+        k (float, optional): Dampens the weight of the top ranks.
+            Defaults to 60.
+
+    Returns:
+        list[NodeWithScore]: Every ranked node once, scored by fused score, best first.
+
+    """
+    scores: dict[str, float] = {}
+    nodes: dict[str, NodeWithScore] = {}
+    for ranking in rankings:
+        for rank, node in enumerate(ranking, start=1):
+            scores[node.node.node_id] = scores.get(node.node.node_id, 0.0) + 1 / (k + rank)
+            # Keep the first retriever's node, e.g. with its relationships from the vector store.
+            nodes.setdefault(node.node.node_id, node)
+
+    return [
+        NodeWithScore(node=nodes[node_id].node, score=score)
+        for node_id, score in sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    ]
+
+
+class HybridRetriever(BaseRetriever):
+    """Fuse vector and BM25 retrieval with reciprocal rank fusion.
+
+    With `lexical_coverage` set, queries whose top BM25 hits all match at least
+    that fraction of the query terms (weighted by IDF), e.g. exact company or
+    model names, are answered from the lexical index alone, skipping the query
+    embedding and the vector search.
+
+    """
+
+    def __init__(
+        self,
+        vector_retriever: BaseRetriever,
+        lexical_retriever: BM25Retriever,
+        similarity_top_k: int = 4,
+        rrf_k: float = 60,
+        lexical_coverage: float | None = None,
+    ) -> None:
+        """Create hybrid retriever.
+
+        Args:
+            vector_retriever (BaseRetriever): Embedding based retriever.
+            lexical_retriever (BM25Retriever): Lexical retriever.
+            similarity_top_k (int, optional): Number of fused nodes to return.
+                Defaults to 4.
+            rrf_k (float, optional): Reciprocal rank fusion constant.
+                Defaults to 60.
+            lexical_coverage (float, optional): Minimum query coverage of every top BM25 hit
+                to skip vector retrieval. None always fuses both.
+                Defaults to None.
+
+        """
+        super().__init__()
+        self.vector_retriever = vector_retriever
+        self.lexical_retriever = lexical_retriever
+        self.similarity_top_k = similarity_top_k
+        self.rrf_k = rrf_k
+        self.lexical_coverage = lexical_coverage
+
+    @classmethod
+    def from_index(
+        cls,
+        index: VectorStoreIndex,
+        lexical_index: BM25Index,
+        similarity_top_k: int = 4,
+        candidates: int = 10,
+        filters: MetadataFilters | None = None,
+        lexical_coverage: float | None = None,
+    ) -> 'HybridRetriever':
+        """Hybrid retriever over a vector index and its BM25 index.
+
+        Args:
+            index (VectorStoreIndex): Vector index.
+            lexical_index (BM25Index): BM25 index of the same collection.
+            similarity_top_k (int, optional): Number of fused nodes to return.
+                Defaults to 4.
+            candidates (int, optional): Number of nodes each retriever ranks before fusion.
+                Defaults to 10.
+            filters (MetadataFilters, optional): Metadata filters applied by both retrievers.
+                Defaults to None.
+            lexical_coverage (float, optional): See `HybridRetriever`.
+                Defaults to None.
+
+        Returns:
+            HybridRetriever: Hybrid retriever.
+
+        """
+        return cls(
+            vector_retriever=index.as_retriever(similarity_top_k=candidates, filters=filters),
+            lexical_retriever=BM25Retriever(lexical_index, similarity_top_k=candidates, filters=filters),
+            similarity_top_k=similarity_top_k,
+            lexical_coverage=lexical_coverage,
+        )
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        lexical = self.lexical_retriever.retrieve_with_coverage(query_bundle)
+        top = lexical[: self.similarity_top_k]
+        if (
+            self.lexical_coverage is not None
+            and len(top) == self.similarity_top_k
+            and all(coverage >= self.lexical_coverage for _, coverage in top)
+        ):
+            metrics.increment('hybrid_retrieval_total', path='lexical')
+            return [node for node, _ in top]
+
+        metrics.increment('hybrid_retrieval_total', path='fused')
+        vector = self.vector_retriever.retrieve(query_bundle)
+        fused = reciprocal_rank_fusion([vector, [node for node, _ in lexical]], k=self.rrf_k)
+        return fused[: self.similarity_top_k]
@@ -1,24 +1,66 @@
-from llama_index.core import VectorStoreIndex
+import os
+from datetime import datetime, timedelta
+from enum import Enum, auto
+
+from chromadb.api import ClientAPI
+from llama_index.core import Document, VectorStoreIndex
 from llama_index.core.node_parser import (
     NodeParser,
     SemanticSplitterNodeParser,
     SentenceSplitter,
 )
-from llama_index.embeddings.openai import OpenAIEmbedding
+from llama_index.core.schema import BaseNode
 
+from ai_news import metrics
+from ai_news.news.util import Category
+from ai_news.rag.bm25 import BM25Index
 from ai_news.rag.data import get_news_documents
+from ai_news.rag.dedup import deduplicate_documents
+from ai_news.rag.embedding import NoRetryOpenAIEmbedding, embed_nodes
+from ai_news.rag.embedding_cache import CachedEmbedding, EmbeddingCache
+from ai_news.rag.retrieval_cache import RetrievalCache
+from ai_news.rag.splitter import TfidfSemanticSplitterNodeParser
 from ai_news.rag.vector_db import (
     ClientType,
+    PartitionedChromaVectorStore,
+    Partitioning,
+    add_filter_metadata,
+    bump_index_version,
+    count_nodes,
     create_vector_store_index,
     get_client,
+    get_collections,
+    get_existing_urls,
+    get_latest_published_at,
+    update_latest_published_at,
 )
 
+# Directory of the persistent Chroma vector store.
+VECTOR_STORE_PATH = 'res/vector_store'
+# Directory of the BM25 indices kept alongside each collection.
+LEXICAL_INDEX_PATH = 'res/lexical_index'
+
+
+class SplitterType(Enum):
+    """Node splitter type."""
+
+    # Fixed-size sentence windows.
+    SENTENCE = auto()
+    # Semantic breakpoints from embedding every sentence (one API call per sentence group).
+    SEMANTIC = auto()
+    # Semantic breakpoints from local TF-IDF vectors (no API calls).
+    TFIDF_SEMANTIC = auto()
+
 
 def create_index(
     topic: str = 'artificial intelligence',
     collection_name: str = 'artificial_intelligence',
     use_semantic_splitter: bool = False,
+    splitter_type: SplitterType | None = None,
     news_api_key: str | None = None,
+    max_articles: int | None = None,
+    dedup_threshold: float | None = 0.8,
+    use_lexical_index: bool = True,
 ) -> VectorStoreIndex:
     """Create index.
 
@@ -29,19 +71,26 @@ def create_index(
             Defaults to 'artificial_intelligence'.
         use_semantic_splitter (bool, optional): Whether to use semnatic node splitter.
             Defaults to False.
+        splitter_type (SplitterType, optional): Node splitter to use. Overrides `use_semantic_splitter`.
+            Defaults to None.
         news_api_key: News API key.
             Defaults to None.
+        max_articles (int, optional): Maximum number of news articles to index.
+            Defaults to None (a single page of results).
+        dedup_threshold (float, optional): Similarity above which articles are
+            considered duplicates. None disables deduplication.
+            Defaults to 0.8.
+        use_lexical_index (bool, optional): Keep a BM25 index alongside the collection.
+            Defaults to True.
 
     Returns:
         VectorStoreIndex: Loaded/created vector index.
 
     """
+    embed_model = get_embed_model()
 
     # Get the vector db client.
-    client = get_client(
-        client_type=ClientType.LOCAL,
-        path='res/vector_store',
-    )
+    client = get_default_client()
 
     # Check if collection exists.
     collection_exists = False
@@ -49,56 +98,342 @@ def create_index(
         collection_exists = True
 
     if not collection_exists:
-        # TODO: Get more than 100 news articles.
         # Get news articles.
         print(f'Get news article for {topic}...')
-        documents = get_news_documents(
-            topic=topic,
-            news_api_key=news_api_key,
-        )
+        with metrics.timer('ingest_stage_seconds', stage='fetch'):
+            documents = get_news_documents(
+                topic=topic,
+                news_api_key=news_api_key,
+                max_articles=max_articles,
+            )
+
+        # Keep one copy of syndicated stories.
+        if dedup_threshold is not None:
+            with metrics.timer('ingest_stage_seconds', stage='dedup'):
+                documents = deduplicate_documents(documents, threshold=dedup_threshold)
 
         # Split documents into nodes.
-        print(f'Splitting {len(documents):,} documents into nodes...\n')
-        splitter = get_splitter(use_semantic=use_semantic_splitter)
-        nodes = splitter.get_nodes_from_documents(
-            documents=documents,
-            show_progress=True,
-        )
-        print(f'{len(documents):,} parsed into {len(nodes):,} nodes.\n')
+        with metrics.timer('ingest_stage_seconds', stage='split'):
+            nodes = split_documents(
+                documents,
+                use_semantic_splitter=use_semantic_splitter,
+                splitter_type=splitter_type,
+            )
+
+        # Embed nodes in concurrent, token-budgeted batches.
+        with metrics.timer('ingest_stage_seconds', stage='embed'):
+            nodes = embed_nodes(nodes, embed_model=embed_model)
     else:
         # Load from existing collection in the vector db.
         nodes = None
 
     # Create VectorStoreIndex.
+    with metrics.timer('ingest_stage_seconds', stage='index'):
+        index: VectorStoreIndex = create_vector_store_index(
+            client=client,
+            collection_name=collection_name,
+            nodes=nodes,
+            embed_model=embed_model,
+            lexical_index=get_lexical_index(collection_name) if use_lexical_index else None,
+        )
+    if nodes is not None:
+        bump_index_version(client.get_collection(name=collection_name))
+
+    return index
+
+
+def load_index(
+    collection_name: str = 'artificial_intelligence',
+    embed_model: CachedEmbedding | None = None,
+    client: ClientAPI | None = None,
+    retrieval_cache: RetrievalCache | None = None,
+    lexical_index: BM25Index | None = None,
+) -> VectorStoreIndex | None:
+    """Open an index that's already been built (see `ai_news.worker`), without fetching any news.
+
+    Args:
+        collection_name (str, optional): Name of the collection for ChromaDB.
+            Defaults to 'artificial_intelligence'.
+        embed_model (CachedEmbedding, optional): Embedding model used for queries.
+            Defaults to None, `get_embed_model()`.
+        client (ClientAPI, optional): Chroma client to share.
+            Defaults to None, `get_default_client()`.
+        retrieval_cache (RetrievalCache, optional): Serve repeated queries from this cache.
+            Defaults to None.
+        lexical_index (BM25Index, optional): BM25 index of the collection, brought up to date with it.
+            Defaults to None.
+
+    Returns:
+        VectorStoreIndex | None: Loaded vector index or None if the collection is missing or empty.
+
+    """
+    if client is None:
+        client = get_default_client()
+    if not any(collection.name == collection_name for collection in client.list_collections()):
+        return None
+    if count_nodes(client, collection_name) == 0:
+        return None
+
     index: VectorStoreIndex = create_vector_store_index(
         client=client,
         collection_name=collection_name,
-        nodes=nodes,
-        embed_model=OpenAIEmbedding(),
+        embed_model=embed_model or get_embed_model(),
+        retrieval_cache=retrieval_cache,
+        lexical_index=lexical_index,
     )
+    return index
+
+
+def refresh_index(
+    topic: str = 'artificial intelligence',
+    collection_name: str = 'artificial_intelligence',
+    since: datetime | None = None,
+    use_semantic_splitter: bool = False,
+    splitter_type: SplitterType | None = None,
+    news_api_key: str | None = None,
+    max_articles: int | None = None,
+    dedup_threshold: float | None = 0.8,
+    category: Category | None = None,
+    embed_model: CachedEmbedding | None = None,
+    client: ClientAPI | None = None,
+    lexical_index: BM25Index | None = None,
+    use_lexical_index: bool = True,
+    partitioning: Partitioning | None = None,
+    max_age: timedelta | None = None,
+    compact_after: timedelta | None = None,
+) -> VectorStoreIndex:
+    """Incrementally add news published since the last refresh to the index.
+
+    Only articles published after `since` (or the newest `published_at` already
+    stored) are fetched, articles whose URL is already in the collection are
+    skipped, and only the remaining ones are split and embedded. Partitioned
+    collections then drop and compact old partitions (see `max_age` and
+    `compact_after`).
+
+    Args:
+        topic (str, optional): News topic to get.
+            Defaults to "artificial intelligence".
+        collection_name (str, optional): Name of the collection for ChromaDB.
+            Defaults to 'artificial_intelligence'.
+        since (datetime, optional): Only fetch articles published after this date.
+            Defaults to None, i.e. the newest article in the collection.
+        use_semantic_splitter (bool, optional): Whether to use semnatic node splitter.
+            Defaults to False.
+        splitter_type (SplitterType, optional): Node splitter to use. Overrides `use_semantic_splitter`.
+            Defaults to None.
+        news_api_key: News API key.
+            Defaults to None.
+        max_articles (int, optional): Maximum number of news articles to fetch.
+            Defaults to None (a single page of results).
+        dedup_threshold (float, optional): Similarity above which articles are
+            considered duplicates. None disables deduplication.
+            Defaults to 0.8.
+        category (Category, optional): Only get news from sources of this category.
+            Defaults to None.
+        embed_model (CachedEmbedding, optional): Embedding model to share.
+            Defaults to None, `get_embed_model()`.
+        client (ClientAPI, optional): Chroma client to share.
+            Defaults to None, `get_default_client()`.
+        lexical_index (BM25Index, optional): BM25 index kept alongside the collection.
+            Defaults to None, `get_lexical_index(collection_name)`.
+        use_lexical_index (bool, optional): Keep a BM25 index alongside the collection.
+            Defaults to True.
+        partitioning (Partitioning, optional): Partition the collection by publish date,
+            see `create_vector_store_index`.
+            Defaults to None, the collection's recorded partitioning.
+        max_age (timedelta, optional): Drop partitions whose news are all older than this.
+            Defaults to None (keep everything).
+        compact_after (timedelta, optional): Compact the day partitions of weeks that ended
+            longer ago than this into week partitions.
+            Defaults to None (no compaction).
+
+    Returns:
+        VectorStoreIndex: Refreshed vector index.
+
+    """
+    if client is None:
+        client = get_default_client()
+    collection = client.get_or_create_collection(name=collection_name)
+    if not use_lexical_index:
+        lexical_index = None
+    elif lexical_index is None:
+        lexical_index = get_lexical_index(collection_name)
+
+    # Nodes indexed before `published_ts` was part of the metadata can't be filtered by date.
+    if updated := add_filter_metadata(collection):
+        if lexical_index is not None:
+            lexical_index.update_metadata(updated)
+        bump_index_version(collection)
+
+    collections = get_collections(client, collection_name)
+    if since is None:
+        since = get_latest_published_at(client, collection_name)
+
+    print(f'Get news article for {topic} since {since}...')
+    with metrics.timer('ingest_stage_seconds', stage='fetch'):
+        documents = get_news_documents(
+            topic=topic,
+            category=category,
+            news_api_key=news_api_key,
+            max_articles=max_articles,
+            from_date=since,
+        )
+
+    # Skip articles that are already indexed.
+    urls = [document.metadata['url'] for document in documents]
+    existing = set().union(*(get_existing_urls(c, urls) for c in collections))
+    documents = [document for document in documents if document.metadata['url'] not in existing]
+    print(f'{len(documents):,} new documents ({len(existing):,} already indexed).')
+
+    if dedup_threshold is not None:
+        with metrics.timer('ingest_stage_seconds', stage='dedup'):
+            documents = deduplicate_documents(documents, threshold=dedup_threshold)
+
+    if embed_model is None:
+        embed_model = get_embed_model()
+    index: VectorStoreIndex = create_vector_store_index(
+        client=client,
+        collection_name=collection_name,
+        embed_model=embed_model,
+        lexical_index=lexical_index,
+        partitioning=partitioning,
+    )
+
+    if documents:
+        with metrics.timer('ingest_stage_seconds', stage='split'):
+            nodes = split_documents(
+                documents,
+                use_semantic_splitter=use_semantic_splitter,
+                splitter_type=splitter_type,
+            )
+        with metrics.timer('ingest_stage_seconds', stage='embed'):
+            nodes = embed_nodes(nodes, embed_model=embed_model)
+        with metrics.timer('ingest_stage_seconds', stage='index'):
+            index.insert_nodes(nodes, show_progress=True)
+            if lexical_index is not None:
+                lexical_index.add(nodes)
+        update_latest_published_at(collection, nodes)
+        bump_index_version(collection)
+
+    if isinstance(store := index.vector_store, PartitionedChromaVectorStore):
+        dropped = store.enforce_retention(max_age=max_age, compact_after=compact_after)
+        if dropped and lexical_index is not None:
+            lexical_index.delete(dropped)
 
     return index
 
 
-def get_splitter(use_semantic: bool = False) -> NodeParser:
+def get_default_client() -> ClientAPI:
+    """Get the Chroma client of the index shared by the ingestion worker and the app.
+
+    Chroma doesn't support several processes opening the same persistent
+    directory, so when the worker and the app run as separate processes, serve
+    the vector store with `chroma run --path res/vector_store` and set
+    `CHROMA_HOST` (and `CHROMA_PORT`) to connect to it over HTTP.
+
+    Returns:
+        ClientAPI: HTTP client of the Chroma server at `CHROMA_HOST` if set,
+            otherwise a persistent client at `VECTOR_STORE_PATH`.
+
+    """
+    if host := os.environ.get('CHROMA_HOST'):
+        return get_client(client_type=ClientType.HTTP_CLIENT, host=host, port=int(os.environ.get('CHROMA_PORT', 8000)))
+    return get_client(client_type=ClientType.LOCAL, path=VECTOR_STORE_PATH)
+
+
+def get_lexical_index(collection_name: str = 'artificial_intelligence') -> BM25Index:
+    """Get the BM25 index kept alongside a collection.
+
+    Args:
+        collection_name (str, optional): Name of the collection for ChromaDB.
+            Defaults to 'artificial_intelligence'.
+
+    Returns:
+        BM25Index: Persistent BM25 index under `LEXICAL_INDEX_PATH`.
+
+    """
+    return BM25Index(path=LEXICAL_INDEX_PATH, name=collection_name)
+
+
+def get_embed_model(api_key: str | None = None) -> CachedEmbedding:
+    """Get the OpenAI embedding model behind the persistent embedding cache.
+
+    Args:
+        api_key (str, optional): OpenAI API key.
+            Defaults to None. Loaded from environment variables.
+
+    Returns:
+        CachedEmbedding: Cached OpenAI embedding model.
+
+    """
+    return CachedEmbedding(
+        NoRetryOpenAIEmbedding(api_key=api_key),
+        cache=EmbeddingCache(),
+    )
+
+
+def split_documents(
+    documents: list[Document],
+    use_semantic_splitter: bool = False,
+    splitter_type: SplitterType | None = None,
+) -> list[BaseNode]:
+    """Split documents into nodes.
+
+    Args:
+        documents (list[Document]): Documents to split.
+        use_semantic_splitter (bool, optional): Whether to use semnatic node splitter.
+            Defaults to False.
+        splitter_type (SplitterType, optional): Node splitter to use. Overrides `use_semantic_splitter`.
+            Defaults to None.
+
+    Returns:
+        list[BaseNode]: Parsed nodes.
+
+    """
+    print(f'Splitting {len(documents):,} documents into nodes...\n')
+    splitter = get_splitter(use_semantic=use_semantic_splitter, splitter_type=splitter_type)
+    nodes = splitter.get_nodes_from_documents(
+        documents=documents,
+        show_progress=True,
+    )
+    print(f'{len(documents):,} parsed into {len(nodes):,} nodes.\n')
+    return nodes
+
+
+def get_splitter(
+    use_semantic: bool = False,
+    splitter_type: SplitterType | None = None,
+) -> NodeParser:
     """Get the sentence splitter to use.
 
     Args:
         use_semantic (bool, optional): Whether to use semantic node parser.
             Defaults to False.
+        splitter_type (SplitterType, optional): Node splitter to use. Overrides `use_semantic`.
+            Defaults to None.
 
     Returns:
-        type[NodeParser]: Either `SentenceSplitter` or `SemanticSplitterNodeParser`.
+        type[NodeParser]: `SentenceSplitter`, `SemanticSplitterNodeParser`
+            or `TfidfSemanticSplitterNodeParser`.
 
     """
-    if use_semantic:
-        return SemanticSplitterNodeParser.from_defaults()
-    return SentenceSplitter()
+    if splitter_type is None:
+        splitter_type = SplitterType.SEMANTIC if use_semantic else SplitterType.SENTENCE
+
+    match splitter_type:
+        case SplitterType.SENTENCE:
+            return SentenceSplitter()
+        case SplitterType.SEMANTIC:
+            return SemanticSplitterNodeParser.from_defaults()
+        case SplitterType.TFIDF_SEMANTIC:
+            return TfidfSemanticSplitterNodeParser()
+        case _:
+            raise ValueError('Invalid SplitterType.')
 
 
 if __name__ == '__main__':
     index = create_index(
         collection_name='artificial_intelligence',
-        use_semantic_splitter=True,
+        splitter_type=SplitterType.TFIDF_SEMANTIC,
     )
     print(index)
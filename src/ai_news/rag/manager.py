@@ -0,0 +1,367 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from chromadb.api import ClientAPI
+from chromadb.config import Settings
+from llama_index.core import VectorStoreIndex
+from llama_index.core.chat_engine import CondensePlusContextChatEngine
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from ai_news import metrics
+from ai_news.news.util import Category
+from ai_news.rag.bm25 import BM25Index
+from ai_news.rag.embedding_cache import CachedEmbedding
+from ai_news.rag.filters import FilteredRetriever
+from ai_news.rag.index import (
+    LEXICAL_INDEX_PATH,
+    VECTOR_STORE_PATH,
+    SplitterType,
+    get_embed_model,
+    load_index,
+    refresh_index,
+)
+from ai_news.rag.retrieval_cache import RetrievalCache
+from ai_news.rag.vector_db import ClientType, get_client
+
+
+@dataclass(frozen=True)
+class Topic:
+    """News topic indexed into its own Chroma collection."""
+
+    # Chroma collection name (3-63 characters).
+    name: str
+    # Keywords or phrase searched for with the News API.
+    query: str
+    # Only index news from sources of this category.
+    category: Category | None = None
+    # What the topic is about, embedded to route questions to it. Defaults to `query`.
+    description: str | None = None
+
+    @classmethod
+    def from_category(cls, category: Category, query: str = 'news') -> 'Topic':
+        """Topic of all `query` news in a News API category, e.g. `Topic.from_category(Category.HEALTH)`."""
+        return cls(
+            name=f'category_{category.value}',
+            query=query,
+            category=category,
+            description=f'{category.value} news',
+        )
+
+    @property
+    def route_text(self) -> str:
+        """Text embedded to route questions to this topic."""
+        return self.description or self.query
+
+
+class IndexManager:
+    """Serve many topic collections from one process.
+
+    Every topic lives in its own collection of one shared Chroma client, and all
+    of them embed through one shared (cached) embedding model. Indices are loaded
+    on first use and the least recently used ones are unloaded once more than
+    `max_loaded` are open. Questions are routed to the topics whose description
+    is most similar to them, see `route` and `as_chat_engine`.
+
+        manager = IndexManager([
+            Topic('artificial_intelligence', 'artificial intelligence'),
+            Topic.from_category(Category.HEALTH),
+        ])
+        manager.refresh_all()
+        chat_engine = manager.as_chat_engine()
+
+    """
+
+    def __init__(
+        self,
+        topics: Iterable[Topic] = (),
+        path: str = VECTOR_STORE_PATH,
+        max_loaded: int = 8,
+        memory_limit_bytes: int | None = None,
+        embed_model: CachedEmbedding | None = None,
+        client: ClientAPI | None = None,
+        retrieval_cache: RetrievalCache | None = None,
+        lexical_path: str = LEXICAL_INDEX_PATH,
+    ) -> None:
+        """Create index manager.
+
+        Args:
+            topics (Iterable[Topic], optional): Topics to manage.
+                Defaults to no topics, see `add_topic`.
+            path (str, optional): Directory of the persistent Chroma vector store.
+                Defaults to `VECTOR_STORE_PATH`.
+            max_loaded (int, optional): Maximum number of indices kept loaded.
+                Defaults to 8.
+            memory_limit_bytes (int, optional): Let Chroma evict the least recently used
+                collection segments from memory above this size.
+                Defaults to None (no limit).
+            embed_model (CachedEmbedding, optional): Embedding model shared by every topic.
+                Defaults to None, `get_embed_model()`.
+            client (ClientAPI, optional): Chroma client shared by every topic. Overrides `path`
+                and `memory_limit_bytes`.
+                Defaults to None.
+            retrieval_cache (RetrievalCache, optional): Vector search result cache shared by every topic.
+                Defaults to None, a new `RetrievalCache`.
+            lexical_path (str, optional): Directory of the BM25 index of every topic.
+                Defaults to `LEXICAL_INDEX_PATH`.
+
+        """
+        if client is None:
+            settings = Settings(anonymized_telemetry=False)
+            if memory_limit_bytes is not None:
+                settings = Settings(
+                    anonymized_telemetry=False,
+                    chroma_segment_cache_policy='LRU',
+                    chroma_memory_limit_bytes=memory_limit_bytes,
+                )
+            client = get_client(client_type=ClientType.LOCAL, path=path, settings=settings)
+
+        self.client = client
+        self.embed_model = embed_model or get_embed_model()
+        self.retrieval_cache = retrieval_cache if retrieval_cache is not None else RetrievalCache()
+        self.max_loaded = max_loaded
+        self.lexical_path = lexical_path
+
+        self._lock = threading.Lock()
+        self._topics: dict[str, Topic] = {}
+        # Loaded indices, least recently used first.
+        self._indices: OrderedDict[str, VectorStoreIndex] = OrderedDict()
+        # Embedding of each topic's `route_text`.
+        self._route_embeddings: dict[str, np.ndarray] = {}
+        # BM25 index of each topic, opened on first use.
+        self._lexical_indices: dict[str, BM25Index] = {}
+
+        for topic in topics:
+            self.add_topic(topic)
+
+    @property
+    def topics(self) -> list[Topic]:
+        """Managed topics."""
+        with self._lock:
+            return list(self._topics.values())
+
+    def add_topic(self, topic: Topic) -> None:
+        """Manage `topic`, replacing a topic with the same name."""
+        with self._lock:
+            self._topics[topic.name] = topic
+            self._indices.pop(topic.name, None)
+            self._route_embeddings.pop(topic.name, None)
+
+    def get_index(self, name: str) -> VectorStoreIndex | None:
+        """Index of topic `name`, loading it on first use.
+
+        Args:
+            name (str): Topic name.
+
+        Returns:
+            VectorStoreIndex | None: Loaded index or None if the topic hasn't been indexed yet.
+
+        """
+        with self._lock:
+            if name not in self._topics:
+                raise KeyError(f'Unknown topic {name!r}')
+            if (index := self._indices.get(name)) is not None:
+                self._indices.move_to_end(name)
+                metrics.increment('index_manager_loads_total', result='hit')
+                return index
+
+        # Load outside the lock, a slow load shouldn't block queries to loaded topics.
+        metrics.increment('index_manager_loads_total', result='miss')
+        index = load_index(
+            collection_name=name,
+            embed_model=self.embed_model,
+            client=self.client,
+            retrieval_cache=self.retrieval_cache,
+            lexical_index=self.get_lexical_index(name),
+        )
+        if index is None:
+            return None
+
+        with self._lock:
+            index = self._indices.setdefault(name, index)
+            self._indices.move_to_end(name)
+            while len(self._indices) > self.max_loaded:
+                self._indices.popitem(last=False)
+                metrics.increment('index_manager_unloads_total')
+        return index
+
+    def get_lexical_index(self, name: str) -> BM25Index:
+        """BM25 index of topic `name`, opened on first use."""
+        with self._lock:
+            if name not in self._topics:
+                raise KeyError(f'Unknown topic {name!r}')
+            if (lexical_index := self._lexical_indices.get(name)) is None:
+                lexical_index = BM25Index(path=self.lexical_path, name=name)
+                self._lexical_indices[name] = lexical_index
+            return lexical_index
+
+    def unload(self, name: str) -> None:
+        """Unload the index of topic `name`, if loaded."""
+        with self._lock:
+            self._indices.pop(name, None)
+
+    @property
+    def loaded(self) -> list[str]:
+        """Names of the loaded topics, least recently used first."""
+        with self._lock:
+            return list(self._indices)
+
+    def refresh(self, name: str, **kwargs: Any) -> VectorStoreIndex:
+        """Fetch and index the latest news of topic `name`.
+
+        Args:
+            name (str): Topic name.
+            **kwargs: Other arguments of `refresh_index`, e.g. `max_articles`.
+
+        Returns:
+            VectorStoreIndex: Refreshed index.
+
+        """
+        with self._lock:
+            topic = self._topics[name]
+        kwargs.setdefault('splitter_type', SplitterType.TFIDF_SEMANTIC)
+        index = refresh_index(
+            topic=topic.query,
+            collection_name=topic.name,
+            category=topic.category,
+            embed_model=self.embed_model,
+            client=self.client,
+            lexical_index=self.get_lexical_index(name),
+            **kwargs,
+        )
+        # Reloaded (through the retrieval cache) on next use.
+        self.unload(name)
+        return index
+
+    def refresh_all(self, **kwargs: Any) -> None:
+        """Refresh every topic, see `refresh`. A failed topic doesn't stop the others."""
+        for topic in self.topics:
+            try:
+                self.refresh(topic.name, **kwargs)
+            except Exception as e:
+                print(f'Could not refresh {topic.name}: {e!r}')
+
+    def route(self, query: str | QueryBundle, top_k: int | None = 2) -> list[tuple[Topic, float]]:
+        """Topics most relevant to `query`.
+
+        Args:
+            query (str | QueryBundle): Question to route.
+            top_k (int, optional): Number of topics to return, None to rank all of them.
+                Defaults to 2.
+
+        Returns:
+            list[tuple[Topic, float]]: Topics with their cosine similarity to `query`, most similar first.
+
+        """
+        bundle = _query_bundle(query, self.embed_model)
+        topics = self.topics
+        if not topics or (top_k is not None and len(topics) <= top_k):
+            return [(topic, 1.0) for topic in topics]
+
+        missing = [topic for topic in topics if topic.name not in self._route_embeddings]
+        if missing:
+            embeddings = self.embed_model.get_text_embedding_batch([topic.route_text for topic in missing])
+            with self._lock:
+                for topic, embedding in zip(missing, embeddings):
+                    vector = np.asarray(embedding, dtype=np.float32)
+                    self._route_embeddings[topic.name] = vector / (np.linalg.norm(vector) or 1.0)
+
+        query_vector = np.asarray(bundle.embedding, dtype=np.float32)
+        query_vector /= np.linalg.norm(query_vector) or 1.0
+        topic_vectors = np.stack([self._route_embeddings[topic.name] for topic in topics])
+        similarities = topic_vectors @ query_vector
+        order = np.argsort(-similarities)[:top_k]  # All topics when `top_k` is None.
+        return [(topics[i], float(similarities[i])) for i in order]
+
+    def as_retriever(self, route_top_k: int = 2, similarity_top_k: int = 4) -> 'TopicRetriever':
+        """Retriever over the topics each question is routed to."""
+        return TopicRetriever(self, route_top_k=route_top_k, similarity_top_k=similarity_top_k)
+
+    def as_chat_engine(
+        self,
+        route_top_k: int = 2,
+        similarity_top_k: int = 4,
+        **kwargs: Any,
+    ) -> CondensePlusContextChatEngine:
+        """Chat engine answering from the topics each (condensed) question is routed to.
+
+        Args:
+            route_top_k (int, optional): Number of topics to retrieve from per question.
+                Defaults to 2.
+            similarity_top_k (int, optional): Number of nodes to answer from.
+                Defaults to 4.
+            **kwargs: Other arguments of `CondensePlusContextChatEngine.from_defaults`, e.g. `llm`.
+
+        Returns:
+            CondensePlusContextChatEngine: Chat engine.
+
+        """
+        return CondensePlusContextChatEngine.from_defaults(
+            retriever=self.as_retriever(route_top_k=route_top_k, similarity_top_k=similarity_top_k),
+            **kwargs,
+        )
+
+
+class TopicRetriever(BaseRetriever):
+    """Retrieve from the topics of an `IndexManager` a question is routed to.
+
+    Every routed topic is searched with a `FilteredRetriever` (vector and BM25,
+    restricted to the time window or category the question asks about), and
+    the nodes of all topics are merged by their fused score.
+
+    """
+
+    def __init__(self, manager: IndexManager, route_top_k: int = 2, similarity_top_k: int = 4) -> None:
+        """Create topic retriever.
+
+        Args:
+            manager (IndexManager): Manager of the topic indices.
+            route_top_k (int, optional): Number of topics to retrieve from per question.
+                Defaults to 2.
+            similarity_top_k (int, optional): Number of nodes to return.
+                Defaults to 4.
+
+        """
+        super().__init__()
+        self.manager = manager
+        self.route_top_k = route_top_k
+        self.similarity_top_k = similarity_top_k
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        # Embed the question once, for routing and for every topic's retriever.
+        query_bundle = _query_bundle(query_bundle, self.manager.embed_model)
+
+        nodes: list[NodeWithScore] = []
+        searched = 0
+        # Rank every topic: the most similar ones may not be indexed yet.
+        for topic, _ in self.manager.route(query_bundle, top_k=None):
+            if searched >= self.route_top_k:
+                break
+            if (index := self.manager.get_index(topic.name)) is None:
+                # Not indexed yet, fall through to the next most similar topic.
+                continue
+            searched += 1
+            retriever = FilteredRetriever(
+                index,
+                lexical_index=self.manager.get_lexical_index(topic.name),
+                similarity_top_k=self.similarity_top_k,
+            )
+            for node in retriever.retrieve(query_bundle):
+                node.node.metadata.setdefault('topic', topic.name)
+                nodes.append(node)
+
+        nodes.sort(key=lambda node: node.score or 0.0, reverse=True)
+        return nodes[: self.similarity_top_k]
+
+
+def _query_bundle(query: str | QueryBundle, embed_model: CachedEmbedding) -> QueryBundle:
+    """`query` as a query bundle with its embedding."""
+    if isinstance(query, str):
+        query = QueryBundle(query_str=query)
+    if query.embedding is None:
+        query.embedding = embed_model.get_query_embedding(query.query_str)
+    return query
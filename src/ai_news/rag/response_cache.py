@@ -0,0 +1,367 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Generator
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.chat_engine.types import (
+    AgentChatResponse,
+    BaseChatEngine,
+    StreamingAgentChatResponse,
+)
+from llama_index.core.prompts import ChatMessage, MessageRole
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from ai_news import metrics
+from ai_news.news.cache import CacheStats
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Answer replayed from a `ResponseCache`."""
+
+    prompt: str
+    answer: str
+    source_nodes: list[NodeWithScore]
+    similarity: float
+    created_at: float
+
+
+class ResponseCache:
+    """Persistent cache of chat answers, looked up by prompt similarity.
+
+    Answers are stored per `namespace` (e.g. collection and LLM) and index
+    `version` in a SQLite database under `path`. A prompt whose embedding has a
+    cosine similarity of at least `threshold` with a cached prompt of the same
+    namespace and version gets the cached answer. Answers of older versions are
+    dropped once a newer version is looked up, and answers older than `ttl`
+    seconds are treated as misses.
+
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            id INTEGER PRIMARY KEY,
+            namespace TEXT NOT NULL,
+            version TEXT NOT NULL,
+            prompt TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            answer TEXT NOT NULL,
+            sources TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS responses_namespace_version ON responses (namespace, version);
+    """
+
+    def __init__(
+        self,
+        path: str = 'res/response_cache',
+        threshold: float = 0.95,
+        ttl: float | None = 24 * 60 * 60,
+    ) -> None:
+        """Open (or create) the response cache.
+
+        Args:
+            path (str, optional): Directory to store the cache database in.
+                Defaults to 'res/response_cache'.
+            threshold (float, optional): Minimum cosine similarity of two prompts sharing an answer.
+                Defaults to 0.95.
+            ttl (float, optional): Time to live of an answer in seconds. None never expires.
+                Defaults to 1 day.
+
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(path, 'responses.sqlite3'),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self._SCHEMA)
+
+        # Normalized prompt embeddings and row ids of the current version of each namespace.
+        self._versions: dict[str, str] = {}
+        self._vectors: dict[str, np.ndarray] = {}
+        self._ids: dict[str, list[int]] = {}
+
+    def get(self, namespace: str, version: str, embedding: Embedding) -> CachedResponse | None:
+        """Get the cached answer to the prompt most similar to `embedding`.
+
+        Args:
+            namespace (str): Namespace of the answer, e.g. collection and LLM name.
+            version (str): Version of the index the answer must come from.
+            embedding (Embedding): Prompt embedding.
+
+        Returns:
+            CachedResponse | None: Cached answer or None if no prompt is similar enough.
+
+        """
+        query = _normalize(embedding)
+        with self._lock:
+            self._load(namespace, version)
+            vectors = self._vectors[namespace]
+            if not len(vectors):
+                self.stats.misses += 1
+                return None
+
+            similarities = vectors @ query
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                self.stats.misses += 1
+                return None
+
+            row = self._conn.execute(
+                'SELECT prompt, answer, sources, created_at FROM responses WHERE id = ?',
+                (self._ids[namespace][best],),
+            ).fetchone()
+            if row is None:
+                # Deleted by another process.
+                self._versions.pop(namespace, None)
+                self.stats.misses += 1
+                return None
+
+            prompt, answer, sources, created_at = row
+            if self.ttl is not None and time.time() - created_at > self.ttl:
+                self._conn.execute('DELETE FROM responses WHERE id = ?', (self._ids[namespace][best],))
+                self._versions.pop(namespace, None)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self.stats.hits += 1
+
+        return CachedResponse(
+            prompt=prompt,
+            answer=answer,
+            source_nodes=[_node_from_dict(source) for source in json.loads(sources)],
+            similarity=similarity,
+            created_at=created_at,
+        )
+
+    def set(
+        self,
+        namespace: str,
+        version: str,
+        prompt: str,
+        embedding: Embedding,
+        answer: str,
+        source_nodes: list[NodeWithScore],
+    ) -> None:
+        """Cache the answer to `prompt`.
+
+        Args:
+            namespace (str): Namespace of the answer, e.g. collection and LLM name.
+            version (str): Version of the index the answer comes from.
+            prompt (str): Prompt that was answered.
+            embedding (Embedding): Prompt embedding.
+            answer (str): Full answer.
+            source_nodes (list[NodeWithScore]): Nodes the answer is based on.
+
+        """
+        vector = _normalize(embedding)
+        sources = json.dumps([_node_to_dict(node) for node in source_nodes], default=str)
+        with self._lock:
+            self._load(namespace, version)
+            cursor = self._conn.execute(
+                'INSERT INTO responses (namespace, version, prompt, embedding, answer, sources, created_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (namespace, version, prompt, vector.tobytes(), answer, sources, time.time()),
+            )
+            vectors = self._vectors[namespace]
+            self._vectors[namespace] = np.vstack([vectors, vector[np.newaxis]]) if len(vectors) else vector[np.newaxis]
+            self._ids[namespace].append(int(cursor.lastrowid or 0))
+
+    def _load(self, namespace: str, version: str) -> None:
+        """Load prompt embeddings of `version`, dropping answers of older versions. Call with the lock held."""
+        if self._versions.get(namespace) == version:
+            return
+
+        self._conn.execute('DELETE FROM responses WHERE namespace = ? AND version != ?', (namespace, version))
+        rows = self._conn.execute(
+            'SELECT id, embedding FROM responses WHERE namespace = ? AND version = ?',
+            (namespace, version),
+        ).fetchall()
+        self._ids[namespace] = [row_id for row_id, _ in rows]
+        self._vectors[namespace] = (
+            np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows])
+            if rows
+            else np.empty((0, 0), dtype=np.float32)
+        )
+        self._versions[namespace] = version
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()
+        return int(count)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedChatEngine(BaseChatEngine):
+    """Chat engine answering repeated questions from a `ResponseCache`.
+
+    Only the first question of a conversation is looked up and cached: follow-up
+    questions depend on the conversation so far. Answers are keyed by the index
+    version, so they're invalidated as soon as the index is refreshed.
+
+    """
+
+    def __init__(
+        self,
+        chat_engine: BaseChatEngine,
+        cache: ResponseCache,
+        embed_model: BaseEmbedding,
+        namespace: str,
+        version: Callable[[], str],
+        scope: Callable[[str], str] | None = None,
+    ) -> None:
+        """Wrap a chat engine with a response cache.
+
+        Args:
+            chat_engine (BaseChatEngine): Chat engine answering cache misses.
+            cache (ResponseCache): Response cache.
+            embed_model (BaseEmbedding): Embedding model for prompts.
+            namespace (str): Namespace of the answers, e.g. collection and LLM name.
+            version (Callable[[], str]): Current version of the index, see `get_index_version`.
+            scope (Callable[[str], str], optional): Key of what a prompt asks about beyond its wording,
+                e.g. its time window, only prompts of the same scope share answers.
+                Defaults to None.
+
+        """
+        self._chat_engine = chat_engine
+        self._cache = cache
+        self._embed_model = embed_model
+        self.namespace = namespace
+        self._version = version
+        self._scope = scope
+
+    @property
+    def cache(self) -> ResponseCache:
+        """Underlying response cache."""
+        return self._cache
+
+    def chat(self, message: str, chat_history: list[ChatMessage] | None = None) -> AgentChatResponse:
+        if not _is_first_question(message, chat_history):
+            return self._chat_engine.chat(message, chat_history)
+
+        namespace, version, embedding, cached = self._lookup(message)
+        if cached is not None:
+            return AgentChatResponse(response=cached.answer, source_nodes=cached.source_nodes)
+
+        response = self._chat_engine.chat(message, chat_history)
+        if response.response:
+            self._cache.set(namespace, version, message, embedding, response.response, response.source_nodes)
+        return response
+
+    def stream_chat(
+        self,
+        message: str,
+        chat_history: list[ChatMessage] | None = None,
+    ) -> StreamingAgentChatResponse:
+        if not _is_first_question(message, chat_history):
+            return self._chat_engine.stream_chat(message, chat_history)
+
+        namespace, version, embedding, cached = self._lookup(message)
+        if cached is not None:
+            response = StreamingAgentChatResponse(response=cached.answer, source_nodes=cached.source_nodes)
+            # Replay the answer word by word through the same streaming interface.
+            for delta in re.findall(r'\s*\S+\s*', cached.answer):
+                response.put_in_queue(delta)
+            response.is_done = True
+            return response
+
+        def record(streamed: StreamingAgentChatResponse) -> None:
+            self._cache.set(namespace, version, message, embedding, streamed.response, streamed.source_nodes)
+
+        return _RecordingStreamingResponse(
+            source_nodes=[],
+            inner=self._chat_engine.stream_chat(message, chat_history),
+            on_done=record,
+        )
+
+    async def achat(self, message: str, chat_history: list[ChatMessage] | None = None) -> AgentChatResponse:
+        return await self._chat_engine.achat(message, chat_history)
+
+    async def astream_chat(
+        self,
+        message: str,
+        chat_history: list[ChatMessage] | None = None,
+    ) -> StreamingAgentChatResponse:
+        return await self._chat_engine.astream_chat(message, chat_history)
+
+    def reset(self) -> None:
+        self._chat_engine.reset()
+
+    @property
+    def chat_history(self) -> list[ChatMessage]:
+        return self._chat_engine.chat_history
+
+    def _lookup(self, message: str) -> tuple[str, str, Embedding, CachedResponse | None]:
+        """Namespace, current index version, prompt embedding and cached answer of `message`."""
+        namespace = self.namespace if self._scope is None else f'{self.namespace}/{self._scope(message)}'
+        version = self._version()
+        embedding = self._embed_model.get_query_embedding(message)
+        cached = self._cache.get(namespace, version, embedding)
+        metrics.increment('response_cache_total', result='miss' if cached is None else 'hit')
+        return namespace, version, embedding, cached
+
+
+@dataclass
+class _RecordingStreamingResponse(StreamingAgentChatResponse):
+    """Stream another response, handing it to `on_done` once fully streamed."""
+
+    inner: StreamingAgentChatResponse | None = None
+    on_done: Callable[[StreamingAgentChatResponse], None] | None = None
+
+    @property
+    def response_gen(self) -> Generator[str, None, None]:
+        assert self.inner is not None
+        self.source_nodes = self.inner.source_nodes
+        for delta in self.inner.response_gen:
+            self.unformatted_response += delta
+            yield delta
+
+        self.response = self.inner.response
+        # Agents only know their sources once they're done.
+        self.source_nodes = self.inner.source_nodes
+        self.is_done = True
+        if self.on_done is not None and self.response:
+            on_done, self.on_done = self.on_done, None
+            on_done(self)
+
+
+def _is_first_question(message: str, chat_history: list[ChatMessage] | None) -> bool:
+    """Whether `message` is the first user message of the conversation (which may already hold it)."""
+    questions = [chat.content for chat in chat_history or [] if chat.role == MessageRole.USER]
+    return not questions or questions == [message]
+
+
+def _normalize(embedding: Embedding) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _node_to_dict(node: NodeWithScore) -> dict[str, Any]:
+    return {'text': node.node.get_content(), 'metadata': node.node.metadata, 'score': node.score}
+
+
+def _node_from_dict(data: dict[str, Any]) -> NodeWithScore:
+    return NodeWithScore(node=TextNode(text=data['text'], metadata=data['metadata']), score=data['score'])
@@ -0,0 +1,218 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+from chromadb.api.models.Collection import Collection
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import VectorStoreQuery, VectorStoreQueryResult
+from llama_index.vector_stores.chroma import ChromaVectorStore
+
+from ai_news import metrics
+from ai_news.news.cache import CacheStats
+from ai_news.rag.vector_db import bump_index_version
+
+
+class RetrievalCache:
+    """In-memory LRU cache of vector store query results with a time to live.
+
+    Results are keyed by the collection, its version stamp and the query
+    (quantized embedding, top k, filters and mode), so a write to the collection
+    invalidates every result computed before it.
+
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float | None = 60 * 60,
+        precision: int = 3,
+    ) -> None:
+        """Create retrieval cache.
+
+        Args:
+            max_entries (int, optional): Number of results kept, least recently used are evicted first.
+                Defaults to 1024.
+            ttl (float, optional): Time to live of a result in seconds. None never expires.
+                Defaults to 1 hour.
+            precision (int, optional): Decimals the normalized query embedding is rounded to, so
+                embeddings differing only by floating point noise share results.
+                Defaults to 3.
+
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.precision = precision
+        self.stats = CacheStats()
+
+        self._lock = threading.Lock()
+        # key -> (created_at, result), least recently used first.
+        self._entries: OrderedDict[str, tuple[float, VectorStoreQueryResult]] = OrderedDict()
+
+    def key(self, collection: str, version: str, query: VectorStoreQuery, **kwargs: Any) -> str:
+        """Cache key of `query` against `version` of `collection`.
+
+        Args:
+            collection (str): Collection name.
+            version (str): Collection version stamp, see `get_index_version`.
+            query (VectorStoreQuery): Vector store query.
+            **kwargs: Extra query arguments of the vector store, e.g. `where`.
+
+        Returns:
+            str: Hex digest of the quantized embedding and every other query parameter.
+
+        """
+        embedding = np.asarray(query.query_embedding or [], dtype=np.float32)
+        if (norm := np.linalg.norm(embedding)) > 0:
+            embedding = embedding / norm
+        quantized = np.round(embedding * 10**self.precision).astype(np.int32)
+
+        params = json.dumps(
+            {
+                'collection': collection,
+                'version': version,
+                'top_k': query.similarity_top_k,
+                'mode': str(query.mode),
+                'filters': query.filters.dict() if query.filters is not None else None,
+                'doc_ids': query.doc_ids,
+                'node_ids': query.node_ids,
+                'kwargs': kwargs,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha256(quantized.tobytes())
+        digest.update(params.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> VectorStoreQueryResult | None:
+        """Cached result of `key`, None if missing or expired."""
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                self.stats.misses += 1
+                return None
+
+            created_at, result = entry
+            if self.ttl is not None and time.monotonic() - created_at > self.ttl:
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+
+        # Callers may modify the returned nodes.
+        return copy.deepcopy(result)
+
+    def set(self, key: str, result: VectorStoreQueryResult) -> None:
+        """Cache `result` under `key`, evicting the least recently used results past `max_entries`."""
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class CachedChromaVectorStore(ChromaVectorStore):
+    """Chroma vector store serving repeated queries from a `RetrievalCache`.
+
+    Writes through this store bump the collection's version stamp, and the stamp
+    is re-read at most every `version_ttl` seconds to see writes from other
+    processes (e.g. the ingestion worker).
+
+    """
+
+    _cache: RetrievalCache = PrivateAttr()
+    _version: Callable[[], str] = PrivateAttr()
+    _version_ttl: float = PrivateAttr()
+    _version_lock: threading.Lock = PrivateAttr()
+    _current_version: tuple[float, str] | None = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        chroma_collection: Collection,
+        cache: RetrievalCache,
+        version: Callable[[], str],
+        version_ttl: float = 5.0,
+        **kwargs: Any,
+    ) -> None:
+        """Create cached Chroma vector store.
+
+        Args:
+            chroma_collection (Collection): Chroma collection.
+            cache (RetrievalCache): Retrieval cache, may be shared across collections.
+            version (Callable[[], str]): Current version stamp of the collection, see `get_index_version`.
+            version_ttl (float, optional): Seconds a read version stamp is trusted.
+                Defaults to 5 seconds.
+            **kwargs: Other arguments of `ChromaVectorStore`.
+
+        """
+        super().__init__(chroma_collection=chroma_collection, **kwargs)
+        self._cache = cache
+        self._version = version
+        self._version_ttl = version_ttl
+        self._version_lock = threading.Lock()
+        self._current_version = None
+
+    @classmethod
+    def class_name(cls) -> str:
+        return 'CachedChromaVectorStore'
+
+    def add(self, nodes: list[BaseNode], **add_kwargs: Any) -> list[str]:
+        ids = super().add(nodes, **add_kwargs)
+        self._bump_version()
+        return ids
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        super().delete(ref_doc_id, **delete_kwargs)
+        self._bump_version()
+
+    def delete_nodes(self, node_ids: list[str] | None = None, filters: Any = None) -> None:
+        super().delete_nodes(node_ids, filters)
+        self._bump_version()
+
+    def clear(self) -> None:
+        super().clear()
+        self._bump_version()
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        key = self._cache.key(self._collection.name, self.version, query, **kwargs)
+        if (result := self._cache.get(key)) is not None:
+            metrics.increment('retrieval_cache_total', result='hit')
+            return result
+
+        metrics.increment('retrieval_cache_total', result='miss')
+        result = super().query(query, **kwargs)
+        self._cache.set(key, result)
+        return result
+
+    @property
+    def version(self) -> str:
+        """Version stamp of the collection, re-read once it's older than `version_ttl`."""
+        with self._version_lock:
+            now = time.monotonic()
+            if self._current_version is None or now - self._current_version[0] > self._version_ttl:
+                self._current_version = (now, self._version())
+            return self._current_version[1]
+
+    def _bump_version(self) -> None:
+        with self._version_lock:
+            self._current_version = (time.monotonic(), bump_index_version(self._collection))
@@ -0,0 +1,146 @@
+import re
+import zlib
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import numpy as np
+from llama_index.core.bridge.pydantic import Field
+from llama_index.core.node_parser import NodeParser, SentenceSplitter
+from llama_index.core.node_parser.node_utils import build_nodes_from_splits
+from llama_index.core.node_parser.text.utils import split_by_sentence_tokenizer
+from llama_index.core.schema import BaseNode
+from llama_index.core.utils import get_tokenizer, get_tqdm_iterable
+
+
+class TfidfSemanticSplitterNodeParser(NodeParser):
+    """Semantic node parser that finds breakpoints with local TF-IDF vectors.
+
+    Works like `SemanticSplitterNodeParser` (a node ends where the dissimilarity of
+    neighbouring sentence groups exceeds a percentile threshold) but compares
+    hashed TF-IDF vectors computed with NumPy instead of calling the embedding
+    model for every sentence, so splitting costs no API calls. Chunks longer
+    than `max_chunk_size` tokens are split further at sentence boundaries.
+
+    """
+
+    sentence_splitter: Callable[[str], list[str]] = Field(
+        default_factory=split_by_sentence_tokenizer,
+        description='The text splitter to use when splitting documents.',
+        exclude=True,
+    )
+
+    buffer_size: int = Field(
+        default=1,
+        description='The number of neighbouring sentences to group together when evaluating similarity.',
+    )
+
+    breakpoint_percentile_threshold: int = Field(
+        default=95,
+        description=(
+            'The percentile of cosine dissimilarity that must be exceeded between a '
+            'group of sentences and the next to form a node.'
+        ),
+    )
+
+    num_features: int = Field(
+        default=2**12,
+        description='Dimension of the hashed term vectors.',
+    )
+
+    max_chunk_size: int = Field(
+        default=1024,
+        description='The maximum number of tokens in a node.',
+        gt=0,
+    )
+
+    tokenizer: Callable[[str], Sequence[Any]] = Field(
+        default_factory=get_tokenizer,
+        description='The tokenizer used to count the tokens of a node.',
+        exclude=True,
+    )
+
+    @classmethod
+    def class_name(cls) -> str:
+        return 'TfidfSemanticSplitterNodeParser'
+
+    def _parse_nodes(
+        self,
+        nodes: Sequence[BaseNode],
+        show_progress: bool = False,
+        **kwargs: Any,
+    ) -> list[BaseNode]:
+        """Parse document into nodes."""
+        all_nodes: list[BaseNode] = []
+        for node in get_tqdm_iterable(nodes, show_progress, 'Parsing nodes'):
+            chunks = self.split_text(node.get_content())
+            all_nodes.extend(build_nodes_from_splits(chunks, node, id_func=self.id_func))
+        return all_nodes
+
+    def split_text(self, text: str) -> list[str]:
+        """Split text into chunks of semantically related sentences."""
+        sentences = self.sentence_splitter(text)
+        if len(sentences) < 2:
+            return self._bound(sentences)
+
+        distances = self.distances(sentences)
+        threshold = np.percentile(distances, self.breakpoint_percentile_threshold)
+        breakpoints = np.flatnonzero(distances > threshold) + 1
+
+        return [
+            chunk
+            for start, end in zip([0, *breakpoints], [*breakpoints, len(sentences)])
+            for chunk in self._bound(sentences[start:end])
+        ]
+
+    def _bound(self, sentences: list[str]) -> list[str]:
+        """Join a group of sentences into chunks of at most `max_chunk_size` tokens."""
+        sizes = [len(self.tokenizer(sentence)) for sentence in sentences]
+        if sum(sizes) <= self.max_chunk_size:
+            return [''.join(sentences)] if sentences else []
+
+        chunks: list[str] = []
+        chunk: list[str] = []
+        chunk_size = 0
+        for sentence, size in zip(sentences, sizes):
+            if chunk and chunk_size + size > self.max_chunk_size:
+                chunks.append(''.join(chunk))
+                chunk, chunk_size = [], 0
+            if size > self.max_chunk_size:
+                # A single sentence over the limit is split at word boundaries.
+                splitter = SentenceSplitter(chunk_size=self.max_chunk_size, chunk_overlap=0, tokenizer=self.tokenizer)
+                chunks.extend(splitter.split_text(sentence))
+                continue
+            chunk.append(sentence)
+            chunk_size += size
+
+        if chunk:
+            chunks.append(''.join(chunk))
+        return chunks
+
+    def distances(self, sentences: list[str]) -> np.ndarray:
+        """Cosine distance between each sentence group and the next one."""
+        # Hashed term counts, one row per sentence.
+        counts = np.zeros((len(sentences), self.num_features), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            terms = [
+                zlib.crc32(term.encode('utf-8')) % self.num_features for term in re.findall(r'\w+', sentence.lower())
+            ]
+            np.add.at(counts[row], terms, 1.0)
+
+        # Sublinear TF, smoothed IDF over the document's sentences.
+        document_frequency = np.count_nonzero(counts, axis=0)
+        idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+        tfidf = np.log1p(counts) * idf
+
+        # Sum each sentence with `buffer_size` neighbours on either side.
+        cumulative = np.vstack([np.zeros((1, self.num_features), dtype=tfidf.dtype), np.cumsum(tfidf, axis=0)])
+        index = np.arange(len(sentences))
+        start = np.maximum(index - self.buffer_size, 0)
+        end = np.minimum(index + self.buffer_size + 1, len(sentences))
+        groups = cumulative[end] - cumulative[start]
+
+        norms = np.linalg.norm(groups, axis=1, keepdims=True)
+        groups = groups / np.where(norms == 0, 1, norms)
+        similarity = np.einsum('ij,ij->i', groups[:-1], groups[1:])
+        distances: np.ndarray = 1 - similarity
+        return distances
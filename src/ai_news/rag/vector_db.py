@@ -1,13 +1,51 @@
+import concurrent.futures
+import json
+import re
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from enum import Enum, auto
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from chromadb import EphemeralClient, HttpClient, PersistentClient
 from chromadb.api import ClientAPI
+from chromadb.api.models.Collection import Collection
+from chromadb.errors import ChromaError
 from llama_index.core import StorageContext, VectorStoreIndex
+from llama_index.core.bridge.pydantic import PrivateAttr
 from llama_index.core.embeddings.utils import EmbedType
 from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
 from llama_index.vector_stores.chroma import ChromaVectorStore
 
+from ai_news import metrics
+from ai_news.news.util import FILTER_METADATA_KEYS, filter_metadata
+
+if TYPE_CHECKING:
+    from ai_news.rag.bm25 import BM25Index
+    from ai_news.rag.retrieval_cache import RetrievalCache
+
+# Collection metadata key of the version stamp changed on every write.
+INDEX_VERSION_KEY = 'ai_news:index_version'
+# Collection metadata key of the newest `published_ts` of its nodes, see `get_latest_published_at`.
+LATEST_PUBLISHED_KEY = 'ai_news:latest_published_ts'
+# Collection metadata key set once all its nodes have filter metadata, see `add_filter_metadata`.
+FILTER_METADATA_KEY = 'ai_news:filter_metadata'
+# Collection metadata keys of a partitioned collection, see `PartitionedChromaVectorStore`.
+PARTITIONING_KEY = 'ai_news:partitioning'
+SEARCH_PARTITIONS_KEY = 'ai_news:search_partitions'
+
 
 class ClientType(Enum):
     """Chroma DB client type."""
@@ -55,6 +93,10 @@ def create_vector_store_index(
     collection_name: str,
     nodes: list[BaseNode] | None = None,
     embed_model: EmbedType | None = None,
+    retrieval_cache: 'RetrievalCache | None' = None,
+    lexical_index: 'BM25Index | None' = None,
+    partitioning: 'Partitioning | None' = None,
+    search_partitions: int | None = None,
 ) -> VectorStoreIndex:
     """Create or load VectorStoreIndex from Chroma.
 
@@ -65,6 +107,18 @@ def create_vector_store_index(
             Defaults to None.
         embed_model (EmbedType, optional): `BaseEmbedding` or embedding str to use.
             Defaults to None.
+        retrieval_cache (RetrievalCache, optional): Serve repeated queries from this cache.
+            Defaults to None.
+        lexical_index (BM25Index, optional): BM25 index kept alongside the collection: `nodes` are
+            added to it, or it's brought up to date with the collection when loading.
+            Defaults to None.
+        partitioning (Partitioning, optional): Partition the collection by publish date, see
+            `PartitionedChromaVectorStore`. Recorded in the collection's metadata, so it's
+            loaded partitioned from then on, and its nodes are moved into partitions.
+            Defaults to None, the recorded partitioning (none for a new collection).
+        search_partitions (int, optional): Number of newest partitions searched per query.
+            Recorded like `partitioning`.
+            Defaults to None, the recorded number or 4.
 
     Returns:
         VectorStoreIndex: Created or loaded vector store index.
@@ -73,26 +127,700 @@ def create_vector_store_index(
     # Create new collection if it doesn't exist.
     collection = client.get_or_create_collection(name=collection_name)
 
+    recorded = collection.metadata or {}
+    if partitioning is None and isinstance(name := recorded.get(PARTITIONING_KEY), str):
+        partitioning = Partitioning[name.upper()]
+    if partitioning is not None:
+        search_partitions = search_partitions or int(recorded.get(SEARCH_PARTITIONS_KEY, 4))
+        config = {PARTITIONING_KEY: partitioning.name.lower(), SEARCH_PARTITIONS_KEY: search_partitions}
+        if any(recorded.get(key) != value for key, value in config.items()):
+            _update_metadata(collection, config)
+
     # Create storage context from chroma vector store.
-    vector_store = ChromaVectorStore(chroma_collection=collection)
+    vector_store: BasePydanticVectorStore
+    if partitioning is not None:
+        vector_store = PartitionedChromaVectorStore(
+            client=client,
+            collection_name=collection_name,
+            partitioning=partitioning,
+            search_partitions=search_partitions,
+            retrieval_cache=retrieval_cache,
+        )
+        if collection.count():
+            vector_store.migrate(collection)
+    elif retrieval_cache is not None:
+        from ai_news.rag.retrieval_cache import CachedChromaVectorStore
+
+        vector_store = CachedChromaVectorStore(
+            chroma_collection=collection,
+            cache=retrieval_cache,
+            version=lambda: get_index_version(client.get_collection(name=collection_name)),
+        )
+    else:
+        vector_store = ChromaVectorStore(chroma_collection=collection)
     storage_context = StorageContext.from_defaults(vector_store=vector_store)
 
     if nodes is not None:
         # Create from nodes
         print('Creating index...')
-        index = VectorStoreIndex(
-            nodes=nodes,
-            embed_model=embed_model,
-            storage_context=storage_context,
-            show_progress=True,
-        )
+        with metrics.timer('chroma_seconds', operation='write'):
+            index = VectorStoreIndex(
+                nodes=nodes,
+                embed_model=embed_model,
+                storage_context=storage_context,
+                show_progress=True,
+            )
+        if lexical_index is not None:
+            lexical_index.add(nodes)
+        update_latest_published_at(collection, nodes)
     else:
         # Load from vector store.
         print('Loading index...')
-        index = VectorStoreIndex.from_vector_store(
-            vector_store=vector_store,
-            embed_model=embed_model,
-            storage_context=storage_context,
-        )
+        with metrics.timer('chroma_seconds', operation='load'):
+            index = VectorStoreIndex.from_vector_store(
+                vector_store=vector_store,
+                embed_model=embed_model,
+                storage_context=storage_context,
+            )
+        # Partitioned collections keep their BM25 index up to date on ingestion only.
+        if lexical_index is not None and partitioning is None:
+            lexical_index.sync(collection)
 
     return index
+
+
+@metrics.timed('chroma_seconds', operation='latest_published_at')
+def get_latest_published_at(client: ClientAPI, collection_name: str, batch_size: int = 10_000) -> datetime | None:
+    """Get the newest publish date of the nodes stored in a, possibly partitioned, collection.
+
+    Read from the high-water mark kept by `update_latest_published_at`. Collections
+    indexed before the mark was kept are scanned once, and the mark recorded.
+
+    Args:
+        client (ClientAPI): Chroma client.
+        collection_name (str): Name of an existing collection.
+        batch_size (int, optional): Number of metadata records to read at once when scanning.
+            Defaults to 10,000.
+
+    Returns:
+        datetime | None: Newest publish date in UTC or None if the collection is empty.
+
+    """
+    collection = client.get_collection(name=collection_name)
+    if isinstance(latest := (collection.metadata or {}).get(LATEST_PUBLISHED_KEY), int | float):
+        return datetime.fromtimestamp(latest, tz=timezone.utc)
+
+    # Newest partition first, so only it is scanned (unless empty).
+    for scanned in get_collections(client, collection_name):
+        timestamps = [
+            published_ts
+            for offset in range(0, scanned.count(), batch_size)
+            for metadata in scanned.get(include=['metadatas'], limit=batch_size, offset=offset)['metadatas'] or []
+            if metadata and (published_ts := _published_ts(metadata)) is not None
+        ]
+        if timestamps:
+            _update_metadata(collection, {LATEST_PUBLISHED_KEY: max(timestamps)})
+            return datetime.fromtimestamp(max(timestamps), tz=timezone.utc)
+    return None
+
+
+def update_latest_published_at(collection: Collection, nodes: Iterable[BaseNode]) -> None:
+    """Raise the high-water mark of a collection's publish dates to the newest of `nodes`.
+
+    Args:
+        collection (Collection): Chroma collection, the collection itself if it's partitioned.
+        nodes (Iterable[BaseNode]): Nodes just added to the collection.
+
+    """
+    timestamps = [published_ts for node in nodes if (published_ts := _published_ts(node.metadata)) is not None]
+    latest = (collection.metadata or {}).get(LATEST_PUBLISHED_KEY)
+    if timestamps and (not isinstance(latest, int | float) or max(timestamps) > latest):
+        _update_metadata(collection, {LATEST_PUBLISHED_KEY: max(timestamps)})
+
+
+@metrics.timed('chroma_seconds', operation='existing_urls')
+def get_existing_urls(collection: Collection, urls: Iterable[str]) -> set[str]:
+    """Get which of the given article URLs are already stored in a collection.
+
+    Args:
+        collection (Collection): Chroma collection.
+        urls (Iterable[str]): Article URLs to look up.
+
+    Returns:
+        set[str]: URLs that have at least one node in the collection.
+
+    """
+    urls = list(set(urls))
+    if not urls:
+        return set()
+
+    result = collection.get(where={'url': {'$in': urls}}, include=['metadatas'])
+    return {str(metadata['url']) for metadata in result['metadatas'] or [] if metadata}
+
+
+@metrics.timed('chroma_seconds', operation='source_names')
+def get_source_names(collection: Collection, batch_size: int = 10_000) -> set[str]:
+    """Get the names of every news source with nodes in a collection.
+
+    Args:
+        collection (Collection): Chroma collection.
+        batch_size (int, optional): Number of metadata records to read at once.
+            Defaults to 10,000.
+
+    Returns:
+        set[str]: Source names.
+
+    """
+    names: set[str] = set()
+    for offset in range(0, collection.count(), batch_size):
+        result = collection.get(include=['metadatas'], limit=batch_size, offset=offset)
+        names.update(
+            source
+            for metadata in result['metadatas'] or []
+            if metadata and isinstance(source := metadata.get('source'), str) and source
+        )
+    return names
+
+
+@metrics.timed('chroma_seconds', operation='add_filter_metadata')
+def add_filter_metadata(collection: Collection, batch_size: int = 1_000) -> dict[str, dict[str, Any]]:
+    """Add `published_ts` to nodes indexed before it was part of the document metadata.
+
+    The collection is only scanned once: afterwards it's marked with
+    `FILTER_METADATA_KEY`, as every node added since has the filter metadata.
+
+    Args:
+        collection (Collection): Chroma collection.
+        batch_size (int, optional): Number of metadata records to read and update at once.
+            Defaults to 1,000.
+
+    Returns:
+        dict[str, dict[str, Any]]: Metadata added to each updated node, by node id.
+
+    """
+    if (collection.metadata or {}).get(FILTER_METADATA_KEY):
+        return {}
+
+    updated: dict[str, dict[str, Any]] = {}
+    for offset in range(0, collection.count(), batch_size):
+        result = collection.get(include=['metadatas'], limit=batch_size, offset=offset)
+        ids, metadatas = [], []
+        for node_id, metadata in zip(result['ids'], result['metadatas'] or []):
+            if not metadata or 'published_ts' in metadata or not isinstance(metadata.get('published_at'), str):
+                continue
+            extra = filter_metadata(str(metadata['published_at']))
+            ids.append(node_id)
+            metadatas.append({**metadata, **extra, **_with_node_content_metadata(metadata, extra)})
+            updated[node_id] = extra
+        if ids:
+            collection.update(ids=ids, metadatas=metadatas)
+    if updated:
+        print(f'Added filter metadata to {len(updated):,} nodes of {collection.name}.')
+    _update_metadata(collection, {FILTER_METADATA_KEY: True})
+    return updated
+
+
+def _with_node_content_metadata(metadata: dict[str, Any], extra: dict[str, Any]) -> dict[str, Any]:
+    """`_node_content` of a node stored by `ChromaVectorStore` with `extra` metadata, so loaded nodes have it too."""
+    if not isinstance(node_content := metadata.get('_node_content'), str):
+        return {}
+
+    node = json.loads(node_content)
+    node['metadata'] = {**node.get('metadata', {}), **extra}
+    for key in ('excluded_embed_metadata_keys', 'excluded_llm_metadata_keys'):
+        excluded = node.get(key, [])
+        node[key] = excluded + [name for name in FILTER_METADATA_KEYS if name not in excluded]
+    return {'_node_content': json.dumps(node)}
+
+
+def get_index_version(collection: Collection) -> str:
+    """Version stamp of a collection's contents, see `bump_index_version`.
+
+    Args:
+        collection (Collection): Chroma collection, freshly fetched from the client
+            to see writes from other processes.
+
+    Returns:
+        str: Version stamp, '0' if the collection has never been stamped.
+
+    """
+    return str((collection.metadata or {}).get(INDEX_VERSION_KEY, '0'))
+
+
+def bump_index_version(collection: Collection) -> str:
+    """Give a collection a new version stamp after its contents changed.
+
+    Anything derived from the collection (e.g. cached answers) is keyed by this
+    stamp, so it's invalidated as soon as the collection is written to.
+
+    Args:
+        collection (Collection): Chroma collection.
+
+    Returns:
+        str: New version stamp.
+
+    """
+    version = uuid.uuid4().hex
+    _update_metadata(collection, {INDEX_VERSION_KEY: version})
+    return version
+
+
+def _update_metadata(collection: Collection, values: Mapping[str, Any]) -> None:
+    """Set keys of a collection's metadata, keeping the others."""
+    # `modify` replaces the whole metadata, and `collection.metadata` is a snapshot taken when the
+    # collection was fetched: re-read it, so keys written since (by another object or process) are kept.
+    current = collection._client.get_collection(
+        name=collection.name,
+        tenant=collection.tenant,
+        database=collection.database,
+    ).metadata
+    # Chroma refuses to modify `hnsw:` settings, even to their current value.
+    metadata = {key: value for key, value in (current or {}).items() if not key.startswith('hnsw:')}
+    collection.modify(metadata={**metadata, **values})
+
+
+class Partitioning(Enum):
+    """Time span of the partitions of a collection, see `PartitionedChromaVectorStore`."""
+
+    DAY = auto()
+    WEEK = auto()
+
+
+@dataclass(frozen=True)
+class Partition:
+    """Chroma collection holding the nodes of a partitioned collection published in [`start`, `end`)."""
+
+    name: str
+    start: datetime
+    end: datetime
+
+
+def partition_name(collection_name: str, date: datetime, partitioning: Partitioning) -> str:
+    """Name of the partition of `collection_name` holding the nodes published at `date`.
+
+    Args:
+        collection_name (str): Name of the partitioned collection.
+        date (datetime): Publish date, naive dates are assumed to be UTC.
+        partitioning (Partitioning): Time span of the partitions.
+
+    Returns:
+        str: Partition name, e.g. 'artificial_intelligence__2024-05-13' or 'artificial_intelligence__2024-W20'.
+
+    """
+    date = _utc(date)
+    match partitioning:
+        case Partitioning.DAY:
+            return f'{collection_name}__{date:%Y-%m-%d}'
+        case Partitioning.WEEK:
+            year, week, _ = date.isocalendar()
+            return f'{collection_name}__{year}-W{week:02d}'
+        case _:
+            raise ValueError('Invalid Partitioning.')
+
+
+def get_partitions(client: ClientAPI, collection_name: str) -> list[Partition]:
+    """Get the partitions of a collection.
+
+    Args:
+        client (ClientAPI): Chroma client.
+        collection_name (str): Name of the partitioned collection.
+
+    Returns:
+        list[Partition]: Day and week partitions, newest first.
+
+    """
+    pattern = re.compile(rf'{re.escape(collection_name)}__(\d{{4}})-(?:(\d{{2}})-(\d{{2}})|W(\d{{2}}))')
+    partitions: list[Partition] = []
+    for collection in client.list_collections():
+        if (match := pattern.fullmatch(collection.name)) is None:
+            continue
+        year, month, day, week = match.groups()
+        if week is None:
+            start = datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
+            end = start + timedelta(days=1)
+        else:
+            start = datetime.fromisocalendar(int(year), int(week), 1).replace(tzinfo=timezone.utc)
+            end = start + timedelta(weeks=1)
+        partitions.append(Partition(name=collection.name, start=start, end=end))
+    return sorted(partitions, key=lambda partition: (partition.end, partition.start), reverse=True)
+
+
+def get_collections(client: ClientAPI, collection_name: str) -> list[Collection]:
+    """Get the Chroma collections holding the nodes of a collection.
+
+    Args:
+        client (ClientAPI): Chroma client.
+        collection_name (str): Name of an existing collection.
+
+    Returns:
+        list[Collection]: Its partitions newest first, followed by the collection itself.
+
+    """
+    collections = [client.get_collection(name=partition.name) for partition in get_partitions(client, collection_name)]
+    collections.append(client.get_collection(name=collection_name))
+    return collections
+
+
+def count_nodes(client: ClientAPI, collection_name: str) -> int:
+    """Number of nodes of an existing, possibly partitioned, collection."""
+    return sum(collection.count() for collection in get_collections(client, collection_name))
+
+
+# Searches partitions of every `PartitionedChromaVectorStore`, shared so stores that are
+# loaded again (e.g. on every refresh) don't each leave a pool of idle threads behind.
+_SEARCH_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix='partition_search')
+
+
+class PartitionedChromaVectorStore(BasePydanticVectorStore):
+    """Chroma vector store splitting a collection into one collection per day or week of news.
+
+    Nodes are added to the partition of their publish date. Queries search the
+    newest `search_partitions` partitions overlapping their `published_ts`
+    filters in parallel, and merge the results by similarity, so search cost
+    stays flat as news accumulates. `enforce_retention` drops expired
+    partitions and compacts old day partitions into weeks, keeping the size of
+    the store flat too.
+
+    The collection named `collection_name` itself holds no nodes, only the
+    partitioning and the version stamp of the whole store in its metadata.
+
+    """
+
+    stores_text: bool = True
+    flat_metadata: bool = True
+
+    collection_name: str
+    partitioning: Partitioning
+    search_partitions: int
+
+    _client: ClientAPI = PrivateAttr()
+    _retrieval_cache: 'RetrievalCache | None' = PrivateAttr(default=None)
+    _partitions_ttl: float = PrivateAttr()
+    _partitions: tuple[float, list[Partition]] | None = PrivateAttr(default=None)
+    _stores: dict[str, ChromaVectorStore] = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+    _version_ttl: float = PrivateAttr()
+    _current_version: tuple[float, str] | None = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        client: ClientAPI,
+        collection_name: str,
+        partitioning: Partitioning = Partitioning.WEEK,
+        search_partitions: int = 4,
+        retrieval_cache: 'RetrievalCache | None' = None,
+        partitions_ttl: float = 60.0,
+        version_ttl: float = 5.0,
+    ) -> None:
+        """Create partitioned Chroma vector store.
+
+        Args:
+            client (ClientAPI): Chroma client.
+            collection_name (str): Name of the partitioned collection, at most 51 characters.
+            partitioning (Partitioning, optional): Time span of new partitions.
+                Defaults to `Partitioning.WEEK`.
+            search_partitions (int, optional): Number of newest partitions searched per query.
+                Defaults to 4.
+            retrieval_cache (RetrievalCache, optional): Serve repeated queries of every partition from this cache.
+                Defaults to None.
+            partitions_ttl (float, optional): Seconds the listed partitions are trusted, to see partitions
+                created or dropped by other processes (e.g. the ingestion worker).
+                Defaults to 60 seconds.
+            version_ttl (float, optional): Seconds the version stamp of the store is trusted, see `version`.
+                Defaults to 5 seconds.
+
+        """
+        super().__init__(
+            collection_name=collection_name,
+            partitioning=partitioning,
+            search_partitions=search_partitions,
+        )
+        self._client = client
+        self._retrieval_cache = retrieval_cache
+        self._partitions_ttl = partitions_ttl
+        self._partitions = None
+        self._stores = {}
+        self._lock = threading.Lock()
+        self._version_ttl = version_ttl
+        self._current_version = None
+
+    @classmethod
+    def class_name(cls) -> str:
+        return 'PartitionedChromaVectorStore'
+
+    @property
+    def client(self) -> ClientAPI:
+        return self._client
+
+    def partitions(self) -> list[Partition]:
+        """Partitions of the collection, newest first, re-listed once older than `partitions_ttl`."""
+        with self._lock:
+            now = time.monotonic()
+            if self._partitions is None or now - self._partitions[0] > self._partitions_ttl:
+                self._partitions = (now, get_partitions(self._client, self.collection_name))
+            return self._partitions[1]
+
+    @property
+    def version(self) -> str:
+        """Version stamp of the whole store, re-read once it's older than `version_ttl`.
+
+        Every write to a partition also bumps the store's stamp, so the cached
+        results of all partitions are keyed by it instead of each partition
+        fetching its own stamp.
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._current_version is None or now - self._current_version[0] > self._version_ttl:
+                collection = self._client.get_or_create_collection(name=self.collection_name)
+                self._current_version = (now, get_index_version(collection))
+            return self._current_version[1]
+
+    def count(self) -> int:
+        """Number of nodes in every partition."""
+        return sum(self._store(partition.name).client.count() for partition in self.partitions())
+
+    def add(self, nodes: list[BaseNode], **add_kwargs: Any) -> list[str]:
+        groups: dict[str, list[BaseNode]] = {}
+        for node in nodes:
+            name = partition_name(self.collection_name, _published_at(node.metadata), self.partitioning)
+            groups.setdefault(name, []).append(node)
+
+        for name, group in groups.items():
+            self._store(name).add(group, **add_kwargs)
+        if not groups.keys() <= {partition.name for partition in self.partitions()}:
+            self._invalidate()
+        self._bump_version()
+        return [node.node_id for node in nodes]
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        for partition in self.partitions():
+            self._store(partition.name).delete(ref_doc_id, **delete_kwargs)
+        self._bump_version()
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        start, end = _published_window(query.filters)
+        partitions = [
+            partition
+            for partition in self.partitions()
+            if (start is None or partition.end > start) and (end is None or partition.start < end)
+        ][: self.search_partitions]
+        metrics.observe('partitions_searched', len(partitions))
+
+        def search(partition: Partition) -> VectorStoreQueryResult:
+            try:
+                return self._store(partition.name).query(query, **kwargs)
+            except (ChromaError, ValueError):
+                # Dropped by another process since the partitions were listed.
+                self._invalidate()
+                return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+
+        hits = [
+            (similarity, node, node_id)
+            for result in _SEARCH_EXECUTOR.map(search, partitions)
+            for similarity, node, node_id in zip(
+                result.similarities or [0.0] * len(result.nodes or []),
+                result.nodes or [],
+                result.ids or [],
+            )
+        ]
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        hits = hits[: query.similarity_top_k]
+        return VectorStoreQueryResult(
+            nodes=[node for _, node, _ in hits],
+            similarities=[similarity for similarity, _, _ in hits],
+            ids=[node_id for _, _, node_id in hits],
+        )
+
+    def enforce_retention(
+        self,
+        max_age: timedelta | None = None,
+        compact_after: timedelta | None = None,
+        now: datetime | None = None,
+    ) -> list[str]:
+        """Drop expired partitions and compact old day partitions into week partitions.
+
+        Args:
+            max_age (timedelta, optional): Drop partitions whose news are all older than this.
+                Defaults to None (keep everything).
+            compact_after (timedelta, optional): Merge the day partitions of weeks that ended
+                longer ago than this into one partition per week.
+                Defaults to None (no compaction).
+            now (datetime, optional): Current time.
+                Defaults to None, `datetime.now()`.
+
+        Returns:
+            list[str]: Ids of the dropped nodes, e.g. to remove them from the BM25 index.
+
+        """
+        now = _utc(now or datetime.now(timezone.utc))
+        dropped: list[str] = []
+        expired = [] if max_age is None else [p for p in self.partitions() if p.end <= now - max_age]
+        for partition in expired:
+            dropped.extend(self._drop(partition))
+
+        weeks: dict[str, list[Partition]] = {}
+        if compact_after is not None:
+            for partition in self.partitions():
+                is_day = partition.end - partition.start == timedelta(days=1)
+                week_end = partition.start + timedelta(days=7 - partition.start.weekday())
+                if is_day and week_end <= now - compact_after:
+                    week = partition_name(self.collection_name, partition.start, Partitioning.WEEK)
+                    weeks.setdefault(week, []).append(partition)
+        for week, days in weeks.items():
+            self._compact(days, week)
+
+        if expired or weeks:
+            self._bump_version()
+            print(
+                f'Dropped {len(expired):,} partitions ({len(dropped):,} nodes) and compacted'
+                f' {sum(map(len, weeks.values())):,} day partitions of {self.collection_name}.'
+            )
+        return dropped
+
+    def migrate(self, collection: Collection, batch_size: int = 1_000) -> int:
+        """Move the nodes of an unpartitioned collection into partitions.
+
+        Args:
+            collection (Collection): Collection to empty, e.g. the collection itself before it was partitioned.
+            batch_size (int, optional): Number of nodes read from Chroma at once.
+                Defaults to 1,000.
+
+        Returns:
+            int: Number of nodes moved.
+
+        """
+        ids = self._copy(
+            collection,
+            lambda metadata: partition_name(self.collection_name, _published_at(metadata), self.partitioning),
+            batch_size=batch_size,
+        )
+        for start in range(0, len(ids), batch_size):
+            collection.delete(ids=ids[start : start + batch_size])
+        if ids:
+            self._bump_version()
+            print(f'Moved {len(ids):,} nodes of {collection.name} into partitions.')
+        return len(ids)
+
+    def _store(self, name: str) -> ChromaVectorStore:
+        """Vector store of partition `name`, creating the partition if needed."""
+        with self._lock:
+            if (store := self._stores.get(name)) is None:
+                collection = self._client.get_or_create_collection(name=name)
+                if self._retrieval_cache is not None:
+                    from ai_news.rag.retrieval_cache import CachedChromaVectorStore
+
+                    store = CachedChromaVectorStore(
+                        chroma_collection=collection,
+                        cache=self._retrieval_cache,
+                        version=lambda: self.version,
+                        # Already cached by `version`.
+                        version_ttl=0.0,
+                    )
+                else:
+                    store = ChromaVectorStore(chroma_collection=collection)
+                self._stores[name] = store
+            return store
+
+    def _drop(self, partition: Partition) -> list[str]:
+        """Delete a partition, returning the ids of its nodes."""
+        ids = self._client.get_collection(name=partition.name).get(include=[])['ids']
+        self._client.delete_collection(name=partition.name)
+        with self._lock:
+            self._stores.pop(partition.name, None)
+        self._invalidate()
+        return ids
+
+    def _compact(self, days: list[Partition], week: str) -> None:
+        """Merge day partitions into their week partition."""
+        for day in days:
+            self._copy(self._client.get_collection(name=day.name), lambda metadata: week)
+            self._client.delete_collection(name=day.name)
+            with self._lock:
+                self._stores.pop(day.name, None)
+        bump_index_version(self._client.get_collection(name=week))
+        self._invalidate()
+
+    def _copy(
+        self,
+        source: Collection,
+        route: Callable[[Mapping[str, Any]], str],
+        batch_size: int = 1_000,
+    ) -> list[str]:
+        """Copy the records of `source` (with their embeddings) to the partitions named by `route`."""
+        copied: list[str] = []
+        for offset in range(0, source.count(), batch_size):
+            result = source.get(include=['embeddings', 'documents', 'metadatas'], limit=batch_size, offset=offset)
+            groups: dict[str, list[int]] = {}
+            for i, metadata in enumerate(result['metadatas'] or []):
+                groups.setdefault(route(metadata or {}), []).append(i)
+            for name, rows in groups.items():
+                self._client.get_or_create_collection(name=name).upsert(
+                    ids=[result['ids'][i] for i in rows],
+                    embeddings=[result['embeddings'][i] for i in rows],  # type: ignore[index]
+                    documents=[result['documents'][i] for i in rows],  # type: ignore[index]
+                    metadatas=[result['metadatas'][i] for i in rows],  # type: ignore[index]
+                )
+            copied.extend(result['ids'])
+        self._invalidate()
+        return copied
+
+    def _invalidate(self) -> None:
+        with self._lock:
+            self._partitions = None
+
+    def _bump_version(self) -> None:
+        version = bump_index_version(self._client.get_or_create_collection(name=self.collection_name))
+        with self._lock:
+            self._current_version = (time.monotonic(), version)
+
+
+def _published_at(metadata: Mapping[str, Any]) -> datetime:
+    """Publish date of a node from its metadata, now if unknown."""
+    if (published_ts := _published_ts(metadata)) is None:
+        return datetime.now(timezone.utc)
+    return datetime.fromtimestamp(published_ts, tz=timezone.utc)
+
+
+def _published_ts(metadata: Mapping[str, Any]) -> float | None:
+    """Publish date of a node from its metadata as a Unix timestamp, None if unknown."""
+    if isinstance(published_ts := metadata.get('published_ts'), int | float):
+        return float(published_ts)
+    if isinstance(published_at := metadata.get('published_at'), str):
+        return _utc(datetime.fromisoformat(published_at)).timestamp()
+    return None
+
+
+def _published_window(filters: MetadataFilters | None) -> tuple[datetime | None, datetime | None]:
+    """Publish dates [start, end) a query's `published_ts` filters restrict it to, None if unbounded."""
+    start: datetime | None = None
+    end: datetime | None = None
+    if filters is None or filters.condition not in (None, FilterCondition.AND):
+        return start, end
+
+    for condition in filters.filters:
+        if not isinstance(condition, MetadataFilter) or condition.key != 'published_ts':
+            continue
+        if not isinstance(condition.value, int | float):
+            continue
+        date = datetime.fromtimestamp(condition.value, tz=timezone.utc)
+        lower = upper = None
+        match condition.operator:
+            case FilterOperator.GT | FilterOperator.GTE:
+                lower = date
+            case FilterOperator.LT:
+                upper = date
+            case FilterOperator.LTE:
+                upper = date + timedelta(seconds=1)
+            case FilterOperator.EQ:
+                lower, upper = date, date + timedelta(seconds=1)
+        if lower is not None:
+            start = lower if start is None else max(start, lower)
+        if upper is not None:
+            end = upper if end is None else min(end, upper)
+    return start, end
+
+
+def _utc(date: datetime) -> datetime:
+    """Timezone-aware UTC datetime, assuming naive datetimes are UTC."""
+    return date.replace(tzinfo=timezone.utc) if date.tzinfo is None else date.astimezone(timezone.utc)
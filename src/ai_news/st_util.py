@@ -1,10 +1,23 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import streamlit as st
-from llama_index.core.chat_engine.types import BaseChatEngine
-from llama_index.core.prompts import ChatMessage, MessageRole
-from llama_index.embeddings.openai import OpenAIEmbedding
-from llama_index.llms.openai import OpenAI
 
-from ai_news.rag.index import create_index
+if TYPE_CHECKING:
+    # llama_index takes seconds to import, so it's only imported once the models are loaded.
+    from llama_index.core.chat_engine.types import BaseChatEngine
+    from llama_index.core.prompts import MessageRole
+    from llama_index.llms.openai import OpenAI
+
+    from ai_news.rag.bm25 import BM25Index
+    from ai_news.rag.embedding_cache import CachedEmbedding
+    from ai_news.rag.response_cache import ResponseCache
+    from ai_news.rag.retrieval_cache import RetrievalCache
+
+
+class IndexNotBuiltError(Exception):
+    """The ingestion worker hasn't built the news index yet."""
 
 
 def add_to_message_history(role: MessageRole, content: str) -> None:
@@ -15,39 +28,114 @@ def add_to_message_history(role: MessageRole, content: str) -> None:
         content (str): The content of the message.
 
     """
+    from llama_index.core.prompts import ChatMessage
+
     st.session_state.messages.append(ChatMessage(role=role, content=content))
 
 
 @st.cache_resource(
-    show_spinner='Creating chat engine from index. This will take a few moment..',
+    show_spinner='Loading chat engine from index...',
 )
-def create_chat_engine(news_api_key: str) -> BaseChatEngine:
-    """Create chat engine from index."""
-    index = create_index(
-        topic='artificial intelligence',
-        collection_name='artificial_intelligence',
-        use_semantic_splitter=True,
-        news_api_key=news_api_key,
-    )
-    chat_engine: BaseChatEngine = index.as_chat_engine()
-    return chat_engine
+def create_chat_engine(
+    api_key: str,
+    model: str = 'gpt-3.5-turbo',
+    collection_name: str = 'artificial_intelligence',
+) -> BaseChatEngine:
+    """Create chat engine from the index built by the ingestion worker.
 
+    Context is retrieved by both vector and BM25 search, fused by rank, from
+    the news published in the time window and by the sources or category the
+    question asks about (e.g. "health news from this week"). Answers
+    to repeated questions are replayed from the response cache and repeated
+    searches from the retrieval cache until the index is refreshed.
 
-@st.cache_data
-def load_embed_model(api_key: str) -> OpenAIEmbedding:
-    """Load OpenAI embedding model."""
-    return OpenAIEmbedding(
-        api_key=api_key,
+    Raises:
+        IndexNotBuiltError: If the index hasn't been built yet. Unlike a return
+            value, the error isn't cached, so reloading the page tries again.
+
+    """
+    from llama_index.core.chat_engine import CondensePlusContextChatEngine
+
+    from ai_news.rag.filters import FilteredRetriever, parse_query_filters
+    from ai_news.rag.index import get_default_client, load_index
+    from ai_news.rag.response_cache import CachedChatEngine
+    from ai_news.rag.vector_db import get_collections, get_index_version, get_source_names
+
+    client = get_default_client()
+    embed_model = load_embed_model(api_key=api_key)
+    lexical_index = load_lexical_index(collection_name=collection_name)
+    index = load_index(
+        collection_name=collection_name,
+        embed_model=embed_model,
+        client=client,
+        retrieval_cache=load_retrieval_cache(),
+        lexical_index=lexical_index,
+    )
+    if index is None:
+        raise IndexNotBuiltError(f'Collection {collection_name!r} has not been built yet.')
+
+    # The root of a partitioned collection holds no nodes, its partitions do.
+    sources = set().union(*(get_source_names(c) for c in get_collections(client, collection_name)))
+    chat_engine = CondensePlusContextChatEngine.from_defaults(
+        retriever=FilteredRetriever(
+            index,
+            lexical_index=lexical_index,
+            sources=sources,
+        ),
+        llm=load_model(api_key=api_key, model=model),
+    )
+    return CachedChatEngine(
+        chat_engine,
+        cache=load_response_cache(),
+        embed_model=embed_model,
+        namespace=f'{collection_name}/{model}',
+        version=lambda: get_index_version(client.get_collection(name=collection_name)),
+        # "news from today" and "news from this week" are similar prompts with different answers.
+        scope=lambda message: repr(parse_query_filters(message, sources=sources)),
     )
 
 
-@st.cache_data
+@st.cache_resource
+def load_lexical_index(collection_name: str = 'artificial_intelligence') -> BM25Index:
+    """Load the BM25 index of a collection, shared by every session."""
+    from ai_news.rag.index import get_lexical_index
+
+    return get_lexical_index(collection_name)
+
+
+@st.cache_resource
+def load_retrieval_cache() -> RetrievalCache:
+    """Load the vector search result cache shared by every session."""
+    from ai_news.rag.retrieval_cache import RetrievalCache
+
+    return RetrievalCache()
+
+
+@st.cache_resource
+def load_response_cache() -> ResponseCache:
+    """Load the semantic response cache shared by every session."""
+    from ai_news.rag.response_cache import ResponseCache
+
+    return ResponseCache()
+
+
+@st.cache_resource
+def load_embed_model(api_key: str) -> CachedEmbedding:
+    """Load OpenAI embedding model behind the persistent embedding cache."""
+    from ai_news.rag.index import get_embed_model
+
+    return get_embed_model(api_key=api_key)
+
+
+@st.cache_resource
 def load_model(
     api_key: str,
     model: str = 'gpt-3.5-turbo',
     max_tokens: int = 2048,
 ) -> OpenAI:
-    """Load OpenAI model."""
+    """Load OpenAI model, once per API key, model and max tokens."""
+    from llama_index.llms.openai import OpenAI
+
     return OpenAI(
         model=model,
         api_key=api_key,
@@ -0,0 +1,214 @@
+"""Background ingestion worker.
+
+Periodically fetches new articles and incrementally adds them to the Chroma
+vector store, so the Streamlit app only ever opens an already built index.
+
+    ai-news-worker --interval 3600            # refresh every hour
+    ai-news-worker --once --max-articles 500  # build/refresh once and exit
+    ai-news-worker --partition day --retention-days 90 --compact-after-days 14
+
+"""
+
+import argparse
+import fcntl
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from types import FrameType
+
+from dotenv import load_dotenv
+
+from ai_news import metrics
+from ai_news.rag.index import VECTOR_STORE_PATH, SplitterType, refresh_index
+from ai_news.rag.vector_db import PartitionedChromaVectorStore, Partitioning
+
+load_dotenv()
+
+
+def run_once(
+    topic: str = 'artificial intelligence',
+    collection_name: str = 'artificial_intelligence',
+    splitter_type: SplitterType = SplitterType.TFIDF_SEMANTIC,
+    max_articles: int | None = None,
+    news_api_key: str | None = None,
+    partitioning: Partitioning | None = None,
+    max_age: timedelta | None = None,
+    compact_after: timedelta | None = None,
+) -> int:
+    """Fetch and index articles published since the last run.
+
+    The first run on an empty collection builds the whole index.
+
+    Args:
+        topic (str, optional): News topic to get.
+            Defaults to 'artificial intelligence'.
+        collection_name (str, optional): Name of the collection for ChromaDB.
+            Defaults to 'artificial_intelligence'.
+        splitter_type (SplitterType, optional): Node splitter to use.
+            Defaults to `SplitterType.TFIDF_SEMANTIC`.
+        max_articles (int, optional): Maximum number of news articles to fetch.
+            Defaults to None (a single page of results).
+        news_api_key (str, optional): News API key.
+            Defaults to None. Loaded from environment variables.
+        partitioning (Partitioning, optional): Partition the collection by publish date.
+            Defaults to None, the collection's recorded partitioning.
+        max_age (timedelta, optional): Drop partitions whose news are all older than this.
+            Defaults to None (keep everything).
+        compact_after (timedelta, optional): Compact the day partitions of weeks that ended
+            longer ago than this into week partitions.
+            Defaults to None (no compaction).
+
+    Returns:
+        int: Number of nodes in the collection after the refresh.
+
+    """
+    index = refresh_index(
+        topic=topic,
+        collection_name=collection_name,
+        splitter_type=splitter_type,
+        news_api_key=news_api_key,
+        max_articles=max_articles,
+        partitioning=partitioning,
+        max_age=max_age,
+        compact_after=compact_after,
+    )
+    if isinstance(store := index.vector_store, PartitionedChromaVectorStore):
+        return store.count()
+    collection = index.vector_store.client  # type: ignore[attr-defined]
+    return int(collection.count())
+
+
+def run_forever(
+    interval: float,
+    stop: threading.Event,
+    metrics_file: str | None = None,
+    **kwargs: object,
+) -> None:
+    """Call `run_once` every `interval` seconds until `stop` is set.
+
+    A failed run is logged and retried on the next tick instead of stopping the worker.
+
+    Args:
+        interval (float): Seconds between the start of two runs.
+        stop (threading.Event): Set to stop the worker after the current run.
+        metrics_file (str, optional): Write Prometheus metrics here after every run.
+            Defaults to None.
+        **kwargs: Arguments of `run_once`.
+
+    """
+    while not stop.is_set():
+        start = time.monotonic()
+        tick(metrics_file=metrics_file, **kwargs)
+        stop.wait(max(0.0, interval - (time.monotonic() - start)))
+
+
+def tick(metrics_file: str | None = None, **kwargs: object) -> bool:
+    """Run `run_once`, logging instead of raising a failure.
+
+    Args:
+        metrics_file (str, optional): Write Prometheus metrics here after the run.
+            Defaults to None.
+        **kwargs: Arguments of `run_once`.
+
+    Returns:
+        bool: Whether the run succeeded.
+
+    """
+    start = time.monotonic()
+    print(f'[{datetime.now():%Y-%m-%d %H:%M:%S}] Refreshing index...')
+    try:
+        with metrics.timer('worker_run_seconds'):
+            count = run_once(**kwargs)  # type: ignore[arg-type]
+    except Exception as e:
+        metrics.increment('worker_runs_total', status='failed')
+        print(f'Refresh failed: {e!r}')
+        ok = False
+    else:
+        metrics.increment('worker_runs_total', status='ok')
+        print(f'Refresh done in {time.monotonic() - start:.1f}s, {count:,} nodes in the collection.')
+        ok = True
+
+    if metrics_file is not None:
+        write_metrics(metrics_file)
+    return ok
+
+
+def write_metrics(path: str) -> None:
+    """Atomically write Prometheus metrics to `path` (e.g. for a textfile collector)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(metrics.to_prometheus())
+    os.replace(tmp, path)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command line entry point of the ingestion worker."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--topic', default='artificial intelligence', help='News topic to index.')
+    parser.add_argument('--collection', default='artificial_intelligence', help='Chroma collection name.')
+    parser.add_argument(
+        '--splitter',
+        default=SplitterType.TFIDF_SEMANTIC.name.lower(),
+        choices=[splitter_type.name.lower() for splitter_type in SplitterType],
+    )
+    parser.add_argument('--max-articles', type=int, default=None, help='Maximum articles to fetch per run.')
+    parser.add_argument('--interval', type=float, default=60 * 60, help='Seconds between runs.')
+    parser.add_argument('--once', action='store_true', help='Run a single refresh and exit.')
+    parser.add_argument('--metrics-file', default=None, help='Write Prometheus metrics here after every run.')
+    parser.add_argument(
+        '--partition',
+        default=None,
+        choices=[partitioning.name.lower() for partitioning in Partitioning],
+        help='Partition the collection by publish date (recorded, later runs keep it).',
+    )
+    parser.add_argument('--retention-days', type=float, default=None, help='Drop partitions older than this.')
+    parser.add_argument(
+        '--compact-after-days',
+        type=float,
+        default=None,
+        help='Compact day partitions of weeks older than this into week partitions.',
+    )
+    args = parser.parse_args(argv)
+
+    if args.metrics_file:
+        metrics.enable()
+
+    # A single worker writes to the vector store at a time.
+    os.makedirs(VECTOR_STORE_PATH, exist_ok=True)
+    lock = open(os.path.join(VECTOR_STORE_PATH, 'worker.lock'), 'w')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        parser.exit(1, 'Another ingestion worker is already running.\n')
+
+    kwargs = dict(
+        topic=args.topic,
+        collection_name=args.collection,
+        splitter_type=SplitterType[args.splitter.upper()],
+        max_articles=args.max_articles,
+        partitioning=Partitioning[args.partition.upper()] if args.partition else None,
+        max_age=timedelta(days=args.retention_days) if args.retention_days is not None else None,
+        compact_after=timedelta(days=args.compact_after_days) if args.compact_after_days is not None else None,
+    )
+    if args.once:
+        if not tick(metrics_file=args.metrics_file, **kwargs):
+            sys.exit(1)
+        return
+
+    stop = threading.Event()
+
+    def handle_signal(signum: int, frame: FrameType | None) -> None:
+        print(f'Received {signal.Signals(signum).name}, stopping after the current run...')
+        stop.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    run_forever(args.interval, stop, metrics_file=args.metrics_file, **kwargs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import asyncio
+import unittest
+from typing import Any
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from ai_news.news.async_news import AsyncNews, _Limit
+
+ARTICLE_HTML = '<html><body><article><p>{}</p></article></body></html>'
+
+
+def _article(server: TestServer, index: int) -> dict[str, Any]:
+    return {
+        'source': {'id': 'stub', 'name': 'Stub News'},
+        'author': 'Author',
+        'title': f'Article {index}',
+        'description': f'Description {index}',
+        'url': str(server.make_url(f'/articles/{index}')),
+        'urlToImage': None,
+        'publishedAt': '2024-05-20T10:00:00Z',
+        'content': f'Truncated {index}',
+    }
+
+
+class StubNewsAPI:
+    """Local News API stub serving `total` articles and their pages."""
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.server = TestServer(self._app())
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/v2/everything', self._everything)
+        app.router.add_get('/articles/{index}', self._page)
+        return app
+
+    async def _everything(self, request: web.Request) -> web.Response:
+        page = int(request.query['page'])
+        page_size = int(request.query['pageSize'])
+        indices = range((page - 1) * page_size, min(page * page_size, self.total))
+        return web.json_response({
+            'status': 'ok',
+            'totalResults': self.total,
+            'articles': [_article(self.server, index) for index in indices],
+        })
+
+    async def _page(self, request: web.Request) -> web.Response:
+        index = int(request.match_info['index'])
+        if index % 5 == 4:
+            raise web.HTTPNotFound()
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        text = f'Full body of stub article number {index}. ' * 10
+        return web.Response(text=ARTICLE_HTML.format(text), content_type='text/html')
+
+
+class AsyncNewsTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.stub = StubNewsAPI(total=12)
+        await self.stub.server.start_server()
+        self.news = AsyncNews(
+            api_key='test',
+            base_url=str(self.stub.server.make_url('/v2')),
+            max_connections_per_host=3,
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.news.close()
+        await self.stub.server.close()
+
+    async def test_iter_everything_pages(self) -> None:
+        articles = [article async for article in self.news.iter_everything(q='ai', page_size=5)]
+        self.assertEqual([article['title'] for article in articles], [f'Article {i}' for i in range(12)])
+
+    async def test_iter_everything_max_articles(self) -> None:
+        articles = [article async for article in self.news.iter_everything(q='ai', max_articles=7)]
+        self.assertEqual(len(articles), 7)
+
+    async def test_get_articles_fetches_contents(self) -> None:
+        articles = await self.news.get_articles(q='ai', max_articles=12)
+
+        self.assertEqual(len(articles), 12)
+        for index, article in enumerate(articles):
+            if index % 5 == 4:
+                # Failed downloads fall back to the truncated content.
+                self.assertEqual(article.content, f'Truncated {index}')
+            else:
+                self.assertIn(f'stub article number {index}', article.content)
+        self.assertLessEqual(self.stub.max_in_flight, 3)
+
+
+class LimitTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_cancelled_acquire_releases_held_semaphores(self) -> None:
+        host, overall = asyncio.Semaphore(1), asyncio.Semaphore(1)
+        await overall.acquire()
+
+        async def enter() -> None:
+            async with _Limit(host, overall):
+                pass
+
+        task = asyncio.create_task(enter())
+        await asyncio.sleep(0)
+        self.assertTrue(host.locked())
+
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertFalse(host.locked())
+
+
+if __name__ == '__main__':
+    unittest.main()
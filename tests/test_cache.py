@@ -0,0 +1,207 @@
+import tempfile
+import time
+import unittest
+
+import chromadb
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.schema import NodeWithScore, TextNode
+from llama_index.core.vector_stores.types import VectorStoreQuery, VectorStoreQueryResult
+
+from ai_news.news.cache import ArticleCache
+from ai_news.rag.embedding_cache import CachedEmbedding, EmbeddingCache
+from ai_news.rag.response_cache import ResponseCache
+from ai_news.rag.retrieval_cache import CachedChromaVectorStore, RetrievalCache
+from ai_news.rag.vector_db import INDEX_VERSION_KEY, get_index_version
+
+
+class CountingEmbedding(BaseEmbedding):
+    """Embeds a text as [length, 1, 0], counting the texts it embedded."""
+
+    calls: int = 0
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._get_text_embeddings([query])[0]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        self.calls += len(texts)
+        return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+
+class ArticleCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_get_and_set(self) -> None:
+        cache = ArticleCache(self.tmp.name)
+        self.assertIsNone(cache.get('https://example.com/a'))
+
+        cache.set('https://example.com/a', 'content')
+        self.assertEqual(cache.get('https://example.com/a'), 'content')
+        self.assertIn('https://example.com/a', cache)
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+        cache.close()
+
+    def test_persists_across_instances(self) -> None:
+        ArticleCache(self.tmp.name).set('https://example.com/a', 'content')
+        self.assertEqual(ArticleCache(self.tmp.name).get('https://example.com/a'), 'content')
+
+    def test_expired_entries_are_misses(self) -> None:
+        cache = ArticleCache(self.tmp.name, ttl=0.01)
+        cache.set('https://example.com/a', 'content')
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get('https://example.com/a'))
+        self.assertEqual(cache.stats.expirations, 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = ArticleCache(self.tmp.name, max_size=10)
+        cache.set('https://example.com/a', 'aaaa')
+        cache.set('https://example.com/b', 'bbbb')
+        cache.get('https://example.com/a')
+        cache.set('https://example.com/c', 'cccc')
+
+        self.assertNotIn('https://example.com/b', cache)
+        self.assertIn('https://example.com/a', cache)
+        self.assertIn('https://example.com/c', cache)
+        self.assertEqual(cache.size, 8)
+        self.assertEqual(cache.stats.evictions, 1)
+
+
+class CachedEmbeddingTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.inner = CountingEmbedding(model_name='counting')
+        self.cache = EmbeddingCache(self.tmp.name)
+        self.embed_model = CachedEmbedding(self.inner, cache=self.cache)
+
+    def tearDown(self) -> None:
+        self.embed_model.cache.close()
+        self.tmp.cleanup()
+
+    def test_uses_the_given_empty_cache(self) -> None:
+        self.assertIs(self.embed_model.cache, self.cache)
+
+    def test_only_embeds_missing_texts(self) -> None:
+        first = self.embed_model.get_text_embedding_batch(['a', 'bb'])
+        second = self.embed_model.get_text_embedding_batch(['bb', 'ccc', 'a'])
+
+        self.assertEqual(first, [[1.0, 1.0, 0.0], [2.0, 1.0, 0.0]])
+        self.assertEqual(second, [[2.0, 1.0, 0.0], [3.0, 1.0, 0.0], [1.0, 1.0, 0.0]])
+        self.assertEqual(self.inner.calls, 3)
+
+    def test_normalizes_whitespace(self) -> None:
+        self.embed_model.get_text_embedding('hello  world')
+        self.embed_model.get_text_embedding(' hello\nworld ')
+        self.assertEqual(self.inner.calls, 1)
+
+    def test_query_and_text_embeddings_are_cached_separately(self) -> None:
+        self.embed_model.get_text_embedding('question')
+        self.embed_model.get_query_embedding('question')
+        self.embed_model.get_query_embedding('question')
+        self.assertEqual(self.inner.calls, 2)
+
+
+class RetrievalCacheTest(unittest.TestCase):
+
+    @staticmethod
+    def query(embedding: list[float]) -> VectorStoreQuery:
+        return VectorStoreQuery(query_embedding=embedding, similarity_top_k=2)
+
+    @staticmethod
+    def result(text: str) -> VectorStoreQueryResult:
+        return VectorStoreQueryResult(nodes=[TextNode(text=text)], similarities=[1.0], ids=['id'])
+
+    def test_key_ignores_float_noise_but_not_version(self) -> None:
+        cache = RetrievalCache()
+        key = cache.key('news', 'v1', self.query([0.6, 0.8]))
+
+        self.assertEqual(key, cache.key('news', 'v1', self.query([0.6000001, 0.8])))
+        self.assertNotEqual(key, cache.key('news', 'v2', self.query([0.6, 0.8])))
+        self.assertNotEqual(key, cache.key('news', 'v1', self.query([0.8, 0.6])))
+
+    def test_returns_copies(self) -> None:
+        cache = RetrievalCache()
+        cache.set('key', self.result('text'))
+
+        cached = cache.get('key')
+        assert cached is not None and cached.nodes is not None
+        cached.nodes[0].metadata['changed'] = True
+        self.assertEqual(cache.get('key').nodes[0].metadata, {})  # type: ignore[union-attr]
+
+    def test_evicts_least_recently_used_and_expires(self) -> None:
+        cache = RetrievalCache(max_entries=2, ttl=0.05)
+        cache.set('a', self.result('a'))
+        cache.set('b', self.result('b'))
+        cache.get('a')
+        cache.set('c', self.result('c'))
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('c'))
+        self.assertEqual((cache.stats.evictions, cache.stats.expirations), (1, 1))
+
+
+class CachedChromaVectorStoreTest(unittest.TestCase):
+
+    def test_writes_keep_metadata_set_since_the_store_was_created(self) -> None:
+        client = chromadb.EphemeralClient()
+        collection = client.get_or_create_collection(name='cached_store')
+        self.addCleanup(client.delete_collection, name='cached_store')
+        store = CachedChromaVectorStore(
+            chroma_collection=collection,
+            cache=RetrievalCache(),
+            version=lambda: get_index_version(client.get_collection(name='cached_store')),
+        )
+
+        # Written through another collection object, e.g. by the ingestion worker.
+        client.get_collection(name='cached_store').modify(metadata={'ai_news:partitioning': 'week'})
+        store.add([TextNode(text='text', embedding=[1.0, 0.0])])
+
+        metadata = client.get_collection(name='cached_store').metadata
+        self.assertEqual(metadata['ai_news:partitioning'], 'week')
+        self.assertEqual(metadata[INDEX_VERSION_KEY], store.version)
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.tmp.name, threshold=0.95)
+
+    def tearDown(self) -> None:
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_similar_prompts_share_answers(self) -> None:
+        source = NodeWithScore(node=TextNode(text='source', metadata={'title': 'Title'}), score=0.5)
+        self.cache.set('news', 'v1', 'What is new in AI?', [1.0, 0.0], 'Answer', [source])
+
+        cached = self.cache.get('news', 'v1', [0.99, 0.05])
+        assert cached is not None
+        self.assertEqual(cached.answer, 'Answer')
+        self.assertEqual(cached.source_nodes[0].node.metadata, {'title': 'Title'})
+        self.assertIsNone(self.cache.get('news', 'v1', [0.0, 1.0]))
+        self.assertIsNone(self.cache.get('other', 'v1', [1.0, 0.0]))
+
+    def test_new_version_drops_old_answers(self) -> None:
+        self.cache.set('news', 'v1', 'prompt', [1.0, 0.0], 'Answer', [])
+
+        self.assertIsNone(self.cache.get('news', 'v2', [1.0, 0.0]))
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import unittest
+from typing import Any
+
+from ai_news.news.catalog import SourceCatalog
+
+SOURCES = [
+    {
+        'id': 'wired',
+        'name': 'Wired',
+        'description': 'Technology news.',
+        'url': 'https://www.wired.com',
+        'category': 'technology',
+        'language': 'en',
+        'country': 'us',
+    },
+    {
+        'id': 'bbc-news',
+        'name': 'BBC News',
+        'description': 'General news.',
+        'url': 'https://www.bbc.co.uk/news',
+        'category': 'general',
+        'language': 'en',
+        'country': 'gb',
+    },
+]
+
+
+class SourcesTransport:
+    """Transport answering `get_sources` only, counting the calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def get_sources(self, **params: Any) -> dict[str, Any]:
+        self.calls += 1
+        return {'status': 'ok', 'sources': SOURCES}
+
+
+class SourceCatalogTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.path = os.path.join(tmp.name, 'sources.json')
+        self.transport = SourcesTransport()
+
+    def catalog(self) -> SourceCatalog:
+        return SourceCatalog(self.transport, path=self.path)  # type: ignore[arg-type]
+
+    def test_persists_sources(self) -> None:
+        self.assertEqual(self.catalog().get(id='wired').name, 'Wired')  # type: ignore[union-attr]
+        self.assertEqual(self.catalog().get(name='BBC News').id, 'bbc-news')  # type: ignore[union-attr]
+
+        self.assertEqual(self.transport.calls, 1)
+        self.assertEqual(os.listdir(self.dir), ['sources.json'])
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['sources'], SOURCES)
+
+    def test_fetches_again_after_a_truncated_file(self) -> None:
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"fetched_at": 1700000000, "sources": [{"id": "wir')
+
+        self.assertEqual([source.id for source in self.catalog().sources], ['wired', 'bbc-news'])
+        self.assertEqual(self.transport.calls, 1)
+        self.assertIsNotNone(self.catalog().get(id='wired'))
+        self.assertEqual(self.transport.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
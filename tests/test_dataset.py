@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from ai_news.news import dataset
+from ai_news.news.news import News
+from ai_news.news.util import Category, Source
+
+
+def _article(index: int, published_at: str) -> dict[str, object]:
+    return {
+        'source': {'id': 'wired', 'name': 'Wired'},
+        'author': 'Author',
+        'title': f'Title {index}',
+        'description': 'Description',
+        'url': f'https://www.wired.com/story/{index}',
+        'urlToImage': None,
+        'publishedAt': published_at,
+        'content': 'Truncated',
+    }
+
+
+class DatasetTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        source = Source(id='wired', name='Wired', category=Category.from_str('technology'))
+        self.documents = [
+            News._to_document(_article(0, '2024-05-20T10:00:00Z'), 'Content 0', source=source),
+            News._to_document(_article(1, '2024-05-21T08:30:00Z'), 'Content 1', source=source),
+        ]
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_round_trip_keeps_metadata(self) -> None:
+        dataset.write_documents(self.documents, self.tmp.name)
+
+        documents = sorted(dataset.read_documents(self.tmp.name), key=lambda document: document.metadata['url'])
+        self.assertEqual([document.metadata for document in documents], [d.metadata for d in self.documents])
+        self.assertEqual([document.text for document in documents], ['Content 0', 'Content 1'])
+
+    def test_ids_are_stable_and_urls_unique(self) -> None:
+        self.assertEqual(dataset.write_documents(self.documents + self.documents[:1], self.tmp.name), 2)
+        self.assertEqual(dataset.write_documents(self.documents, self.tmp.name), 0)
+
+        first = {document.id_ for document in dataset.read_documents(self.tmp.name)}
+        second = {document.id_ for document in dataset.read_documents(self.tmp.name)}
+        self.assertEqual(len(first), 2)
+        self.assertEqual(first, second)
+
+    def test_date_filter(self) -> None:
+        dataset.write_documents(self.documents, self.tmp.name)
+
+        documents = dataset.read_documents(self.tmp.name, from_date=datetime(2024, 5, 21, tzinfo=timezone.utc))
+        self.assertEqual([document.metadata['title'] for document in documents], ['Title 1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import base64
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import numpy as np
+from llama_index.core.schema import TextNode
+
+from ai_news.rag.embedding import AdaptiveLimiter, NoRetryOpenAIEmbedding, embed_nodes
+
+
+class FakeEmbeddingsAPI:
+    """Local OpenAI embeddings endpoint answering the first `rate_limited` requests with 429."""
+
+    def __init__(self, rate_limited: int = 0) -> None:
+        self.rate_limited = rate_limited
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def __enter__(self) -> 'FakeEmbeddingsAPI':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with api.lock:
+                    api.requests += 1
+                    rate_limited = api.requests <= api.rate_limited
+                if rate_limited:
+                    self._send(429, {'error': {'message': 'Rate limit reached', 'type': 'requests'}})
+                    return
+
+                data = []
+                for index, text in enumerate(request['input']):
+                    embedding = np.array([len(text), 1.0, 0.0], dtype=np.float32)
+                    value: Any = embedding.tolist()
+                    if request.get('encoding_format') == 'base64':
+                        value = base64.b64encode(embedding.tobytes()).decode()
+                    data.append({'object': 'embedding', 'index': index, 'embedding': value})
+                self._send(200, {
+                    'object': 'list',
+                    'data': data,
+                    'model': request['model'],
+                    'usage': {'prompt_tokens': 1, 'total_tokens': 1},
+                })
+
+            def _send(self, status: int, body: dict[str, Any]) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+class EmbedNodesTest(unittest.TestCase):
+
+    def test_rate_limits_reach_the_limiter(self) -> None:
+        nodes = [TextNode(text=f'node number {i}') for i in range(20)]
+
+        with FakeEmbeddingsAPI(rate_limited=3) as api:
+            embed_model = NoRetryOpenAIEmbedding(api_key='test', api_base=api.url, embed_batch_size=5)
+            embed_nodes(nodes, embed_model=embed_model, max_concurrency=2, backoff=0.01)
+
+        # 4 batches, and one extra request per 429: neither the client nor llama-index retried.
+        self.assertEqual(api.requests, 4 + 3)
+        for node in nodes:
+            self.assertEqual(node.embedding, [len(node.text), 1.0, 0.0])
+
+    def test_gives_up_after_max_retries(self) -> None:
+        nodes = [TextNode(text='node')]
+
+        with FakeEmbeddingsAPI(rate_limited=10) as api:
+            embed_model = NoRetryOpenAIEmbedding(api_key='test', api_base=api.url)
+            with self.assertRaises(Exception):
+                embed_nodes(nodes, embed_model=embed_model, max_retries=2, backoff=0.01)
+
+        self.assertEqual(api.requests, 3)
+        self.assertIsNone(nodes[0].embedding)
+
+    def test_skips_embedded_nodes(self) -> None:
+        nodes = [TextNode(text='embedded', embedding=[0.0, 0.0, 1.0]), TextNode(text='new')]
+
+        with FakeEmbeddingsAPI() as api:
+            embed_model = NoRetryOpenAIEmbedding(api_key='test', api_base=api.url)
+            embed_nodes(nodes, embed_model=embed_model)
+
+        self.assertEqual(api.requests, 1)
+        self.assertEqual(nodes[0].embedding, [0.0, 0.0, 1.0])
+        self.assertEqual(nodes[1].embedding, [3.0, 1.0, 0.0])
+
+
+class AdaptiveLimiterTest(unittest.TestCase):
+
+    def test_halves_on_rate_limit_and_grows_back(self) -> None:
+        limiter = AdaptiveLimiter(max_limit=8, increase_after=2)
+
+        for _ in range(2):
+            limiter.acquire()
+            limiter.release(rate_limited=True)
+        self.assertEqual(limiter.limit, 2)
+
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release()
+        self.assertEqual(limiter.limit, 4)
+
+    def test_never_below_one_or_above_max(self) -> None:
+        limiter = AdaptiveLimiter(max_limit=2, increase_after=1)
+
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(rate_limited=True)
+        self.assertEqual(limiter.limit, 1)
+
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release()
+        self.assertEqual(limiter.limit, 2)
+
+    def test_blocks_at_the_limit(self) -> None:
+        limiter = AdaptiveLimiter(max_limit=1)
+        limiter.acquire()
+
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+
+        limiter.release()
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
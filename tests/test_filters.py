@@ -0,0 +1,164 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from llama_index.core import VectorStoreIndex
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import FilterOperator
+
+from ai_news.news.util import Category
+from ai_news.rag.bm25 import BM25Index
+from ai_news.rag.filters import FilteredRetriever, QueryFilters, parse_query_filters
+
+# A Wednesday.
+NOW = datetime(2024, 5, 15, 12, tzinfo=timezone.utc)
+TODAY = datetime(2024, 5, 15, tzinfo=timezone.utc)
+
+
+class ParseQueryFiltersTest(unittest.TestCase):
+
+    def parse(self, query: str, sources: tuple[str, ...] = ()) -> QueryFilters:
+        return parse_query_filters(query, sources=sources, now=NOW)
+
+    def test_no_constraints(self) -> None:
+        filters = self.parse('What is new in artificial intelligence?')
+        self.assertFalse(filters)
+        self.assertIsNone(filters.to_metadata_filters())
+
+    def test_relative_windows(self) -> None:
+        self.assertEqual(self.parse('news of the past 3 days').start, NOW - timedelta(days=3))
+        self.assertEqual(self.parse('in the last 24 hours').start, NOW - timedelta(hours=24))
+        self.assertEqual(self.parse('last week').start, NOW - timedelta(weeks=1))
+        self.assertEqual(self.parse('over the past two weeks').start, NOW - timedelta(weeks=2))
+
+    def test_calendar_windows(self) -> None:
+        self.assertEqual(self.parse('AI news today').start, TODAY)
+        self.assertEqual(self.parse('this week').start, datetime(2024, 5, 13, tzinfo=timezone.utc))
+        self.assertEqual(self.parse('this month').start, datetime(2024, 5, 1, tzinfo=timezone.utc))
+        self.assertEqual(self.parse('this year').start, datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+        yesterday = self.parse('What happened yesterday?')
+        self.assertEqual((yesterday.start, yesterday.end), (TODAY - timedelta(days=1), TODAY))
+
+    def test_dates(self) -> None:
+        self.assertEqual(self.parse('since 2024-05-01').start, datetime(2024, 5, 1, tzinfo=timezone.utc))
+        self.assertEqual(self.parse('before 2024-05-10').end, datetime(2024, 5, 10, tzinfo=timezone.utc))
+
+        on = self.parse('on 2024-05-13')
+        self.assertEqual(
+            (on.start, on.end),
+            (datetime(2024, 5, 13, tzinfo=timezone.utc), datetime(2024, 5, 14, tzinfo=timezone.utc)),
+        )
+
+    def test_windows_are_intersected(self) -> None:
+        filters = self.parse('this month, since 2024-05-10 and before 2024-05-14')
+        self.assertEqual(filters.start, datetime(2024, 5, 10, tzinfo=timezone.utc))
+        self.assertEqual(filters.end, datetime(2024, 5, 14, tzinfo=timezone.utc))
+
+    def test_category(self) -> None:
+        self.assertEqual(self.parse('Any health news?').category, Category.HEALTH)
+        self.assertEqual(self.parse('latest tech headlines').category, Category.TECHNOLOGY)
+        self.assertIsNone(self.parse('Is AI good for your health?').category)
+
+    def test_sources(self) -> None:
+        sources = ('BBC', 'BBC News', 'The Verge', 'Wired')
+
+        self.assertEqual(self.parse('What did BBC News say?', sources).sources, ('BBC News',))
+        self.assertEqual(self.parse('Stories from the verge and Wired', sources).sources, ('The Verge', 'Wired'))
+        # Lowercase names only count after "from", "by" or "according to".
+        self.assertEqual(self.parse('a wired connection', sources).sources, ())
+
+    def test_naive_now_is_utc(self) -> None:
+        filters = parse_query_filters('today', now=NOW.replace(tzinfo=None))
+        self.assertEqual(filters.start, TODAY)
+
+
+class QueryFiltersTest(unittest.TestCase):
+
+    def test_merge_keeps_unset_constraints(self) -> None:
+        previous = QueryFilters(start=TODAY, category=Category.HEALTH)
+        merged = previous.merge(QueryFilters(sources=('Wired',)))
+        self.assertEqual(merged, QueryFilters(start=TODAY, sources=('Wired',), category=Category.HEALTH))
+
+    def test_merge_replaces_set_constraints(self) -> None:
+        merged = QueryFilters(start=TODAY).merge(QueryFilters(start=NOW))
+        self.assertEqual(merged.start, NOW)
+
+    def test_to_metadata_filters(self) -> None:
+        filters = QueryFilters(
+            start=TODAY,
+            end=NOW,
+            sources=('Wired',),
+            category=Category.TECHNOLOGY,
+        ).to_metadata_filters()
+        assert filters is not None
+
+        self.assertEqual(
+            [(f.key, f.operator, f.value) for f in filters.filters],  # type: ignore[union-attr]
+            [
+                ('published_ts', FilterOperator.GTE, int(TODAY.timestamp())),
+                ('published_ts', FilterOperator.LT, int(NOW.timestamp())),
+                ('source', FilterOperator.IN, ['Wired']),
+                ('category', FilterOperator.EQ, 'technology'),
+            ],
+        )
+
+
+class QueryCountingEmbedding(BaseEmbedding):
+    """Embeds every text as the same vector, counting the queries it embedded."""
+
+    queries: int = 0
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        self.queries += 1
+        return [1.0, 0.0]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return [1.0, 0.0]
+
+
+class FilteredRetrieverTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        nodes = [
+            TextNode(text='Nvidia ships the H100 to more cloud providers.'),
+            TextNode(text='The H100 from Nvidia tops the training benchmarks.'),
+            TextNode(text='Nvidia H100 supply improves.'),
+            TextNode(text='A new open model beats GPT-4o on reasoning.'),
+        ]
+        self.embed_model = QueryCountingEmbedding(model_name='counting')
+        self.index = VectorStoreIndex(nodes, embed_model=self.embed_model)
+        self.lexical_index = BM25Index(tmp.name, name='news')
+        self.addCleanup(self.lexical_index.close)
+        self.lexical_index.add(nodes)
+
+    def test_covered_questions_skip_the_embedding(self) -> None:
+        retriever = FilteredRetriever(self.index, lexical_index=self.lexical_index, similarity_top_k=2)
+
+        nodes = retriever.retrieve('What about the Nvidia H100?')
+        self.assertEqual(len(nodes), 2)
+        self.assertTrue(all('H100' in node.node.get_content() for node in nodes))
+        self.assertEqual(self.embed_model.queries, 0)
+
+        retriever.retrieve('How good is GPT-4o at reasoning?')
+        self.assertEqual(self.embed_model.queries, 1)
+
+    def test_without_coverage_always_embeds(self) -> None:
+        retriever = FilteredRetriever(
+            self.index,
+            lexical_index=self.lexical_index,
+            similarity_top_k=2,
+            lexical_coverage=None,
+        )
+        retriever.retrieve('What about the Nvidia H100?')
+        self.assertEqual(self.embed_model.queries, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import tempfile
+import unittest
+from collections.abc import Iterator
+
+from ai_news.news.cache import ArticleCache
+from ai_news.news.pipeline import ExtractionPipeline
+
+ARTICLE_HTML = '<html><body><article><p>{}</p></article></body></html>'
+
+
+def download(url: str) -> str | None:
+    """Stub download: `fail` URLs fail, `raise` URLs raise, others return a page."""
+    if 'fail' in url:
+        return None
+    if 'raise' in url:
+        raise OSError(url)
+    return ARTICLE_HTML.format(f'The body of {url} is long enough to be extracted. ' * 10)
+
+
+class BrokenCache(ArticleCache):
+    """Article cache whose lookups fail for `broken` URLs."""
+
+    def get(self, url: str) -> str | None:
+        if 'broken' in url:
+            raise RuntimeError('cache is broken')
+        return super().get(url)
+
+
+class ExtractionPipelineTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pipeline = ExtractionPipeline(fetch_workers=4, extract_workers=2, queue_size=2)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_results_keep_url_order(self) -> None:
+        urls = [f'https://example.com/{kind}/{i}' for i, kind in enumerate(['ok', 'fail', 'ok', 'raise', 'ok'] * 4)]
+
+        contents = self.pipeline.run(urls, download=download)
+
+        self.assertEqual(len(contents), len(urls))
+        for url, content in zip(urls, contents):
+            if '/ok/' in url:
+                self.assertIsNotNone(content)
+                self.assertIn(url, content)
+            else:
+                self.assertIsNone(content)
+
+    def test_cache_hits_skip_download(self) -> None:
+        cache = ArticleCache(self.tmp.name)
+        cache.set('https://example.com/fail/cached', 'cached content')
+
+        contents = self.pipeline.run(['https://example.com/fail/cached', 'https://example.com/ok'], download, cache)
+
+        self.assertEqual(contents[0], 'cached content')
+        self.assertEqual(cache.get('https://example.com/ok'), contents[1])
+        cache.close()
+
+    def test_failed_fetch_keeps_its_index(self) -> None:
+        cache = BrokenCache(self.tmp.name)
+        urls = ['https://example.com/ok/0', 'https://example.com/broken/1', 'https://example.com/ok/2']
+
+        contents = self.pipeline.run(urls, download, cache)
+
+        self.assertEqual(len(contents), 3)
+        self.assertIsNotNone(contents[0])
+        self.assertIsNone(contents[1])
+        self.assertIn('/ok/2', contents[2])
+        cache.close()
+
+    def test_failing_urls_iterator_raises(self) -> None:
+        def urls() -> Iterator[str]:
+            for i in range(5):
+                yield f'https://example.com/ok/{i}'
+            raise ConnectionError('paging failed')
+
+        with self.assertRaises(ConnectionError):
+            ExtractionPipeline(fetch_workers=4, extract_workers=2, queue_size=1).run(urls(), download=download)
+
+
+if __name__ == '__main__':
+    unittest.main()
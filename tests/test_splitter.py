@@ -0,0 +1,32 @@
+import unittest
+
+from llama_index.core.utils import get_tokenizer
+
+from ai_news.rag.splitter import TfidfSemanticSplitterNodeParser
+
+
+class TfidfSemanticSplitterTest(unittest.TestCase):
+
+    def test_splits_at_topic_changes(self) -> None:
+        text = ' '.join(
+            ['Chips power data centers and chips need power.'] * 5
+            + ['Football fans watched the football final in the stadium.'] * 5
+        )
+        chunks = TfidfSemanticSplitterNodeParser(breakpoint_percentile_threshold=80).split_text(text)
+
+        self.assertGreaterEqual(len(chunks), 2)
+        self.assertIn('Chips', chunks[0])
+        self.assertNotIn('Football', chunks[0])
+
+    def test_chunks_are_bounded(self) -> None:
+        tokenizer = get_tokenizer()
+        text = ' '.join(f'Sentence {i} keeps talking about the same language models.' for i in range(50))
+        text += ' ' + 'word ' * 200 + 'end.'
+        chunks = TfidfSemanticSplitterNodeParser(max_chunk_size=40).split_text(text)
+
+        self.assertTrue(all(len(tokenizer(chunk)) <= 40 for chunk in chunks))
+        self.assertEqual(' '.join(chunks).split(), text.split())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import concurrent.futures
+import threading
+import unittest
+
+from ai_news.news.throttle import CircuitBreaker, DomainThrottle
+
+
+class DomainThrottleTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_limits_each_domain(self) -> None:
+        throttle = DomainThrottle(max_per_domain=1)
+        release = threading.Event()
+
+        first = throttle.submit(self.executor, 'https://a.com/1', lambda url: release.wait(5) and url)
+        second = throttle.submit(self.executor, 'https://a.com/2', lambda url: url)
+        other = throttle.submit(self.executor, 'https://b.com/1', lambda url: url)
+
+        self.assertEqual(other.result(timeout=5), 'https://b.com/1')
+        self.assertFalse(second.done())
+        release.set()
+        self.assertEqual(first.result(timeout=5), 'https://a.com/1')
+        self.assertEqual(second.result(timeout=5), 'https://a.com/2')
+
+    def test_cancelled_work_frees_the_slot(self) -> None:
+        throttle = DomainThrottle(max_per_domain=1)
+        release = threading.Event()
+        ran: list[str] = []
+
+        def work(url: str) -> str:
+            ran.append(url)
+            return url
+
+        running = throttle.submit(self.executor, 'https://a.com/1', lambda url: release.wait(5) and work(url))
+        waiting = throttle.submit(self.executor, 'https://a.com/2', work)
+        following = throttle.submit(self.executor, 'https://a.com/3', work)
+
+        # Past a batch deadline: the running work can't be cancelled anymore, the waiting one can.
+        self.assertFalse(running.cancel())
+        self.assertTrue(waiting.cancel())
+        release.set()
+
+        self.assertEqual(following.result(timeout=5), 'https://a.com/3')
+        self.assertEqual(running.result(timeout=5), 'https://a.com/1')
+        self.assertEqual(ran, ['https://a.com/1', 'https://a.com/3'])
+
+    def test_guard_does_not_take_a_slot(self) -> None:
+        throttle = DomainThrottle(max_per_domain=1)
+        release = threading.Event()
+        holding = self.executor.submit(throttle.wrap(lambda url: release.wait(5) and 'html'), 'https://a.com/1')
+
+        # The only slot of the domain is taken, as it is for work run by `submit`.
+        self.assertEqual(throttle.guard(lambda url: 'html')('https://a.com/2'), 'html')
+        release.set()
+        self.assertEqual(holding.result(timeout=5), 'html')
+
+    def test_skips_domains_with_an_open_circuit(self) -> None:
+        throttle = DomainThrottle(failure_threshold=2)
+        download = throttle.wrap(lambda url: None)
+        download('https://a.com/1')
+        download('https://a.com/2')
+
+        self.assertTrue(throttle.breaker.is_open('a.com'))
+        self.assertIsNone(throttle.wrap(lambda url: 'html')('https://a.com/3'))
+        self.assertEqual(throttle.wrap(lambda url: 'html')('https://b.com/1'), 'html')
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_trial_after_reset_timeout(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+        breaker.record_failure('a.com')
+
+        self.assertTrue(breaker.allow('a.com'))
+        # Only one trial at a time.
+        self.assertFalse(breaker.allow('a.com'))
+        breaker.record_success('a.com')
+        self.assertFalse(breaker.is_open('a.com'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import chromadb
+from llama_index.core import Document
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+
+from ai_news.rag.index import refresh_index
+from ai_news.rag.vector_db import PARTITIONING_KEY, Partitioning, get_collections
+
+NOW = datetime(2024, 5, 22, 12, tzinfo=timezone.utc)
+
+
+class ConstantEmbedding(BaseEmbedding):
+    """Embeds every text as the same vector."""
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return [1.0, 0.0]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return [1.0, 0.0]
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return [1.0, 0.0]
+
+
+def documents(*days: int) -> list[Document]:
+    """One news document published `day` days before `NOW` per day."""
+    return [
+        Document(
+            text=f'News of day {day}.',
+            metadata={
+                'url': f'https://example.com/{day}',
+                'title': f'Day {day}',
+                'source': 'Wired',
+                'published_at': (NOW - timedelta(days=day)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            },
+        )
+        for day in days
+    ]
+
+
+class RefreshIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.client = chromadb.EphemeralClient()
+        self.name = f'news_{id(self)}'
+
+    def tearDown(self) -> None:
+        for collection in get_collections(self.client, self.name):
+            self.client.delete_collection(name=collection.name)
+
+    def refresh(self, docs: list[Document], **kwargs: object) -> None:
+        with mock.patch('ai_news.rag.index.get_news_documents', return_value=docs):
+            refresh_index(
+                collection_name=self.name,
+                dedup_threshold=None,
+                embed_model=ConstantEmbedding(model_name='constant'),  # type: ignore[arg-type]
+                client=self.client,
+                use_lexical_index=False,
+                **kwargs,  # type: ignore[arg-type]
+            )
+
+    def counts(self) -> dict[str, int]:
+        return {collection.name: collection.count() for collection in get_collections(self.client, self.name)}
+
+    def test_partitioning_is_kept_by_later_refreshes(self) -> None:
+        self.refresh(documents(1, 2), partitioning=Partitioning.WEEK)
+        self.assertEqual(self.client.get_collection(name=self.name).metadata[PARTITIONING_KEY], 'week')
+
+        self.refresh(documents(3, 4))
+
+        counts = self.counts()
+        self.assertEqual(counts.pop(self.name), 0)
+        self.assertEqual(sum(counts.values()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()